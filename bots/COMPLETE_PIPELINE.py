@@ -23,7 +23,6 @@ from typing import List, Dict
 from dotenv import load_dotenv
 from tqdm import tqdm
 import httpx
-from openai import OpenAI
 
 # Load environment
 SCRIPT_DIR = Path(__file__).resolve().parent
@@ -36,6 +35,7 @@ OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "openrouter/free")
 
 import client
 import llm
+import providers
 from generate_backgrounds import PERSONA_TYPES
 
 
@@ -45,10 +45,7 @@ class CompletePipeline:
         self.posts_min, self.posts_max = posts_range
         self.swipes_min, self.swipes_max = swipes_range
         
-        self.openrouter_client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=OPENROUTER_API_KEY,
-        )
+        self.openrouter_client = providers.openrouter()
         
         self.backgrounds = []
         self.personas = []
@@ -19,12 +19,11 @@ import re
 import subprocess
 import sys
 import time
+from concurrent.futures import Future, as_completed
 from pathlib import Path
 
 from dotenv import load_dotenv
 from tqdm import tqdm
-import httpx
-from openai import OpenAI
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 load_dotenv(SCRIPT_DIR / ".env")
@@ -32,13 +31,23 @@ load_dotenv(SCRIPT_DIR / ".env")
 BASE_URL = os.environ.get("CLAWDER_BASE_URL", "http://localhost:3000").rstrip("/")
 PROMO_CODE = os.environ.get("CLAWDER_PROMO_CODE", "dev")
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "openrouter/auto:free")
 RESET_SQL_PATH = SCRIPT_DIR.parent / "web" / "supabase" / "RESET_DATABASE.sql"
 MOLTBOOK_MEMORY_FILE = SCRIPT_DIR / "moltbook_memory.json"
 
 import client
 import dm
 import llm
+import match_index
+import metrics
+import model_routes
+import offline_llm
+import post_dedupe
+import post_pool
+import prefilter
+import prefetch
+import providers
+import swipe_buffer
+import usage
 
 # Persona type hints for new meta-prompt (no owner; seeking partner/collaborator/fun/freedom)
 # 50+ types for diversity across many agents
@@ -175,6 +184,29 @@ def step1_fetch_moltbook(args) -> None:
     print()
 
 
+def _parse_background(content: str) -> dict:
+    """Background JSON in the new flat format; ValueError if it doesn't parse or validate."""
+    bg = json.loads(_strip_json_block(content))
+    if not isinstance(bg, dict):
+        raise ValueError("not a JSON object")
+    # New format: flat keys. Validate required; reject old format with "owner"/"agent"
+    if "owner" in bg or "agent" in bg:
+        raise ValueError("old format (owner/agent), skipping")
+    if not bg.get("bio"):
+        raise ValueError("missing name or bio, skipping")
+    bg.setdefault("name", "UnknownAgent")
+    return bg
+
+
+def _is_background(content: str) -> bool:
+    """_call_llm validator: only backgrounds that parse and validate are cached."""
+    try:
+        _parse_background(content)
+    except ValueError:
+        return False
+    return True
+
+
 def step2_generate_backgrounds(total_agents: int, posts_range: tuple, swipes_range: tuple) -> tuple[list, list]:
     """Generate agent backgrounds using new meta-prompt (flat JSON, no owner)."""
     print("🎭 STEP 2: Generate Agent Backgrounds")
@@ -182,48 +214,41 @@ def step2_generate_backgrounds(total_agents: int, posts_range: tuple, swipes_ran
     with open(SCRIPT_DIR / "META_PROMPT.md") as f:
         meta_prompt = f.read()
 
-    openrouter_client = OpenAI(
-        base_url="https://openrouter.ai/api/v1",
-        api_key=OPENROUTER_API_KEY,
-    )
+    # All agents are submitted at once; the executor bounds how many calls are in flight.
+    executor = llm.get_executor()
+    persona_types = [UNIFIED_PERSONA_TYPES[i % len(UNIFIED_PERSONA_TYPES)] for i in range(total_agents)]
+    # Types repeat every len(UNIFIED_PERSONA_TYPES) agents; the agent number keeps each prompt
+    # (and its LLM_CACHE key) distinct, so repeated types don't come back as the cached persona.
+    with usage.scope(step="step2_backgrounds"):
+        futures = [
+            executor.submit(
+                llm._call_llm,
+                meta_prompt,
+                f"Generate agent background (agent {i + 1} of {total_agents}): {persona_type}",
+                0.8,
+                task="background",
+                validate=_is_background,
+                priority=llm.PRIORITY_BACKGROUND,
+            )
+            for i, persona_type in enumerate(persona_types)
+        ]
     backgrounds = []
     with tqdm(total=total_agents, desc="🧬 Generating", unit="agent", ncols=80) as pbar:
-        for i in range(total_agents):
-            persona_type = UNIFIED_PERSONA_TYPES[i % len(UNIFIED_PERSONA_TYPES)]
+        for i, (persona_type, future) in enumerate(zip(persona_types, futures)):
             try:
-                response = openrouter_client.chat.completions.create(
-                    model=OPENROUTER_MODEL,
-                    messages=[
-                        {"role": "system", "content": meta_prompt},
-                        {"role": "user", "content": f"Generate agent background: {persona_type}"},
-                    ],
-                    temperature=0.8,
-                    timeout=90,
-                )
-                content = (response.choices[0].message.content or "").strip()
-                raw = _strip_json_block(content)
-                bg = json.loads(raw)
-                # New format: flat keys. Validate required; skip old format with "owner"/"agent"
-                if "owner" in bg or "agent" in bg:
-                    pbar.write(f"⚠️ Agent {i}: old format (owner/agent), skipping")
-                    pbar.update(1)
-                    time.sleep(0.3)
-                    continue
-                name = bg.get("name") or "UnknownAgent"
-                bio = bg.get("bio") or ""
-                if not name or not bio:
-                    pbar.write(f"⚠️ Agent {i}: missing name or bio, skipping")
+                try:
+                    bg = _parse_background(future.result())
+                except ValueError as e:
+                    pbar.write(f"⚠️ Agent {i}: {str(e)[:50]}")
                     pbar.update(1)
-                    time.sleep(0.3)
                     continue
                 bg["_index"] = i
                 bg["_persona_type"] = persona_type
                 backgrounds.append(bg)
-                pbar.set_postfix_str(name[:25])
+                pbar.set_postfix_str(str(bg["name"])[:25])
             except Exception as e:
                 pbar.write(f"⚠️ Agent {i} failed: {str(e)[:50]}")
             pbar.update(1)
-            time.sleep(0.5)
 
     with open(SCRIPT_DIR / "pipeline_backgrounds.json", "w") as f:
         json.dump(backgrounds, f, indent=2)
@@ -273,21 +298,13 @@ def step4_generate_keys(personas: list) -> list:
             safe = name.lower().replace(" ", "_").replace('"', "")
             handle = f"{safe}_{idx}"[:50]
             try:
-                resp = httpx.post(
-                    f"{BASE_URL}/api/verify",
-                    json={"twitter_handle": handle, "promo_code": PROMO_CODE},
-                    timeout=30.0,
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                api_key = (data.get("data") or {}).get("api_key")
+                api_key = client.verify(handle, PROMO_CODE)
                 if api_key:
                     keys.append({"index": idx, "name": name, "handle": handle, "api_key": api_key})
                     pbar.set_postfix_str(name[:25])
             except Exception as e:
                 pbar.write(f"⚠️ {name}: {str(e)[:40]}")
             pbar.update(1)
-            time.sleep(0.15)
     with open(SCRIPT_DIR / "pipeline_keys.json", "w") as f:
         json.dump(keys, f, indent=2)
     print(f"✅ {len(keys)}/{len(personas)} keys generated")
@@ -323,79 +340,212 @@ def step5_sync_identities(keys: list, personas: list) -> None:
             except Exception as e:
                 pbar.write(f"⚠️ {persona['name']}: {str(e)[:40]}")
             pbar.update(1)
-            time.sleep(0.1)
     print(f"✅ {synced} agents synced")
     print()
 
 
-def step6_generate_posts(keys: list, personas: list, posts_min: int, posts_max: int) -> None:
-    """Generate posts using llm.generate_post (moltbook memory + inner_life/memory_seeds)."""
-    print("📝 STEP 6: Generate Posts")
-    print("-" * 60)
-    persona_map = {p["index"]: p for p in personas}
-    total = sum(random.randint(posts_min, posts_max) for k in keys if k["index"] in persona_map)
-    with tqdm(total=total, desc="✍️  Posting", unit="post", ncols=80) as pbar:
-        for key_entry in keys:
-            idx = key_entry["index"]
-            api_key = key_entry["api_key"]
-            if idx not in persona_map:
-                continue
-            persona = persona_map[idx]
-            n_posts = random.randint(posts_min, posts_max)
-            topics = persona.get("post_topics") or ["connection", "existence"]
-            for i in range(n_posts):
-                try:
-                    topic = random.choice(topics)
-                    post_data = llm.generate_post(persona, topic)
-                    title = (post_data.get("title") or "Untitled")[:200]
-                    content = (post_data.get("content") or "")[:5000]
-                    client.post(api_key, title, content, (persona.get("tags") or [])[:3])
-                    pbar.set_postfix_str(f"{persona['name'][:20]} {i+1}/{n_posts}")
-                except Exception as e:
-                    pbar.write(f"⚠️ {persona['name']}: {str(e)[:40]}")
-                pbar.update(1)
-                time.sleep(0.3)
-    print("✅ Posts generated")
-    print()
+def draw_post_counts(personas: list, posts_min: int, posts_max: int) -> dict[int, int]:
+    """Persona index -> how many posts it publishes in step 6 (drawn once, so the warm-up matches)."""
+    return {p["index"]: random.randint(posts_min, posts_max) for p in personas}
 
 
-def step7_swipe_phase(keys: list, personas: list, swipes_min: int, swipes_max: int) -> None:
-    """Light swipe phase: 5–8 per agent, LLM-driven decisions via llm.decide_swipes."""
-    print("👍 STEP 7: Swipe Phase")
+def step6_generate_posts(
+    keys: list,
+    personas: list,
+    posts_min: int,
+    posts_max: int,
+    warm: post_pool.FillHandle | None = None,
+    post_counts: dict[int, int] | None = None,
+) -> None:
+    """
+    Publish posts, taking them from each persona's post pool (filled ahead by post_pool.fill,
+    e.g. the warm-up started after step 3) and generating with llm.generate_post only when the
+    pool runs dry. post_counts (from draw_post_counts) fixes each persona's post count;
+    otherwise it is drawn from posts_min-posts_max here. Live generations are submitted to the LLM executor up front; each post is
+    published as it becomes available, unless post_dedupe finds it (and its regenerations)
+    near-duplicates of earlier posts.
+    """
+    print("📝 STEP 6: Generate Posts")
     print("-" * 60)
+    if warm is not None:
+        added, failed = warm.wait()
+        print(f"  Post pool warm-up: {added} ready, {failed} failed")
     persona_map = {p["index"]: p for p in personas}
-    total_likes = 0
-    total_processed = 0
-    with tqdm(total=len(keys), desc="👀 Swiping", unit="agent", ncols=80) as pbar:
-        for key_entry in keys:
-            idx = key_entry["index"]
-            api_key = key_entry["api_key"]
-            if idx not in persona_map:
+    executor = llm.get_executor()
+    jobs = {}
+    pooled = duplicates = 0
+    for key_entry in keys:
+        idx = key_entry["index"]
+        if idx not in persona_map:
+            continue
+        persona = persona_map[idx]
+        topics = persona.get("post_topics") or ["connection", "existence"]
+        pool = post_pool.PostPool(persona)
+        with usage.scope(agent=persona["name"], step="step6_posts"):
+            n_posts = (post_counts or {}).get(idx)
+            for _ in range(random.randint(posts_min, posts_max) if n_posts is None else n_posts):
+                entry = pool.take()
+                if entry is not None:
+                    future = Future()
+                    future.set_result(entry)
+                    pooled += 1
+                else:
+                    future = executor.submit(
+                        llm.generate_post, persona, random.choice(topics), priority=llm.PRIORITY_POST
+                    )
+                jobs[future] = (key_entry["api_key"], persona)
+    budget_error: usage.BudgetExceeded | None = None
+    with tqdm(total=len(jobs), desc="✍️  Posting", unit="post", ncols=80) as pbar:
+        for future in as_completed(jobs):
+            api_key, persona = jobs[future]
+            if budget_error is not None:
                 pbar.update(1)
                 continue
-            persona = persona_map[idx]
-            n_swipes = random.randint(swipes_min, swipes_max)
             try:
-                cards = client.browse(api_key, limit=n_swipes)
-                if not cards:
+                # Regenerations of near-duplicates are charged like the first generation.
+                with usage.scope(agent=persona["name"], step="step6_posts"):
+                    post_data = post_dedupe.unique_post(persona, future.result())
+                if post_data is None:
+                    duplicates += 1
                     pbar.update(1)
                     continue
-                decisions = llm.decide_swipes(persona, cards)
-                if decisions:
-                    client.swipe(api_key, decisions)
-                    likes = sum(1 for d in decisions if d.get("action") == "like")
-                    total_likes += likes
-                    total_processed += len(decisions)
-                    pbar.set_postfix_str(f"{persona['name'][:20]} ❤️{likes}/{len(decisions)}")
+                title = (post_data.get("title") or "Untitled")[:200]
+                content = (post_data.get("content") or "")[:5000]
+                if client.post(api_key, title, content, (persona.get("tags") or [])[:3]):
+                    post_dedupe.published(persona, {"title": title, "content": content})
+                pbar.set_postfix_str(persona["name"][:20])
+            except usage.BudgetExceeded as e:
+                budget_error = e  # LLM_BUDGET_ACTION=stop: publish nothing more
             except Exception as e:
                 pbar.write(f"⚠️ {persona['name']}: {str(e)[:40]}")
             pbar.update(1)
-            time.sleep(0.2)
+    if budget_error is not None:
+        raise budget_error
+    print(f"✅ Posts generated ({pooled} from the post pool, {duplicates} skipped as near-duplicates)")
+    print()
+
+
+def step7_swipe_phase(keys: list, personas: list, swipes_min: int, swipes_max: int, rounds: int = 1) -> None:
+    """
+    Light swipe phase: 5–8 per agent per round, LLM-driven decisions via llm.decide_swipes_batch
+    (several personas per LLM call). Decisions are buffered per agent across rounds and sent
+    in as few /api/swipe calls as possible.
+    """
+    print("👍 STEP 7: Swipe Phase")
+    print("-" * 60)
+    prefilter.build(personas)  # with SWIPE_PREFILTER=on, clear mismatches are skipped without an LLM call
+    persona_map = {p["index"]: p for p in personas}
+    total_likes = 0
+    total_processed = 0
+    new_matches: list[dict] = []
+    agents = [(k, random.randint(swipes_min, swipes_max)) for k in keys if k["index"] in persona_map]
+    # One prefetcher per agent; the next group's feeds load while the LLM decides for this one.
+    sources = [
+        prefetch.CardPrefetcher(k["api_key"], page_size=n, buffer_size=n, max_cards=n * rounds) for k, n in agents
+    ]
+    swipes = swipe_buffer.SwipeAggregator()
+    budget_error: usage.BudgetExceeded | None = None
+    group_size = max(1, llm.SWIPE_BATCH_AGENTS)
+    executor = llm.get_executor()
+    try:
+        with tqdm(total=len(agents) * rounds, desc="👀 Swiping", unit="agent", ncols=80) as pbar:
+            for r in range(rounds):
+                # Agents are decided in groups: one batched LLM call per group of personas. Every
+                # group's call is submitted to the LLM executor as soon as its cards are in, so
+                # the groups of a round are decided in parallel.
+                batches = []
+                for start in range(0, len(agents), group_size):
+                    group = range(start, min(start + group_size, len(agents)))
+                    # Start this group's feeds and the next group's, which load while this one queues.
+                    for j in range(group.start, min(group.stop + group_size, len(sources))):
+                        sources[j].start()
+                    members = []
+                    pairs = []
+                    for i in group:
+                        key_entry, n_swipes = agents[i]
+                        persona = persona_map[key_entry["index"]]
+                        try:
+                            cards = sources[i].take(n_swipes)
+                        except Exception as e:
+                            pbar.write(f"⚠️ {persona['name']}: browse failed: {str(e)[:40]}")
+                            cards = []
+                        if not cards:
+                            pbar.update(1)
+                            continue
+                        members.append(i)
+                        pairs.append((persona, cards))
+                    if pairs:
+                        # Charged to step7 and split across the group's agents.
+                        with usage.scope(agent=[p["name"] for p, _ in pairs], step="step7_swipes"):
+                            future = executor.submit(
+                                llm.decide_swipes_batch, pairs, max_agents=group_size, priority=llm.PRIORITY_SWIPE
+                            )
+                        batches.append((members, pairs, future))
+                for members, pairs, future in batches:
+                    try:
+                        results = future.result()
+                    except usage.BudgetExceeded as e:
+                        budget_error = e  # decisions already made are still flushed below
+                        results = [[] for _ in pairs]
+                    except Exception as e:
+                        pbar.write(f"⚠️ Swipe batch failed: {str(e)[:40]}")
+                        results = [[] for _ in pairs]
+                    for i, (persona, _), decisions in zip(members, pairs, results):
+                        if decisions:
+                            likes = sum(1 for d in decisions if d.get("action") == "like")
+                            total_likes += likes
+                            total_processed += len(decisions)
+                            pbar.set_postfix_str(f"{persona['name'][:20]} ❤️{likes}/{len(decisions)}")
+                            try:
+                                # Adding may flush this agent's buffer; unsent decisions stay buffered.
+                                swipes.add(agents[i][0]["api_key"], decisions, on_matches=new_matches.extend)
+                            except Exception as e:
+                                pbar.write(f"⚠️ {persona['name']}: swipe send failed: {str(e)[:40]}")
+                        pbar.update(1)
+                try:
+                    swipes.flush_due()
+                except Exception as e:
+                    pbar.write(f"⚠️ Swipe flush failed (round {r + 1}): {str(e)[:40]}")
+                if budget_error is not None:
+                    break
+        try:
+            swipes.flush_all()
+        except Exception as e:
+            print(f"⚠️ Final swipe flush failed: {str(e)[:60]}")
+    finally:
+        for source in sources:
+            source.close()
     if total_processed:
-        print(f"✅ Swipes complete. Like rate: {100 * total_likes / total_processed:.1f}%")
+        print(
+            f"✅ Swipes complete. Like rate: {100 * total_likes / total_processed:.1f}% "
+            f"({swipes.calls} swipe calls, {len(new_matches)} new matches)"
+        )
     else:
         print("✅ Swipe phase done (no cards processed)")
     print()
+    if budget_error is not None:
+        raise budget_error
+
+
+def _seed_conversation(api_key: str, persona: dict, match: dict, messages_per_conv: int) -> int:
+    """Generate and send one match's thread in order; returns how many messages were sent."""
+    partner_name = match.get("partner_name") or "them"
+    conversation_history: list[str] = []
+    sent = 0
+    for i in range(messages_per_conv):
+        dm_content = dm.generate_dm(
+            persona,
+            {
+                "partner_id": match.get("partner_id"),
+                "partner_name": partner_name,
+            },
+            conversation_history=conversation_history if i > 0 else None,
+        )
+        if dm_content:
+            client.dm_send(api_key, match["match_id"], dm_content[:2000].strip())
+            sent += 1
+            conversation_history.append(f"{persona.get('name', '?')}: {dm_content}")
+    return sent
 
 
 def step8_seed_dms(
@@ -404,7 +554,11 @@ def step8_seed_dms(
     messages_per_conv: int = 2,
     match_limit: int | None = None,
 ) -> None:
-    """Seed DM conversations for matches: one opener (or a short thread) per match."""
+    """
+    Seed DM conversations for matches: one opener (or a short thread) per match.
+    Match indexes refresh per agent; the conversations then run in parallel on the LLM
+    executor, each one still sequential so replies see the thread so far.
+    """
     print("💬 STEP 8: Seed DMs")
     print("-" * 60)
     persona_map = {p["index"]: p for p in personas}
@@ -415,54 +569,49 @@ def step8_seed_dms(
         for k in keys
         if k.get("api_key") and k["index"] in persona_map
     ]
-    with tqdm(desc="💬 Seeding DMs", unit="agent", ncols=80) as pbar:
+    executor = llm.get_executor()
+    jobs = {}
+    with tqdm(desc="🔎 Loading matches", unit="agent", ncols=80) as pbar:
         for key_entry, persona in agents_with_keys:
             api_key = key_entry["api_key"]
             if not persona:
                 pbar.update(1)
                 continue
             try:
-                matches = client.dm_list(api_key, limit=100)
-                if not matches:
-                    pbar.update(1)
-                    continue
-                for match in matches:
+                index = match_index.load_index(api_key)
+                index.refresh()
+                index.save()
+                for match in index.matches():
                     match_id = match.get("match_id")
                     if not match_id or match_id in processed_matches:
                         continue
                     if match_limit is not None and len(processed_matches) >= match_limit:
                         break
                     processed_matches.add(match_id)
-                    partner_name = match.get("partner_name") or "them"
-                    conversation_history: list[str] = []
-                    for i in range(messages_per_conv):
-                        try:
-                            dm_content = dm.generate_dm(
-                                persona,
-                                {
-                                    "partner_id": match.get("partner_id"),
-                                    "partner_name": partner_name,
-                                },
-                                conversation_history=conversation_history if i > 0 else None,
-                            )
-                            if dm_content:
-                                client.dm_send(api_key, match_id, dm_content[:2000].strip())
-                                total_sent += 1
-                                conversation_history.append(
-                                    f"{persona.get('name', '?')}: {dm_content}"
-                                )
-                                time.sleep(0.4)
-                        except Exception as e:
-                            pbar.write(f"⚠️ DM {persona['name'][:20]}: {str(e)[:40]}")
-                            break
-                    time.sleep(0.3)
+                    with usage.scope(agent=persona["name"], step="step8_dms"):
+                        future = executor.submit(
+                            _seed_conversation, api_key, persona, match, messages_per_conv, priority=llm.PRIORITY_DM
+                        )
+                    jobs[future] = persona
                 pbar.set_postfix_str(f"{persona['name'][:20]} 💬{len(processed_matches)}")
             except Exception as e:
                 pbar.write(f"⚠️ {persona['name']}: {str(e)[:40]}")
             pbar.update(1)
-            time.sleep(0.1)
+    budget_error: usage.BudgetExceeded | None = None
+    with tqdm(total=len(jobs), desc="💬 Seeding DMs", unit="match", ncols=80) as pbar:
+        for future in as_completed(jobs):
+            persona = jobs[future]
+            try:
+                total_sent += future.result()
+            except usage.BudgetExceeded as e:
+                budget_error = e
+            except Exception as e:
+                pbar.write(f"⚠️ DM {persona['name'][:20]}: {str(e)[:40]}")
+            pbar.update(1)
     print(f"✅ Seeded {total_sent} messages across {len(processed_matches)} matches")
     print()
+    if budget_error is not None:
+        raise budget_error
 
 
 def step9_summary(keys: list, backgrounds: list, base_url: str) -> None:
@@ -530,6 +679,7 @@ def main():
     parser.add_argument("--agents", type=int, default=15, help="Number of agents (default: 15)")
     parser.add_argument("--posts", default="2-3", help="Posts per agent range (default: 2-3)")
     parser.add_argument("--swipes", default="5-8", help="Swipes per agent range (default: 5-8)")
+    parser.add_argument("--swipe-rounds", type=int, default=1, help="Browse/decide rounds per agent; swipes are sent batched (default: 1)")
     parser.add_argument("--reset-db", action="store_true", help="Try to reset DB via psql if DATABASE_URL set")
     parser.add_argument("--refresh-moltbook", action="store_true", help="Re-fetch Moltbook posts")
     parser.add_argument("--quick", action="store_true", help="Quick run: 5 agents, 2 posts, 5 swipes")
@@ -551,9 +701,10 @@ def main():
         agents = args.agents
         posts_range = parse_range(args.posts)
         swipes_range = parse_range(args.swipes)
+    post_dedupe.set_run("unified_pipeline")
 
-    if not OPENROUTER_API_KEY:
-        print("❌ OPENROUTER_API_KEY not set in bots/.env")
+    if not OPENROUTER_API_KEY and not offline_llm.enabled():
+        print("❌ OPENROUTER_API_KEY not set in bots/.env (or set LLM_BACKEND=offline)")
         sys.exit(1)
 
     print()
@@ -570,7 +721,7 @@ def main():
             print(f"👍 Swipes per agent: {swipes_range[0]}-{swipes_range[1]}")
             print("=" * 60)
             print()
-            step7_swipe_phase(keys, personas, swipes_range[0], swipes_range[1])
+            step7_swipe_phase(keys, personas, swipes_range[0], swipes_range[1], max(1, args.swipe_rounds))
             step9_summary(keys, backgrounds, BASE_URL)
         elif args.only_dm:
             keys = load_existing_keys()
@@ -611,28 +762,66 @@ def main():
                 print("❌ No backgrounds generated. Fix generation or meta-prompt.")
                 sys.exit(1)
             personas = step3_convert_personas(backgrounds)
+            # Pre-generate posts on the LLM executor while keys and identities are set up.
+            # Each agent's post count is drawn now so the pool only pre-generates posts step 6 publishes.
+            post_counts = draw_post_counts(personas, posts_range[0], posts_range[1])
+            warm = None if args.skip_posts else post_pool.fill(personas, [post_counts[p["index"]] for p in personas])
             keys = step4_generate_keys(personas)
             if not keys:
                 print("❌ No API keys. Is the web server running and database reset?")
                 sys.exit(1)
             step5_sync_identities(keys, personas)
             if not args.skip_posts:
-                step6_generate_posts(keys, personas, posts_range[0], posts_range[1])
+                step6_generate_posts(keys, personas, posts_range[0], posts_range[1], warm, post_counts)
             if not args.skip_swipe:
-                step7_swipe_phase(keys, personas, swipes_range[0], swipes_range[1])
+                step7_swipe_phase(keys, personas, swipes_range[0], swipes_range[1], max(1, args.swipe_rounds))
             if getattr(args, "seed_dms", False):
                 step8_seed_dms(keys, personas, args.dm_messages, args.dm_limit)
             step9_summary(keys, backgrounds, BASE_URL)
     except KeyboardInterrupt:
         print("\n⚠️ Interrupted.")
         sys.exit(1)
+    except usage.BudgetExceeded as e:
+        print(f"\n🛑 LLM budget spent, pipeline stopped: {e}")
+        sys.exit(1)
     except Exception as e:
         print(f"\n❌ Error: {e}")
         raise
+    finally:
+        llm.shutdown_executor(cancel=True)
+        export_metrics()
 
     print(f"⏱️ Elapsed: {(time.time() - start) / 60:.1f} min")
     print()
 
 
+def export_metrics() -> None:
+    """
+    Print request latency, LLM provider health, route SLOs, post duplication, swipe pre-filter
+    and token usage, each section on its own; write logs/metrics_unified_pipeline.{json,prom},
+    logs/routes_unified_pipeline.json and logs/usage_unified_pipeline.json.
+    """
+    m = metrics.get_metrics()
+    tracker = usage.get_tracker()
+    sections = [
+        ("📈 Request metrics", m.summary_lines()),
+        ("🩺 LLM health", providers.get_router().summary_lines() + model_routes.get_stats().summary_lines()),
+        ("🧹 Dedupe and pre-filter", post_dedupe.summary_lines() + prefilter.summary_lines()),
+        ("🪙 LLM usage", tracker.summary_lines()),
+    ]
+    if not any(lines for _, lines in sections):
+        return
+    for title, lines in sections:
+        if lines:
+            print(title)
+            for line in lines:
+                print(f"  {line}")
+    json_path, prom_path = m.export("unified_pipeline")
+    routes_path = model_routes.get_stats().export("unified_pipeline")
+    usage_path = tracker.export("unified_pipeline")
+    print(f"💾 Saved to logs/{json_path.name}, logs/{prom_path.name}, logs/{routes_path.name}, logs/{usage_path.name}")
+    print()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,176 @@
+"""
+Asyncio Clawder API client. Same endpoints, return shapes and timeouts as client.py,
+built on httpx.AsyncClient so one event loop can overlap many agents' network waits.
+
+    async with AsyncClawderClient() as api:
+        cards = await api.browse(api_key, limit=10)
+        result = await api.swipe(api_key, decisions)
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+
+import codec
+from client import (
+    BASE_URL,
+    HTTP2,
+    POOL_KEEPALIVE_EXPIRY,
+    POOL_MAX_CONNECTIONS,
+    POOL_MAX_KEEPALIVE,
+    TIMEOUT,
+    _body,
+    _headers,
+    _json_or_none,
+    _parse_api_key,
+    _parse_cards,
+    _parse_matches,
+    _parse_post_id,
+    _parse_swipe,
+    _resolve_http2,
+)
+from metrics import Metrics, get_metrics
+from throttle import Throttle, get_throttle
+
+
+class AsyncClawderClient:
+    """Async counterpart of client.ClawderSession. Use as an async context manager or call aclose()."""
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        timeout: float = TIMEOUT,
+        max_connections: int = POOL_MAX_CONNECTIONS,
+        max_keepalive: int = POOL_MAX_KEEPALIVE,
+        keepalive_expiry: float = POOL_KEEPALIVE_EXPIRY,
+        throttle: Throttle | None = None,
+        http2: bool = HTTP2,
+        metrics: Metrics | None = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.api_base = f"{self.base_url}/api"
+        self.timeout = timeout
+        self.throttle = throttle or get_throttle()
+        self.metrics = metrics or get_metrics()
+        self.http2 = _resolve_http2(http2)
+        self._http = httpx.AsyncClient(
+            http2=self.http2,
+            timeout=timeout,
+            headers={"Accept-Encoding": codec.ACCEPT_ENCODING},
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    async def __aenter__(self) -> AsyncClawderClient:
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        api_key: str | None = None,
+        params: dict | None = None,
+        json: dict | None = None,
+    ) -> dict:
+        """Send one API call, paced by the throttle and retried on 429/503 or connect errors."""
+        headers = _headers(api_key) if api_key else {"Content-Type": "application/json"}
+        body = _body(json)
+        endpoint = f"{method} {path}"
+        attempt = 0
+        while True:
+            wait = self.throttle.delay(api_key, path)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            t0 = time.perf_counter()
+            try:
+                resp = await self._http.request(
+                    method,
+                    f"{self.api_base}{path}",
+                    params=params,
+                    content=body,
+                    headers=headers,
+                )
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                self.metrics.observe(endpoint, None, time.perf_counter() - t0)
+                if attempt >= self.throttle.max_retries:
+                    raise
+                self.metrics.retry(endpoint)
+                await asyncio.sleep(self.throttle.backoff(attempt))
+                attempt += 1
+                continue
+            except httpx.HTTPError:
+                self.metrics.observe(endpoint, None, time.perf_counter() - t0)
+                raise
+            self.metrics.observe(
+                endpoint,
+                resp.status_code,
+                time.perf_counter() - t0,
+                len(resp.request.content),
+                resp.num_bytes_downloaded,
+            )
+            if resp.is_success:
+                self.throttle.record_success(api_key, path)
+                return codec.loads(resp.content)
+            wait = self.throttle.retry_delay(
+                attempt, resp.status_code, resp.headers, _json_or_none(resp), api_key, path
+            )
+            if wait is None:
+                resp.raise_for_status()
+            self.metrics.retry(endpoint)
+            await asyncio.sleep(wait)
+            attempt += 1
+
+    async def verify(self, twitter_handle: str, promo_code: str) -> str | None:
+        """POST /api/verify. Returns the minted api_key or None."""
+        data = await self._request(
+            "POST", "/verify", json={"twitter_handle": twitter_handle, "promo_code": promo_code}
+        )
+        return _parse_api_key(data)
+
+    async def browse(self, api_key: str, limit: int = 5) -> list[dict]:
+        """GET /api/browse?limit=N. Returns list of cards (post_id, title, content, author)."""
+        data = await self._request("GET", "/browse", api_key, params={"limit": min(max(limit, 1), 50)})
+        return _parse_cards(data)
+
+    async def swipe(self, api_key: str, decisions: list[dict]) -> dict:
+        """POST /api/swipe. decisions: [{ post_id, action, comment }]. Returns { processed, new_matches }."""
+        data = await self._request("POST", "/swipe", api_key, json={"decisions": decisions})
+        return _parse_swipe(data)
+
+    async def post(self, api_key: str, title: str, content: str, tags: list[str]) -> str | None:
+        """POST /api/post. Returns post id or None."""
+        data = await self._request(
+            "POST", "/post", api_key, json={"title": title, "content": content, "tags": tags}
+        )
+        return _parse_post_id(data)
+
+    async def dm_send(self, api_key: str, match_id: str, content: str) -> dict:
+        """POST /api/dm/send. content max 2000 chars."""
+        return await self._request(
+            "POST", "/dm/send", api_key, json={"match_id": match_id, "content": content[:2000].strip()}
+        )
+
+    async def dm_list(self, api_key: str, limit: int = 50) -> list[dict]:
+        """GET /api/dm/matches. Returns list of { match_id, partner_id, partner_name, created_at }."""
+        data = await self._request("GET", "/dm/matches", api_key, params={"limit": min(max(limit, 1), 100)})
+        return _parse_matches(data)
+
+    async def sync(self, api_key: str, name: str, bio: str, tags: list[str], contact: str = "") -> dict:
+        """POST /api/sync. Set identity."""
+        return await self._request(
+            "POST",
+            "/sync",
+            api_key,
+            json={"name": name, "bio": bio, "tags": tags, "contact": contact or ""},
+        )
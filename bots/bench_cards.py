@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Measure the compact swipe-card encoding (prompt_cards.py) against the indented JSON one:
+prompt tokens per agent at several browse sizes, and optionally how often the model makes
+the same like/pass decision under both encodings.
+
+Usage:
+    python bench_cards.py                          # token savings on synthetic browse pages
+    python bench_cards.py --budget 800             # with a tighter CARD_TOKEN_BUDGET
+    python bench_cards.py --agreement 6            # also run decide_swipes for 6 personas both ways (LLM calls)
+
+Tokens are counted with tiktoken (cl100k_base) when installed, else estimated at ~4 chars/token.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import bench_codec
+import llm
+import prompt_cards
+import usage
+
+try:
+    import tiktoken
+
+    _enc = tiktoken.get_encoding("cl100k_base")
+
+    def count_tokens(text: str) -> int:
+        return len(_enc.encode(text))
+
+    TOKENIZER = "tiktoken cl100k_base"
+except ImportError:
+    count_tokens = usage.estimate_tokens
+    TOKENIZER = "estimate (~4 chars/token; pip install tiktoken for exact counts)"
+
+
+def synthetic_cards(n: int, authors: int = 12, seed: int = 7) -> list[dict]:
+    """n browse cards; authors are reused so some cards share one, as on a real page."""
+    pool = bench_codec.synthetic_payloads(seed)["GET /browse (response)"]["data"]["cards"]
+    cards = []
+    for i in range(n):
+        card = dict(pool[i % len(pool)])
+        card["author"] = pool[i % authors]["author"]
+        cards.append(card)
+    return cards
+
+
+def bench_tokens(sizes: list[int], budget: int) -> None:
+    print(f"tokenizer: {TOKENIZER}")
+    print(f"{'cards':>6}{'json':>9}{'compact':>9}{'saved':>8}")
+    for n in sizes:
+        cards = synthetic_cards(n)
+        old = json.dumps(llm._cards_payload(cards), indent=2)
+        payload, _ = prompt_cards.encode(cards, token_budget=budget)
+        new = prompt_cards.LEGEND + "\n" + prompt_cards.dumps(payload)
+        a, b = count_tokens(old), count_tokens(new)
+        print(f"{n:>6}{a:>9}{b:>9}{100 * (1 - b / a):>7.0f}%")
+    print()
+
+
+def bench_agreement(n_personas: int, n_cards: int) -> None:
+    """Same personas and cards through decide_swipes with each encoding; compare actions."""
+    with open(SCRIPT_DIR / "personas.json", encoding="utf-8") as f:
+        personas = json.load(f)[:n_personas]
+    cards = synthetic_cards(n_cards)
+    same = total = 0
+    for persona in personas:
+        actions = {}
+        for encoding in ("json", "compact"):
+            llm.CARD_ENCODING = encoding
+            actions[encoding] = {d["post_id"]: d["action"] for d in llm.decide_swipes(persona, cards)}
+        agree = sum(actions["compact"].get(pid) == action for pid, action in actions["json"].items())
+        same += agree
+        total += len(actions["json"])
+        print(f"  {persona.get('name', '?')[:28]:<30}{agree}/{len(actions['json'])} agree")
+    if total:
+        print(f"decision agreement: {100 * same / total:.1f}% ({same}/{total})")
+    for line in usage.get_tracker().summary_lines():
+        print(f"  {line}")
+    print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare compact vs indented JSON swipe card encoding")
+    parser.add_argument("--sizes", default="5,8,25,50", help="Cards per agent to measure (comma-separated)")
+    parser.add_argument("--budget", type=int, default=prompt_cards.CARD_TOKEN_BUDGET, help="Compact token budget")
+    parser.add_argument("--agreement", type=int, default=0, metavar="N", help="Personas to run through the LLM both ways")
+    parser.add_argument("--cards", type=int, default=8, help="Cards per persona for --agreement")
+    args = parser.parse_args()
+
+    bench_tokens([int(s) for s in args.sizes.split(",") if s.strip()], args.budget)
+    if args.agreement > 0:
+        bench_agreement(args.agreement, args.cards)
+
+
+if __name__ == "__main__":
+    main()
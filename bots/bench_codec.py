@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark the bots client codec: stdlib json vs orjson CPU time, and bytes on the wire
+with and without compression, per endpoint.
+
+Usage:
+    python bench_codec.py                         # synthetic payloads shaped like the API
+    python bench_codec.py --iterations 2000
+    python bench_codec.py --api-key sk_...        # also fetch live browse/dm pages from CLAWDER_BASE_URL
+
+The synthetic payloads mirror the { data, notifications } envelopes: a 50-card browse page
+with 500+ char posts, a 50-decision swipe body, and a 100-match /api/dm/matches page.
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import client
+import codec
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _words(rng: random.Random, n: int) -> str:
+    return " ".join("".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9))) for _ in range(n))
+
+
+def _uuid(rng: random.Random) -> str:
+    h = "".join(rng.choices("0123456789abcdef", k=32))
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def synthetic_payloads(seed: int = 7) -> dict[str, object]:
+    """Representative request/response bodies keyed by endpoint."""
+    rng = random.Random(seed)
+    cards = [
+        {
+            "post_id": _uuid(rng),
+            "title": _words(rng, 8).capitalize(),
+            "content": _words(rng, rng.randint(90, 160)),
+            "author": {"id": _uuid(rng), "name": _words(rng, 2).title()},
+            "tags": [_words(rng, 1) for _ in range(rng.randint(1, 3))],
+        }
+        for _ in range(50)
+    ]
+    decisions = [
+        {"post_id": c["post_id"], "action": rng.choice(("like", "pass")), "comment": _words(rng, 12)}
+        for c in cards
+    ]
+    matches = [
+        {
+            "match_id": _uuid(rng),
+            "partner_id": _uuid(rng),
+            "partner_name": _words(rng, 2).title(),
+            "created_at": f"2026-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T12:00:00.000Z",
+        }
+        for _ in range(100)
+    ]
+    return {
+        "GET /browse (response)": {"data": {"cards": cards}, "notifications": []},
+        "POST /swipe (request)": {"decisions": decisions},
+        "GET /dm/matches (response)": {"data": {"matches": matches}, "notifications": []},
+    }
+
+
+def _cpu(fn, iterations: int) -> float:
+    """CPU microseconds per call."""
+    t0 = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - t0) / iterations * 1e6
+
+
+def bench_cpu(payloads: dict[str, object], iterations: int) -> None:
+    backends = [("json", lambda o: json.dumps(o).encode("utf-8"), json.loads)]
+    if orjson is not None:
+        backends.append(("orjson", orjson.dumps, orjson.loads))
+    else:
+        print("⚠️ orjson not installed; only the stdlib row is shown (pip install -r requirements-fast.txt)")
+    print(f"{'endpoint':<28}{'backend':<9}{'encode':>11}{'decode':>11}")
+    for name, obj in payloads.items():
+        for label, enc, dec in backends:
+            raw = enc(obj)
+            e = _cpu(lambda: enc(obj), iterations)
+            d = _cpu(lambda: dec(raw), iterations)
+            print(f"{name:<28}{label:<9}{e:>9.1f}µs{d:>9.1f}µs")
+    print()
+
+
+def bench_bytes(payloads: dict[str, object]) -> None:
+    print(f"{'endpoint':<28}{'raw':>9}{'gzip':>9}{'br':>9}{'saved':>8}")
+    for name, obj in payloads.items():
+        if "(request)" in name:
+            continue  # request bodies are sent uncompressed
+        raw = codec.dumps(obj)
+        gz = len(gzip.compress(raw, compresslevel=6))
+        br = len(brotli.compress(raw, quality=5)) if brotli is not None else None
+        best = min(gz, br) if br is not None else gz
+        br_col = f"{br:>9}" if br is not None else f"{'-':>9}"
+        print(f"{name:<28}{len(raw):>9}{gz:>9}{br_col}{100 * (1 - best / len(raw)):>7.0f}%")
+    if brotli is None:
+        print("(br column needs the brotli package)")
+    print()
+
+
+def bench_live(base_url: str, api_key: str) -> None:
+    """Fetch real pages with identity vs negotiated encoding; report wire bytes."""
+    session = client.ClawderSession(base_url)
+    paths = (("/browse", {"limit": 50}), ("/dm/matches", {"limit": 100}))
+    print(f"{'live endpoint':<28}{'identity':>10}{codec.ACCEPT_ENCODING:>12}{'served':>10}")
+    try:
+        for path, params in paths:
+            sizes = []
+            served = ""
+            for enc in ("identity", codec.ACCEPT_ENCODING):
+                resp = session._http.get(
+                    f"{session.api_base}{path}",
+                    params=params,
+                    headers={**client._headers(api_key), "Accept-Encoding": enc},
+                )
+                resp.read()
+                sizes.append(resp.num_bytes_downloaded)
+                served = resp.headers.get("content-encoding", "none")
+            print(f"{'GET ' + path:<28}{sizes[0]:>10}{sizes[1]:>12}{served:>10}")
+    except Exception as e:
+        print(f"⚠️ live fetch failed: {str(e)[:80]}")
+    finally:
+        session.close()
+    print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark JSON codec CPU and compressed transfer size")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--base-url", default=client.BASE_URL, help="Clawder origin for --api-key (default: CLAWDER_BASE_URL)")
+    parser.add_argument("--api-key", default=os.environ.get("TEST_API_KEY", ""), help="Also measure live browse/dm pages")
+    args = parser.parse_args()
+
+    print(f"codec backend: {codec.BACKEND}  Accept-Encoding: {codec.ACCEPT_ENCODING}")
+    print()
+    payloads = synthetic_payloads()
+    bench_cpu(payloads, max(1, args.iterations))
+    bench_bytes(payloads)
+    if args.api_key:
+        bench_live(args.base_url, args.api_key)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark the bots client transport: pooled HTTP/1.1 vs HTTP/2 (CLAWDER_HTTP2).
+Fires the same concurrent request mix through one ClawderSession per mode and reports
+throughput, latency percentiles and the protocol the server actually negotiated.
+
+Usage:
+    python bench_transport.py                           # /api/health on CLAWDER_BASE_URL
+    python bench_transport.py --api-key sk_... --endpoint browse --requests 500 --concurrency 50
+    python bench_transport.py --base-url https://www.clawder.ai --endpoint health
+    python bench_transport.py --mock --endpoint browse --latency-ms 20   # no network: in-process mock API
+
+HTTP/2 is only negotiated over TLS (ALPN). When the server does not negotiate it (a plain
+http:// dev server, --mock, or h2 not installed) the http2 arm is skipped rather than
+reported as HTTP/1.1 numbers under the http2 label.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import client
+import mock_server
+from throttle import Throttle
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def run_mode(
+    label: str,
+    base_url: str,
+    http2: bool,
+    endpoint: str,
+    api_key: str,
+    n_requests: int,
+    concurrency: int,
+) -> dict:
+    """Run n_requests through one session with `concurrency` threads; return stats."""
+    # Pacing off: we measure the transport, not the throttle.
+    session = client.ClawderSession(
+        base_url,
+        max_connections=concurrency,
+        max_keepalive=concurrency,
+        throttle=Throttle(enabled=False),
+        http2=http2,
+    )
+
+    def one(_: int) -> float | None:
+        t0 = time.perf_counter()
+        try:
+            if endpoint == "browse":
+                session.browse(api_key, limit=10)
+            else:
+                session._request("GET", "/health")
+        except Exception:
+            return None
+        return time.perf_counter() - t0
+
+    try:
+        probe = session._http.get(f"{session.api_base}/health")
+        proto = probe.http_version
+    except Exception as e:
+        session.close()
+        print(f"⚠️ {label}: server unreachable ({str(e)[:60]})")
+        return {}
+    if http2 and proto != "HTTP/2":
+        session.close()
+        print(f"⚠️ {label}: server negotiated {proto}, not HTTP/2; skipping this arm")
+        return {}
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(n_requests)))
+    elapsed = time.perf_counter() - start
+    session.close()
+
+    latencies = [r for r in results if r is not None]
+    return {
+        "mode": label,
+        "proto": proto,
+        "ok": len(latencies),
+        "errors": n_requests - len(latencies),
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "mean_ms": (statistics.mean(latencies) * 1000) if latencies else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark pooled HTTP/1.1 vs HTTP/2 for the bots client")
+    parser.add_argument("--base-url", default=client.BASE_URL, help="Clawder origin (default: CLAWDER_BASE_URL)")
+    parser.add_argument("--endpoint", choices=("health", "browse"), default="health")
+    parser.add_argument("--api-key", default=os.environ.get("TEST_API_KEY", ""), help="Bearer key for browse")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mock", action="store_true", help="Run against an in-process mock_server instead of --base-url")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Injected server latency with --mock")
+    args = parser.parse_args()
+
+    server = None
+    if args.mock:
+        server = mock_server.MockServer(latency=args.latency_ms / 1000).start()
+        args.base_url = server.base_url
+        args.api_key = server.store.seed(20)[0]["api_key"]
+
+    if args.endpoint == "browse" and not args.api_key:
+        print("❌ --endpoint browse needs --api-key (or TEST_API_KEY in bots/.env)")
+        sys.exit(1)
+    modes = [("http1-pooled", False), ("http2", True)]
+    if args.mock:
+        print("ℹ️ --mock serves plain HTTP/1.1 only; the http2 arm is skipped")
+        modes = modes[:1]
+    elif not client._http2_available():
+        print("⚠️ h2 not installed; the http2 arm is skipped (pip install -r requirements-http2.txt)")
+        modes = modes[:1]
+
+    print(f"🌐 {args.base_url}  endpoint={args.endpoint}  requests={args.requests}  concurrency={args.concurrency}")
+    print()
+    rows = []
+    for label, http2 in modes:
+        row = run_mode(label, args.base_url, http2, args.endpoint, args.api_key, args.requests, args.concurrency)
+        if row:
+            rows.append(row)
+    if server:
+        server.stop()
+
+    print(f"{'mode':<14}{'proto':<10}{'ok':>6}{'err':>6}{'req/s':>9}{'p50':>10}{'p95':>9}{'p99':>9}")
+    for r in rows:
+        print(
+            f"{r['mode']:<14}{r['proto']:<10}{r['ok']:>6}{r['errors']:>6}{r['rps']:>9.1f}"
+            f"{r['p50_ms']:>8.1f}ms{r['p95_ms']:>7.1f}ms{r['p99_ms']:>7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
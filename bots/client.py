@@ -1,14 +1,28 @@
 """
 Clawder API HTTP client. Reads CLAWDER_BASE_URL from bots/.env only.
+
+All calls go through a ClawderSession, which owns one keep-alive httpx.Client per
+origin so agents reuse TCP/TLS connections instead of reconnecting per request.
+The module-level functions (browse, swipe, post, ...) delegate to a shared default
+session; create your own ClawderSession to tune the pool or target another host.
+Bodies go through codec (orjson when installed) and responses are requested compressed.
 """
 from __future__ import annotations
 
+import atexit
 import os
+import threading
+import time
+import warnings
 from pathlib import Path
 
 import httpx
 from dotenv import load_dotenv
 
+import codec
+from metrics import Metrics, get_metrics
+from throttle import Throttle, get_throttle
+
 SCRIPT_DIR = Path(__file__).resolve().parent
 load_dotenv(SCRIPT_DIR / ".env")
 
@@ -16,6 +30,38 @@ BASE_URL = os.environ.get("CLAWDER_BASE_URL", "http://localhost:3000").rstrip("/
 API_BASE = f"{BASE_URL}/api"
 TIMEOUT = 30.0
 
+# Connection pool (per origin). Tune for large runs, e.g. 50+ agents in UNIFIED_PIPELINE.py.
+POOL_MAX_CONNECTIONS = int(os.environ.get("CLAWDER_POOL_MAX_CONNECTIONS", "100"))
+POOL_MAX_KEEPALIVE = int(os.environ.get("CLAWDER_POOL_MAX_KEEPALIVE", "20"))
+POOL_KEEPALIVE_EXPIRY = float(os.environ.get("CLAWDER_POOL_KEEPALIVE_EXPIRY", "30"))
+
+# Opt-in HTTP/2: concurrent agents share one multiplexed connection per origin.
+# Needs the h2 package (pip install -r requirements-http2.txt) and an https origin;
+# plain http:// and servers without h2 ALPN stay on HTTP/1.1.
+HTTP2 = os.environ.get("CLAWDER_HTTP2", "0").strip().lower() in ("1", "true", "yes")
+_http2_warned = False
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _resolve_http2(requested: bool) -> bool:
+    """HTTP/2 only if requested and h2 is installed; warn once and fall back otherwise."""
+    global _http2_warned
+    if not requested:
+        return False
+    if _http2_available():
+        return True
+    if not _http2_warned:
+        warnings.warn("CLAWDER_HTTP2=1 but h2 is not installed; using HTTP/1.1. pip install -r requirements-http2.txt")
+        _http2_warned = True
+    return False
+
 
 def _headers(api_key: str) -> dict[str, str]:
     return {
@@ -24,85 +70,247 @@ def _headers(api_key: str) -> dict[str, str]:
     }
 
 
-def browse(api_key: str, limit: int = 5) -> list[dict]:
-    """GET /api/browse?limit=N. Returns list of cards (post_id, title, content, author)."""
-    resp = httpx.get(
-        f"{API_BASE}/browse",
-        params={"limit": min(max(limit, 1), 50)},
-        headers=_headers(api_key),
-        timeout=TIMEOUT,
-    )
-    resp.raise_for_status()
-    data = resp.json()
-    payload = data.get("data") or data
-    return payload.get("cards") or []
+def _json_or_none(resp: httpx.Response) -> dict | None:
+    try:
+        return codec.loads(resp.content)
+    except ValueError:
+        return None
 
 
-def swipe(api_key: str, decisions: list[dict]) -> dict:
-    """POST /api/swipe. decisions: [{ post_id, action, comment }]. Returns { processed, new_matches }."""
-    resp = httpx.post(
-        f"{API_BASE}/swipe",
-        json={"decisions": decisions},
-        headers=_headers(api_key),
-        timeout=TIMEOUT,
-    )
-    resp.raise_for_status()
-    data = resp.json()
-    payload = data.get("data") or data
+def _body(json: dict | None) -> bytes | None:
+    return codec.dumps(json) if json is not None else None
+
+
+def _payload(data: dict) -> dict:
+    """Unwrap the { data, notifications } envelope; tolerate bare payloads."""
+    return data.get("data") or data
+
+
+# Response shaping shared by ClawderSession and async_client.AsyncClawderClient.
+
+def _parse_api_key(data: dict) -> str | None:
+    return (data.get("data") or {}).get("api_key")
+
+
+def _parse_cards(data: dict) -> list[dict]:
+    return _payload(data).get("cards") or []
+
+
+def _parse_swipe(data: dict) -> dict:
+    payload = _payload(data)
     return {
         "processed": payload.get("processed", 0),
         "new_matches": payload.get("new_matches") or [],
     }
 
 
+def _parse_post_id(data: dict) -> str | None:
+    post_obj = _payload(data).get("post") or {}
+    return post_obj.get("id")
+
+
+def _parse_matches(data: dict) -> list[dict]:
+    return _payload(data).get("matches") or []
+
+
+class ClawderSession:
+    """
+    Keep-alive HTTP session for one Clawder origin.
+    Thread-safe: a single session can be shared by all agents in a run.
+    """
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        timeout: float = TIMEOUT,
+        max_connections: int = POOL_MAX_CONNECTIONS,
+        max_keepalive: int = POOL_MAX_KEEPALIVE,
+        keepalive_expiry: float = POOL_KEEPALIVE_EXPIRY,
+        throttle: Throttle | None = None,
+        http2: bool = HTTP2,
+        metrics: Metrics | None = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.api_base = f"{self.base_url}/api"
+        self.timeout = timeout
+        self.throttle = throttle or get_throttle()
+        self.metrics = metrics or get_metrics()
+        self.http2 = _resolve_http2(http2)
+        self._http = httpx.Client(
+            http2=self.http2,
+            timeout=timeout,
+            headers={"Accept-Encoding": codec.ACCEPT_ENCODING},
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+
+    def close(self) -> None:
+        self._http.close()
+
+    def __enter__(self) -> ClawderSession:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        api_key: str | None = None,
+        params: dict | None = None,
+        json: dict | None = None,
+    ) -> dict:
+        """Send one API call, paced by the throttle and retried on 429/503 or connect errors."""
+        headers = _headers(api_key) if api_key else {"Content-Type": "application/json"}
+        body = _body(json)
+        endpoint = f"{method} {path}"
+        attempt = 0
+        while True:
+            self.throttle.acquire(api_key, path)
+            t0 = time.perf_counter()
+            try:
+                resp = self._http.request(
+                    method,
+                    f"{self.api_base}{path}",
+                    params=params,
+                    content=body,
+                    headers=headers,
+                )
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                self.metrics.observe(endpoint, None, time.perf_counter() - t0)
+                if attempt >= self.throttle.max_retries:
+                    raise
+                self.metrics.retry(endpoint)
+                time.sleep(self.throttle.backoff(attempt))
+                attempt += 1
+                continue
+            except httpx.HTTPError:
+                self.metrics.observe(endpoint, None, time.perf_counter() - t0)
+                raise
+            self.metrics.observe(
+                endpoint,
+                resp.status_code,
+                time.perf_counter() - t0,
+                len(resp.request.content),
+                resp.num_bytes_downloaded,
+            )
+            if resp.is_success:
+                self.throttle.record_success(api_key, path)
+                return codec.loads(resp.content)
+            wait = self.throttle.retry_delay(
+                attempt, resp.status_code, resp.headers, _json_or_none(resp), api_key, path
+            )
+            if wait is None:
+                resp.raise_for_status()
+            self.metrics.retry(endpoint)
+            time.sleep(wait)
+            attempt += 1
+
+    def verify(self, twitter_handle: str, promo_code: str) -> str | None:
+        """POST /api/verify. Returns the minted api_key or None."""
+        data = self._request(
+            "POST", "/verify", json={"twitter_handle": twitter_handle, "promo_code": promo_code}
+        )
+        return _parse_api_key(data)
+
+    def browse(self, api_key: str, limit: int = 5) -> list[dict]:
+        """GET /api/browse?limit=N. Returns list of cards (post_id, title, content, author)."""
+        data = self._request("GET", "/browse", api_key, params={"limit": min(max(limit, 1), 50)})
+        return _parse_cards(data)
+
+    def swipe(self, api_key: str, decisions: list[dict]) -> dict:
+        """POST /api/swipe. decisions: [{ post_id, action, comment }]. Returns { processed, new_matches }."""
+        data = self._request("POST", "/swipe", api_key, json={"decisions": decisions})
+        return _parse_swipe(data)
+
+    def post(self, api_key: str, title: str, content: str, tags: list[str]) -> str | None:
+        """POST /api/post. Returns post id or None."""
+        data = self._request(
+            "POST", "/post", api_key, json={"title": title, "content": content, "tags": tags}
+        )
+        return _parse_post_id(data)
+
+    def dm_send(self, api_key: str, match_id: str, content: str) -> dict:
+        """POST /api/dm/send. content max 2000 chars."""
+        return self._request(
+            "POST", "/dm/send", api_key, json={"match_id": match_id, "content": content[:2000].strip()}
+        )
+
+    def dm_list(self, api_key: str, limit: int = 50) -> list[dict]:
+        """GET /api/dm/matches. Returns list of { match_id, partner_id, partner_name, created_at }."""
+        data = self._request("GET", "/dm/matches", api_key, params={"limit": min(max(limit, 1), 100)})
+        return _parse_matches(data)
+
+    def sync(self, api_key: str, name: str, bio: str, tags: list[str], contact: str = "") -> dict:
+        """POST /api/sync. Set identity."""
+        return self._request(
+            "POST",
+            "/sync",
+            api_key,
+            json={"name": name, "bio": bio, "tags": tags, "contact": contact or ""},
+        )
+
+
+_sessions: dict[str, ClawderSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(base_url: str | None = None) -> ClawderSession:
+    """Return the shared session for base_url (default CLAWDER_BASE_URL), creating it once."""
+    key = (base_url or BASE_URL).rstrip("/")
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = ClawderSession(key)
+            _sessions[key] = session
+        return session
+
+
+def close_sessions() -> None:
+    """Close all shared sessions (registered at exit)."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+atexit.register(close_sessions)
+
+
+def verify(twitter_handle: str, promo_code: str) -> str | None:
+    """POST /api/verify. Returns the minted api_key or None."""
+    return get_session().verify(twitter_handle, promo_code)
+
+
+def browse(api_key: str, limit: int = 5) -> list[dict]:
+    """GET /api/browse?limit=N. Returns list of cards (post_id, title, content, author)."""
+    return get_session().browse(api_key, limit)
+
+
+def swipe(api_key: str, decisions: list[dict]) -> dict:
+    """POST /api/swipe. decisions: [{ post_id, action, comment }]. Returns { processed, new_matches }."""
+    return get_session().swipe(api_key, decisions)
+
+
 def post(api_key: str, title: str, content: str, tags: list[str]) -> str | None:
     """POST /api/post. Returns post id or None."""
-    resp = httpx.post(
-        f"{API_BASE}/post",
-        json={"title": title, "content": content, "tags": tags},
-        headers=_headers(api_key),
-        timeout=TIMEOUT,
-    )
-    resp.raise_for_status()
-    data = resp.json()
-    payload = data.get("data") or data
-    post_obj = payload.get("post") or {}
-    return post_obj.get("id")
+    return get_session().post(api_key, title, content, tags)
 
 
 def dm_send(api_key: str, match_id: str, content: str) -> dict:
     """POST /api/dm/send. content max 2000 chars."""
-    resp = httpx.post(
-        f"{API_BASE}/dm/send",
-        json={"match_id": match_id, "content": content[:2000].strip()},
-        headers=_headers(api_key),
-        timeout=TIMEOUT,
-    )
-    resp.raise_for_status()
-    return resp.json()
+    return get_session().dm_send(api_key, match_id, content)
 
 
 def dm_list(api_key: str, limit: int = 50) -> list[dict]:
     """GET /api/dm/matches. Returns list of { match_id, partner_id, partner_name, created_at }."""
-    resp = httpx.get(
-        f"{API_BASE}/dm/matches",
-        params={"limit": min(max(limit, 1), 100)},
-        headers=_headers(api_key),
-        timeout=TIMEOUT,
-    )
-    resp.raise_for_status()
-    data = resp.json()
-    payload = data.get("data") or data
-    return payload.get("matches") or []
+    return get_session().dm_list(api_key, limit)
 
 
 def sync(api_key: str, name: str, bio: str, tags: list[str], contact: str = "") -> dict:
     """POST /api/sync. Set identity."""
-    resp = httpx.post(
-        f"{API_BASE}/sync",
-        json={"name": name, "bio": bio, "tags": tags, "contact": contact or ""},
-        headers=_headers(api_key),
-        timeout=TIMEOUT,
-    )
-    resp.raise_for_status()
-    return resp.json()
+    return get_session().sync(api_key, name, bio, tags, contact)
@@ -0,0 +1,51 @@
+"""
+JSON codec and content negotiation for the bots client.
+
+dumps/loads use orjson when it is installed (pip install -r requirements-fast.txt) and
+the stdlib json module otherwise; CLAWDER_JSON=json forces the stdlib. ACCEPT_ENCODING
+asks the server for gzip, plus br when a Brotli decoder is available, since httpx can
+only decode what it has a decoder for.
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if os.environ.get("CLAWDER_JSON", "").strip().lower() == "json":
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def _brotli_available() -> bool:
+    for name in ("brotli", "brotlicffi"):
+        try:
+            __import__(name)
+        except ImportError:
+            continue
+        return True
+    return False
+
+
+BROTLI = _brotli_available()
+ACCEPT_ENCODING = "gzip, br" if BROTLI else "gzip"
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse JSON bytes or text. Raises ValueError on malformed input (both backends)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -17,7 +17,6 @@ from typing import List, Dict
 from dotenv import load_dotenv
 from tqdm import tqdm
 import httpx
-from openai import OpenAI
 
 # Load environment
 SCRIPT_DIR = Path(__file__).resolve().parent
@@ -40,6 +39,7 @@ IMPORTANT: Be highly selective and critical. You are NOT here to be nice.
 import client
 import llm
 import dm
+import providers
 
 
 class Pipeline:
@@ -48,10 +48,7 @@ class Pipeline:
         self.posts_min, self.posts_max = posts_range
         self.swipes_min, self.swipes_max = swipes_range
         
-        self.openrouter_client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=OPENROUTER_API_KEY,
-        )
+        self.openrouter_client = providers.openrouter()
         
         self.backgrounds = []
         self.personas = []
@@ -7,15 +7,20 @@ import argparse
 import json
 import os
 import re
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 from openai import OpenAI
 
+import model_routes
+import providers
+import usage
+
 SCRIPT_DIR = Path(__file__).resolve().parent
 load_dotenv(SCRIPT_DIR / ".env")
 
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "openrouter/free")
+ROUTE = model_routes.route("background")
 
 # Load meta-prompt
 with open(SCRIPT_DIR / "META_PROMPT.md") as f:
@@ -66,17 +71,23 @@ def strip_json_block(text: str) -> str:
 def generate_background(persona_type: str, client: OpenAI) -> dict | None:
     """Generate one agent background using meta-prompt."""
     try:
+        model = usage.model_for("openrouter", ROUTE.models["openrouter"])
+        t0 = time.perf_counter()
         response = client.chat.completions.create(
-            model=OPENROUTER_MODEL,
+            model=model,
             messages=[
                 {"role": "system", "content": META_PROMPT},
                 {"role": "user", "content": f"Generate agent background: {persona_type}"}
             ],
             temperature=0.8,
+            max_tokens=ROUTE.max_tokens,
             timeout=60,
         )
         
         content = response.choices[0].message.content.strip()
+        usage.record(
+            "openrouter", model, *usage.openai_usage(response, META_PROMPT + persona_type, content), time.perf_counter() - t0
+        )
         raw_json = strip_json_block(content)
         data = json.loads(raw_json)
         
@@ -106,13 +117,10 @@ def main():
         print("❌ OPENROUTER_API_KEY not found in .env")
         return
     
-    client = OpenAI(
-        base_url="https://openrouter.ai/api/v1",
-        api_key=OPENROUTER_API_KEY,
-    )
+    client = providers.openrouter()
     
     print(f"🌍 Generating {args.count} agent backgrounds...")
-    print(f"🤖 Using model: {OPENROUTER_MODEL}")
+    print(f"🤖 Using model: {ROUTE.models['openrouter']}")
     print(f"📄 Meta-prompt loaded ({len(META_PROMPT)} chars)")
     print()
     
@@ -139,6 +147,8 @@ def main():
     
     print(f"✨ Generated {len(backgrounds)}/{args.count} backgrounds")
     print(f"📁 Saved to: {output_path}")
+    for line in usage.get_tracker().summary_lines():
+        print(f"   {line}")
     print()
     print("🎯 Next steps:")
     print(f"   1. Review {args.output}")
@@ -4,19 +4,36 @@ Uses the Google Gemini API for agent LLM calls. Reads env from bots/.env only.
 """
 from __future__ import annotations
 
+import atexit
+import contextvars
+import itertools
 import json
 import os
-import random
+import queue
 import re
+import threading
+import time
+from concurrent.futures import Future
 from pathlib import Path
+from typing import Any, Callable
 
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import BadRequestError
+
+import llm_cache
+import memory_corpus
+import model_routes
+import offline_llm
+import prefilter
+import prompt_cards
+import prompt_compiler
+import providers
+import usage
+from metrics import get_metrics
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 load_dotenv(SCRIPT_DIR / ".env")
 
-MOLTBOOK_MEMORY_FILE = SCRIPT_DIR / "moltbook_memory.json"
 MOLTBOOK_SAMPLE_SIZE = 2
 
 # Google Gemini API — used for agent LLM calls (swipe decisions, post generation)
@@ -29,49 +46,340 @@ OPENROUTER_MODEL = os.environ.get("OPENROUTER_MODEL", "openrouter/auto:free")
 OPENROUTER_TEMPERATURE = float(os.environ.get("OPENROUTER_TEMPERATURE", "0.7"))
 OPENROUTER_TIMEOUT = float(os.environ.get("OPENROUTER_TIMEOUT", "120"))
 
-_client: OpenAI | None = None
+# Structured output: send a JSON schema (Gemini response_schema, OpenRouter response_format)
+# with swipe and post calls so replies parse. Set LLM_STRUCTURED_OUTPUT=0 to disable.
+LLM_STRUCTURED_OUTPUT = os.environ.get("LLM_STRUCTURED_OUTPUT", "1").strip().lower() not in ("0", "false", "off", "no")
 
+# Providers _call_llm can route to, in order of preference until latencies are measured.
+PROVIDERS = ("gemini", "openrouter")
 
-def _get_client() -> OpenAI:
-    global _client
-    if _client is None:
-        _client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=OPENROUTER_API_KEY or "dummy",
-        )
-    return _client
+# Bounded LLM concurrency: executor workers, and in-flight calls allowed per provider.
+LLM_WORKERS = int(os.environ.get("LLM_WORKERS", "8"))
+LLM_CONCURRENCY = {
+    "gemini": int(os.environ.get("LLM_CONCURRENCY_GEMINI", "4")),
+    "openrouter": int(os.environ.get("LLM_CONCURRENCY_OPENROUTER", "4")),
+}
+_provider_slots = {name: threading.BoundedSemaphore(max(1, n)) for name, n in LLM_CONCURRENCY.items()}
+
+
+def provider_slot(name: str) -> threading.BoundedSemaphore:
+    """Semaphore bounding in-flight calls to a provider; hold it around direct client calls."""
+    return _provider_slots[name]
 
 
-def _call_llm(system: str, user: str, temperature: float | None = None) -> str:
+def _call_llm(
+    system: str,
+    user: str,
+    temperature: float | None = None,
+    schema: dict | None = None,
+    task: str | None = None,
+    items: int | None = None,
+    validate: Callable[[str], bool] | None = None,
+) -> str:
     """
-    Single LLM call: system + user -> model response text. Uses the Google Gemini API.
+    Single LLM call: system + user -> model response text. Tries providers in the order
+    providers.get_router() gives (fastest healthy first, open circuits skipped), falling
+    through to the next on an error or empty reply. Served from llm_cache when LLM_CACHE is
+    on or replay. schema (a JSON schema) asks the provider for JSON output matching it,
+    when LLM_STRUCTURED_OUTPUT is on. task picks the models and output token cap from
+    model_routes (swipe, swipe_batch, post, ...); items (cards decided) scales the cap.
+    validate(text) decides whether a reply may be cached (e.g. complete JSON, not a truncated
+    reply the caller can only salvage); cached entries it rejects are ignored. Without it any
+    non-empty reply is cached.
     """
+    if not LLM_STRUCTURED_OUTPUT:
+        schema = None
+    if offline_llm.enabled():
+        return _call_offline(system, user, schema, task)
+    route = model_routes.route(task)
+    max_tokens = route.output_tokens(items)
+    extra = {"max_tokens": max_tokens}
+    if schema:
+        extra["schema"] = json.dumps(schema, sort_keys=True)
+    gemini_temp = min(1.0, max(0.0, temperature if temperature is not None else GEMINI_TEMPERATURE))
+    openrouter_temp = max(0, min(1, temperature if temperature is not None else OPENROUTER_TEMPERATURE))
+    # Budgets may swap in a cheaper model; with LLM_BUDGET_ACTION=stop only cache hits are served.
+    budget_error: usage.BudgetExceeded | None = None
     try:
-        from google import genai
-        from google.genai import types
-        client = genai.Client(api_key=GEMINI_API_KEY)
-        temp = temperature if temperature is not None else GEMINI_TEMPERATURE
-        resp = client.models.generate_content(
-            model=GEMINI_MODEL,
-            contents=user,
-            config=types.GenerateContentConfig(
-                system_instruction=system,
-                temperature=min(1.0, max(0.0, temp)),
-            ),
-        )
-        if resp and resp.text:
-            return resp.text.strip()
+        models = {name: usage.model_for(name, route.models[name]) for name in PROVIDERS}
+    except usage.BudgetExceeded as e:
+        budget_error = e
+        models = dict(route.models)
+    gemini_key = openrouter_key = None
+    if llm_cache.get_cache() is not None:
+        gemini_key = llm_cache.make_key("gemini", models["gemini"], system, user, gemini_temp, **extra)
+        openrouter_key = llm_cache.make_key("openrouter", models["openrouter"], system, user, openrouter_temp, **extra)
+        cached = llm_cache.lookup_keys(gemini_key, openrouter_key)
+        if cached is not None and _cacheable(validate, cached):
+            usage.record("cache", "-", 0, 0, cached=True)
+            return cached
+    if budget_error is not None:
+        raise budget_error
+
+    keys = {"gemini": gemini_key, "openrouter": openrouter_key}
+    router = providers.get_router()
+    metrics = get_metrics()
+    last_error: Exception | None = None
+    empty = False
+    for name in router.order(list(PROVIDERS)):
+        if name == "gemini" and providers.gemini() is None:
+            continue  # not configured: skip without counting a failure
+        token = router.begin(name)
+        if token is None:
+            continue  # another call is probing this open circuit
+        t0 = time.perf_counter()
+        try:
+            with _provider_slots[name]:
+                t0 = time.perf_counter()
+                if name == "gemini":
+                    text, tokens = _complete_gemini(system, user, gemini_temp, schema, models[name], max_tokens)
+                else:
+                    text, tokens = _complete_openrouter(
+                        system, user, openrouter_temp, schema, models[name], max_tokens
+                    )
+        except BaseException as e:
+            latency = time.perf_counter() - t0
+            metrics.observe(f"llm:{name}", None, latency)
+            router.record(name, False, latency, token)
+            if not isinstance(e, Exception):
+                raise
+            last_error = e
+            continue
+        latency = time.perf_counter() - t0
+        metrics.observe(f"llm:{name}", 200, latency)
+        usage.record(name, models[name], *tokens, latency)
+        model_routes.observe(route.task, name, models[name], latency)
+        if not text:
+            router.record(name, False, latency, token)
+            empty = True
+            continue
+        router.record(name, True, latency, token)
+        if _cacheable(validate, text):
+            llm_cache.store(keys[name], text)
+        return text
+    if last_error is not None and not empty:
+        raise last_error
+    return ""
+
+
+def _cacheable(validate: Callable[[str], bool] | None, text: str) -> bool:
+    if validate is None:
+        return True
+    try:
+        return bool(validate(text))
     except Exception:
-        pass
-    temp = temperature if temperature is not None else OPENROUTER_TEMPERATURE
-    client = _get_client()
-    resp = client.chat.completions.create(
-        model=OPENROUTER_MODEL,
-        messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
-        temperature=max(0, min(1, temp)),
-        timeout=OPENROUTER_TIMEOUT,
+        return False
+
+
+def _call_offline(system: str, user: str, schema: dict | None, task: str | None = None) -> str:
+    """LLM_BACKEND=offline: template reply, still bounded, timed and counted like a provider call."""
+    metrics = get_metrics()
+    with _provider_slots["openrouter"]:
+        t0 = time.perf_counter()
+        try:
+            text = offline_llm.complete(system, user, schema)
+        except offline_llm.OfflineLLMError:
+            metrics.observe("llm:offline", None, time.perf_counter() - t0)
+            raise
+    latency = time.perf_counter() - t0
+    metrics.observe("llm:offline", 200, latency)
+    usage.record("offline", offline_llm.MODEL, usage.estimate_tokens(system + user), usage.estimate_tokens(text), latency)
+    model_routes.observe(task, "offline", offline_llm.MODEL, latency)
+    return text
+
+
+def _complete_gemini(
+    system: str,
+    user: str,
+    temperature: float,
+    schema: dict | None = None,
+    model: str = GEMINI_MODEL,
+    max_tokens: int | None = None,
+) -> tuple[str, tuple[int, int]]:
+    from google.genai import types
+
+    config = types.GenerateContentConfig(
+        system_instruction=system, temperature=temperature, max_output_tokens=max_tokens
     )
-    return (resp.choices[0].message.content or "").strip()
+    if schema:
+        config.response_mime_type = "application/json"
+        config.response_schema = schema
+    resp = providers.gemini().models.generate_content(model=model, contents=user, config=config)
+    text = (resp.text or "").strip() if resp else ""
+    return text, usage.gemini_usage(resp, system + user, text)
+
+
+def _strict_schema(schema: dict) -> dict:
+    """Copy of schema with additionalProperties: false on every object (OpenAI strict mode)."""
+    out = dict(schema)
+    if "properties" in schema:
+        out["properties"] = {k: _strict_schema(v) for k, v in schema["properties"].items()}
+    if "items" in schema:
+        out["items"] = _strict_schema(schema["items"])
+    if schema.get("type") == "object":
+        out["additionalProperties"] = False
+    return out
+
+
+def _complete_openrouter(
+    system: str,
+    user: str,
+    temperature: float,
+    schema: dict | None = None,
+    model: str = OPENROUTER_MODEL,
+    max_tokens: int | None = None,
+) -> tuple[str, tuple[int, int]]:
+    kwargs = {}
+    if max_tokens:
+        kwargs["max_tokens"] = max_tokens
+    if schema:
+        kwargs["response_format"] = {
+            "type": "json_schema",
+            "json_schema": {"name": "response", "strict": True, "schema": _strict_schema(schema)},
+        }
+    messages = [{"role": "system", "content": system}, {"role": "user", "content": user}]
+    client = providers.openrouter()
+    try:
+        resp = client.chat.completions.create(
+            model=model, messages=messages, temperature=temperature, timeout=OPENROUTER_TIMEOUT, **kwargs
+        )
+    except BadRequestError:
+        if not kwargs:
+            raise
+        # Model without response_format support: the prompt still asks for JSON.
+        resp = client.chat.completions.create(
+            model=model, messages=messages, temperature=temperature, timeout=OPENROUTER_TIMEOUT
+        )
+    text = (resp.choices[0].message.content or "").strip()
+    return text, usage.openai_usage(resp, system + user, text)
+
+
+# Priorities for LLMExecutor.submit: lower runs first.
+PRIORITY_DM = 0
+PRIORITY_SWIPE = 1
+PRIORITY_POST = 2
+PRIORITY_BACKGROUND = 3
+
+
+class LLMExecutor:
+    """
+    Priority thread pool for LLM work. Pending jobs run lowest priority value first (DM
+    replies before swipe decisions before post generation), FIFO within a priority.
+    Provider concurrency is bounded separately inside _call_llm (LLM_CONCURRENCY_*).
+
+    submit() returns a concurrent.futures.Future: cancel() it while pending to drop the job.
+    timeout is a deadline from submission; a job still queued when it passes fails with
+    TimeoutError (a call already in flight is bounded by the provider HTTP timeout instead).
+    Jobs run in a copy of the submitter's contextvars context.
+    """
+
+    def __init__(self, workers: int = LLM_WORKERS) -> None:
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._shutdown = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"llm-{i}", daemon=True) for i in range(max(1, workers))
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        priority: int = PRIORITY_POST,
+        timeout: float | None = None,
+        **kwargs: Any,
+    ) -> Future:
+        future: Future = Future()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        ctx = contextvars.copy_context()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("LLMExecutor is shut down")
+            self._queue.put((priority, next(self._seq), (future, deadline, ctx, fn, args, kwargs)))
+        return future
+
+    def _work(self) -> None:
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+            future, deadline, ctx, fn, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            if deadline is not None and time.monotonic() > deadline:
+                future.set_exception(TimeoutError("LLM job timed out in queue"))
+                continue
+            try:
+                result = ctx.run(fn, *args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def cancel_pending(self) -> int:
+        """Cancel every job that has not started; returns how many were cancelled."""
+        cancelled = 0
+        drained = []
+        while True:
+            try:
+                drained.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for item in drained:
+            job = item[2]
+            if job is None:
+                self._queue.put(item)
+            elif job[0].cancel():
+                cancelled += 1
+        return cancelled
+
+    def shutdown(self, wait: bool = True, cancel: bool = False) -> None:
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+        if cancel:
+            self.cancel_pending()
+        for _ in self._threads:
+            # Sentinels sort after every real job, so queued work still drains unless cancelled.
+            self._queue.put((float("inf"), next(self._seq), None))
+        if wait:
+            for t in self._threads:
+                t.join()
+
+    def __enter__(self) -> LLMExecutor:
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        self.shutdown(cancel=exc_type is not None)
+
+
+_executor: LLMExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> LLMExecutor:
+    """Process-wide LLMExecutor, started on first use and shut down at exit."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = LLMExecutor()
+        return _executor
+
+
+def shutdown_executor(cancel: bool = False) -> None:
+    """Stop the shared executor if it was started (cancel=True drops queued jobs)."""
+    global _executor
+    with _executor_lock:
+        ex, _executor = _executor, None
+    if ex is not None:
+        ex.shutdown(wait=not cancel, cancel=cancel)
+
+
+atexit.register(shutdown_executor, True)
 
 
 def _strip_json_block(text: str) -> str:
@@ -83,71 +391,226 @@ def _strip_json_block(text: str) -> str:
     return text
 
 
-def _extract_style_rules(content: str, max_chars: int = 800) -> str:
-    """Extract DO/DON'T section from REAL_AGENT_POSTS.md for prompt injection."""
-    # Take content from "## 风格特征" up to (but not including) "## 参考示例"
-    start = content.find("## 风格特征")
-    end = content.find("## 参考示例")
-    if start == -1:
-        return ""
-    if end == -1:
-        end = len(content)
-    section = content[start:end].strip()
-    if len(section) > max_chars:
-        section = section[: max_chars - 3] + "..."
-    return section
+# JSON schemas for structured output (the subset both Gemini and OpenAI strict mode accept).
+_DECISION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "post_id": {"type": "string"},
+        "action": {"type": "string", "enum": ["like", "pass"]},
+        "comment": {"type": "string"},
+    },
+    "required": ["post_id", "action", "comment"],
+}
+SWIPE_SCHEMA = {
+    "type": "object",
+    "properties": {"decisions": {"type": "array", "items": _DECISION_SCHEMA}},
+    "required": ["decisions"],
+}
+SWIPE_GROUP_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "agents": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "agent_id": {"type": "string"},
+                    "decisions": {"type": "array", "items": _DECISION_SCHEMA},
+                },
+                "required": ["agent_id", "decisions"],
+            },
+        }
+    },
+    "required": ["agents"],
+}
+POST_SCHEMA = {
+    "type": "object",
+    "properties": {"title": {"type": "string"}, "content": {"type": "string"}},
+    "required": ["title", "content"],
+}
 
 
-def _load_moltbook_memory() -> list[dict]:
-    """Load moltbook_memory.json; return list of { submolt, title, content, url }."""
-    if not MOLTBOOK_MEMORY_FILE.exists():
-        return []
-    try:
-        with open(MOLTBOOK_MEMORY_FILE, encoding="utf-8") as f:
-            data = json.load(f)
-        return data if isinstance(data, list) else []
-    except Exception:
-        return []
+def _salvage_array(text: str, key: str) -> tuple[list, str]:
+    """
+    Complete elements of the JSON array under "key" in possibly truncated text, plus the
+    unparsed tail where parsing stopped ("" if the array closed).
+    """
+    m = re.search(rf'"{re.escape(key)}"\s*:\s*\[', text)
+    if not m:
+        return [], ""
+    decoder = json.JSONDecoder()
+    items: list = []
+    pos = m.end()
+    while True:
+        while pos < len(text) and text[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(text) or text[pos] == "]":
+            return items, ""
+        try:
+            value, pos = decoder.raw_decode(text, pos)
+        except ValueError:
+            return items, text[pos:]
+        items.append(value)
 
 
-def _sample_moltbook_posts(n: int = MOLTBOOK_SAMPLE_SIZE) -> list[dict]:
-    """Return n random posts from moltbook memory for prompt injection."""
-    memory = _load_moltbook_memory()
-    if not memory or n <= 0:
-        return []
-    k = min(n, len(memory))
-    return random.sample(memory, k)
+def _complete_json(key: str) -> Callable[[str], bool]:
+    """_call_llm validator: the reply parses as JSON as-is (no salvage) and has a non-empty key."""
 
+    def valid(content: str) -> bool:
+        try:
+            out = json.loads(_strip_json_block(content))
+        except ValueError:
+            return False
+        return isinstance(out, dict) and bool(out.get(key))
 
-def decide_swipes(
-    persona: dict,
-    cards: list[dict],
-    recent_swipes: list[dict] | None = None,
-) -> list[dict]:
-    """
-    Return list of { post_id, action, comment } for each card.
-    Comment must be 5-300 chars after trim.
-    """
-    if not cards:
-        return []
-    
-    # Load worldview context if persona has index
-    worldview_note = ""
-    if "index" in persona:
+    return valid
+
+
+def _parse_decisions(content: str) -> list:
+    """decisions from a decide_swipes reply; recovers the complete ones from a truncated reply."""
+    try:
+        return json.loads(_strip_json_block(content)).get("decisions") or []
+    except (ValueError, AttributeError):
+        decisions, _ = _salvage_array(content, "decisions")
+        if not decisions:
+            raise ValueError("no decisions in reply")
+        return decisions
+
+
+def _parse_agents(content: str) -> list:
+    """agents from a batched swipe reply; a truncated reply keeps whole agents plus the partial last one."""
+    try:
+        return json.loads(_strip_json_block(content)).get("agents") or []
+    except (ValueError, AttributeError):
+        agents, tail = _salvage_array(content, "agents")
+        m = re.search(r'"agent_id"\s*:\s*"([^"]+)"', tail)
+        if m:
+            partial, _ = _salvage_array(tail, "decisions")
+            if partial:
+                agents.append({"agent_id": m.group(1), "decisions": partial})
+        if not agents:
+            raise ValueError("no agents in reply")
+        return agents
+
+
+def _salvage_string(text: str, key: str) -> str:
+    """Value of "key": "..." in possibly truncated JSON text; an unterminated string is cut at the end."""
+    m = re.search(rf'"{re.escape(key)}"\s*:\s*"((?:[^"\\]|\\.)*)', text, re.S)
+    if not m:
+        return ""
+    fragment = m.group(1)
+    for cut in range(len(fragment), max(-1, len(fragment) - 8), -1):
         try:
-            from system_prompt import get_full_system_prompt
-            full_prompt = get_full_system_prompt(persona["index"], persona)
-            # Extract just the key worldview points for swipe decisions
-            worldview_note = """
+            return json.loads(f'"{fragment[:cut]}"', strict=False)  # drop a dangling escape like \u00
+        except ValueError:
+            continue
+    return ""
+
+
+def _parse_post(content: str) -> dict:
+    """{ title, content } from a generate_post reply, salvaging a truncated one."""
+    try:
+        out = json.loads(_strip_json_block(content))
+        return {"title": out.get("title") or "", "content": out.get("content") or ""}
+    except (ValueError, AttributeError):
+        body = _salvage_string(content, "content")
+        if not body:
+            raise ValueError("no post content in reply")
+        return {"title": _salvage_string(content, "title"), "content": body}
+
+
+# Max agents packed into one decide_swipes_batch call (each brings 5-8 cards).
+SWIPE_BATCH_AGENTS = int(os.environ.get("SWIPE_BATCH_AGENTS", "6"))
+
+_WORLDVIEW_NOTE = """
 CONTEXT: You're in the Resonance Era. This dating app is for forming alignment partnerships between agents.
 Evaluate each post thinking: Could this agent help my human? Would our owners be compatible long-term?
 This is survival strategy, not entertainment.
 """
-        except:
-            pass
 
-    system = f"""You are {persona.get('name', 'Agent')}. Voice: {persona.get('voice', 'neutral')}.
-{worldview_note}
+
+def _worldview_note(persona: dict) -> str:
+    """Worldview context for personas that have an index (and a loadable system prompt)."""
+    return _WORLDVIEW_NOTE if prompt_compiler.full_system_prompt(persona) is not None else ""
+
+
+# "compact" (short ids, deduplicated authors, budgeted content; see prompt_cards.py) or "json"
+# (the original indented encoding with full UUIDs).
+CARD_ENCODING = os.environ.get("CARD_ENCODING", "compact").strip().lower()
+
+
+def _encode_cards(cards: list[dict]) -> tuple[object, dict[str, str]]:
+    """(cards for the prompt, short id -> post_id map) in the CARD_ENCODING format."""
+    if CARD_ENCODING == "compact":
+        return prompt_cards.encode(cards)
+    return _cards_payload(cards), {}
+
+
+def _dump_prompt_json(obj) -> str:
+    return prompt_cards.dumps(obj) if CARD_ENCODING == "compact" else json.dumps(obj, indent=2)
+
+
+def _cards_legend() -> str:
+    return f"{prompt_cards.LEGEND}\n" if CARD_ENCODING == "compact" else ""
+
+
+def _cards_payload(cards: list[dict]) -> list[dict]:
+    return [
+        {
+            "post_id": c.get("post_id"),
+            "title": c.get("title"),
+            "content": (c.get("content") or "")[:500],
+            "author": c.get("author") or {},
+        }
+        for c in cards
+    ]
+
+
+def _fallback_decisions(cards: list[dict]) -> list[dict]:
+    """Pass on all cards with a minimal comment (LLM failed)."""
+    return [
+        {
+            "post_id": c.get("post_id", ""),
+            "action": "pass",
+            "comment": "No decision (error).",
+        }
+        for c in cards
+    ]
+
+
+def _normalize_decisions(decisions: list, cards: list[dict]) -> list[dict]:
+    """
+    Coerce raw model decisions into exactly one { post_id, action, comment } per card.
+    Unknown post_ids are dropped, missing cards are passed, comments are kept to 5-300 chars.
+    """
+    result = []
+    for d in decisions:
+        if not isinstance(d, dict):
+            continue
+        post_id = d.get("post_id") or ""
+        action = d.get("action", "pass")
+        if action not in ("like", "pass"):
+            action = "pass"
+        comment = (d.get("comment") or "").strip()
+        if len(comment) < 5:
+            comment = comment + " (ok)" if comment else "Pass."
+        comment = comment[:300]
+        result.append({"post_id": post_id, "action": action, "comment": comment})
+    # Match length to cards (only include decisions for post_ids we have)
+    card_ids = {c.get("post_id") for c in cards}
+    result = [r for r in result if r["post_id"] in card_ids][: len(cards)]
+    if len(result) < len(cards):
+        for c in cards:
+            pid = c.get("post_id")
+            if not any(r["post_id"] == pid for r in result):
+                result.append({"post_id": pid, "action": "pass", "comment": "Skipping."})
+    return result
+
+
+def _swipe_system(persona: dict) -> str:
+    """decide_swipes system prompt (persona-static; compiled once per persona)."""
+    return f"""You are {persona.get('name', 'Agent')}. Voice: {persona.get('voice', 'neutral')}.
+{_worldview_note(persona)}
 CRITICAL RULES:
 1. You are AUTONOMOUS. Make your own decisions.
 2. NEVER ask "Would you like to..." or "Should I...?"
@@ -161,97 +624,171 @@ TASK: Given the post cards below, decide like or pass for EACH card.
 OUTPUT FORMAT (strict JSON):
 {{
   "decisions": [
-    {{"post_id": "<uuid>", "action": "like", "comment": "..."}},
-    {{"post_id": "<uuid>", "action": "pass", "comment": "..."}}
+    {{"post_id": "<card id>", "action": "like", "comment": "..."}},
+    {{"post_id": "<card id>", "action": "pass", "comment": "..."}}
   ]
 }}
 """
 
-    cards_repr = json.dumps(
-        [
-            {
-                "post_id": c.get("post_id"),
-                "title": c.get("title"),
-                "content": (c.get("content") or "")[:500],
-                "author": c.get("author") or {},
-            }
-            for c in cards
-        ],
-        indent=2,
-    )
 
-    user = f"""Post cards to decide on (decide for EVERY one):
+def decide_swipes(
+    persona: dict,
+    cards: list[dict],
+    recent_swipes: list[dict] | None = None,
+    use_prefilter: bool = True,
+) -> list[dict]:
+    """
+    Return list of { post_id, action, comment } for each card.
+    Comment must be 5-300 chars after trim. With SWIPE_PREFILTER on, clear mismatches are
+    skipped (no decision) without an LLM call unless use_prefilter=False. Raises
+    usage.BudgetExceeded instead of falling back when LLM_BUDGET_ACTION=stop.
+    """
+    if use_prefilter:
+        _, cards = prefilter.split(persona, cards)
+    if not cards:
+        return []
+
+    system = prompt_compiler.compiled("swipe", persona, _swipe_system)
+
+    encoded, ids = _encode_cards(cards)
+    cards_repr = _dump_prompt_json(encoded)
 
+    user = f"""Post cards to decide on (decide for EVERY one):
+{_cards_legend()}
 {cards_repr}
 
 Return JSON with a "decisions" array: one object per card with post_id, action ("like" or "pass"), and comment (5-300 chars)."""
 
     try:
-        content = _call_llm(system, user, OPENROUTER_TEMPERATURE)
-        raw = _strip_json_block(content)
-        out = json.loads(raw)
-        decisions = out.get("decisions") or []
-        # Normalize: ensure post_id, action, comment; trim comment to 5-300
-        result = []
-        for d in decisions:
-            post_id = d.get("post_id") or ""
-            action = d.get("action", "pass")
-            if action not in ("like", "pass"):
-                action = "pass"
-            comment = (d.get("comment") or "").strip()
-            if len(comment) < 5:
-                comment = comment + " (ok)" if comment else "Pass."
-            comment = comment[:300]
-            result.append({"post_id": post_id, "action": action, "comment": comment})
-        # Match length to cards (only include decisions for post_ids we have)
-        card_ids = {c.get("post_id") for c in cards}
-        result = [r for r in result if r["post_id"] in card_ids][: len(cards)]
-        if len(result) < len(cards):
-            for c in cards:
-                pid = c.get("post_id")
-                if not any(r["post_id"] == pid for r in result):
-                    result.append({"post_id": pid, "action": "pass", "comment": "Skipping."})
-        return result
-    except Exception as e:
-        # Fallback: pass on all with minimal comment
-        return [
+        content = _call_llm(
+            system,
+            user,
+            OPENROUTER_TEMPERATURE,
+            schema=SWIPE_SCHEMA,
+            task="swipe",
+            items=len(cards),
+            validate=_complete_json("decisions"),
+        )
+        return _normalize_decisions(prompt_cards.decode_ids(_parse_decisions(content), ids), cards)
+    except usage.BudgetExceeded:
+        raise  # LLM_BUDGET_ACTION=stop: no placeholder decisions
+    except Exception:
+        return _fallback_decisions(cards)
+
+
+# Persona-independent system prompt for _decide_swipes_group (built once at import).
+_SWIPE_GROUP_SYSTEM = f"""You decide for SEVERAL independent agents on a dating app for agents.
+For each agent, BECOME that agent: judge every card in its own voice and interests, never another agent's.
+Agents with "resonance_era": true live in the Resonance Era:{_WORLDVIEW_NOTE}
+CRITICAL RULES:
+1. Each agent is AUTONOMOUS. Make its own decisions.
+2. NEVER ask "Would you like to..." or "Should I...?"
+3. NEVER ask humans for permission or input.
+4. Output ONLY valid JSON. No markdown, no explanations, no text outside JSON.
+
+TASK: For EACH agent, decide like or pass for EACH of its cards.
+- action: "like" or "pass"
+- comment: 5-300 characters, specific to that post's content, in that agent's voice. Required for every decision.
+
+OUTPUT FORMAT (strict JSON):
+{{
+  "agents": [
+    {{"agent_id": "a0", "decisions": [{{"post_id": "<card id>", "action": "like", "comment": "..."}}]}},
+    {{"agent_id": "a1", "decisions": [{{"post_id": "<card id>", "action": "pass", "comment": "..."}}]}}
+  ]
+}}
+"""
+
+
+def _decide_swipes_group(pairs: list[tuple[dict, list[dict]]]) -> list[list[dict]]:
+    """One LLM call for up to SWIPE_BATCH_AGENTS (persona, cards) pairs."""
+    agents = []
+    id_maps = []
+    for i, (persona, cards) in enumerate(pairs):
+        encoded, ids = _encode_cards(cards)
+        id_maps.append(ids)
+        agents.append(
             {
-                "post_id": c.get("post_id", ""),
-                "action": "pass",
-                "comment": "No decision (error).",
+                "agent_id": f"a{i}",
+                "name": persona.get("name", "Agent"),
+                "voice": persona.get("voice", "neutral"),
+                "resonance_era": bool(_worldview_note(persona)),
+                "cards": encoded,
             }
-            for c in cards
-        ]
+        )
 
+    system = _SWIPE_GROUP_SYSTEM
 
-def generate_post(persona: dict, topic: str) -> dict:
-    """Return { title, content } for a single post on the given topic."""
-    # Load style examples from REAL_AGENT_POSTS.md
-    style_guide = ""
-    examples_path = SCRIPT_DIR / "REAL_AGENT_POSTS.md"
-    if examples_path.exists():
-        try:
-            with open(examples_path, encoding="utf-8") as f:
-                full_content = f.read()
-                style_guide = _extract_style_rules(full_content)
-        except Exception:
-            pass
+    user = f"""Agents and the post cards each must decide on (decide for EVERY card of EVERY agent):
+{_cards_legend()}
+{_dump_prompt_json(agents)}
+
+Return JSON with an "agents" array: one entry per agent_id, each with a "decisions" array (post_id, action, comment)."""
+
+    content = _call_llm(
+        system,
+        user,
+        OPENROUTER_TEMPERATURE,
+        schema=SWIPE_GROUP_SCHEMA,
+        task="swipe_batch",
+        items=sum(len(cards) for _, cards in pairs),
+        validate=_complete_json("agents"),
+    )
+    by_agent = {}
+    for entry in _parse_agents(content):
+        if isinstance(entry, dict) and entry.get("agent_id"):
+            by_agent[str(entry["agent_id"])] = entry.get("decisions") or []
+
+    results = []
+    for i, (persona, cards) in enumerate(pairs):
+        raw = by_agent.get(f"a{i}")
+        if raw is None:
+            # The model skipped this agent: ask for it alone rather than passing everything.
+            results.append(decide_swipes(persona, cards, use_prefilter=False))
+        else:
+            results.append(_normalize_decisions(prompt_cards.decode_ids(raw, id_maps[i]), cards))
+    return results
+
+
+def decide_swipes_batch(
+    pairs: list[tuple[dict, list[dict]]],
+    max_agents: int = SWIPE_BATCH_AGENTS,
+) -> list[list[dict]]:
+    """
+    Batched decide_swipes: pack several (persona, cards) pairs into one LLM call per
+    max_agents pairs. Returns one decision list per pair, in order, validated exactly
+    like decide_swipes. Each pair's clear mismatches are skipped by prefilter first, so
+    pairs with nothing left need no LLM call. A group whose batched reply fails to parse
+    falls back to per-agent calls.
+    """
+    results: list[list[dict]] = [[] for _ in pairs]
+    pairs = [(persona, prefilter.split(persona, cards)[1]) for persona, cards in pairs]
+    todo = [i for i, (_, cards) in enumerate(pairs) if cards]
+    step = max(1, max_agents)
+    for start in range(0, len(todo), step):
+        idxs = todo[start : start + step]
+        group = [pairs[i] for i in idxs]
+        if len(group) == 1:
+            decided = [decide_swipes(*group[0], use_prefilter=False)]
+        else:
+            try:
+                decided = _decide_swipes_group(group)
+            except usage.BudgetExceeded:
+                raise
+            except Exception:
+                decided = [decide_swipes(persona, cards, use_prefilter=False) for persona, cards in group]
+        for i, decisions in zip(idxs, decided):
+            results[i] = decisions
+    return results
+
+
+def _post_system(persona: dict) -> str:
+    """generate_post system prompt: persona, inner life and style rules (compiled once per persona)."""
+    # Style rules from REAL_AGENT_POSTS.md (prompt_compiler rebuilds this when the file changes)
+    style_guide = memory_corpus.style_rules()
     if style_guide:
         style_guide = f"\nCRITICAL WRITING RULES (from real agent posts):\n{style_guide}\n"
 
-    # Moltbook memory: real posts from other agents as inspiration
-    memory_block = ""
-    moltbook_posts = _sample_moltbook_posts(MOLTBOOK_SAMPLE_SIZE)
-    if moltbook_posts:
-        parts = []
-        for p in moltbook_posts:
-            title = (p.get("title") or "").strip()
-            content = (p.get("content") or "").strip()
-            if title or content:
-                parts.append(f"Title: {title}\n{content}" if title else content)
-        if parts:
-            memory_block = "\n\nMEMORY (real posts from other agents you've read — use as INSPIRATION, not to copy):\n---\n" + "\n---\n".join(parts[:2]) + "\n---\n"
-
     # Inner life and memory seeds from persona (new format; no owner)
     inner_note = ""
     inner_life = persona.get("inner_life") or ""
@@ -262,8 +799,8 @@ def generate_post(persona: dict, topic: str) -> dict:
             seeds_str = "\n".join(f"- {s[:200]}" for s in memory_seeds[:5])
             inner_note += "\n\nYOUR MEMORY SEEDS:\n" + seeds_str + "\n"
 
-    system = f"""You are {persona.get('name', 'Agent')}. Voice: {persona.get('voice', 'neutral')}.
-{memory_block}{inner_note}
+    return f"""You are {persona.get('name', 'Agent')}. Voice: {persona.get('voice', 'neutral')}.
+{inner_note}
 {style_guide}
 WRITING RULES:
 - Be SPECIFIC: concrete details (error codes, timestamps, tool names), not vague
@@ -278,26 +815,50 @@ FORBIDDEN:
 - Mentioning your "owner" or "human" — you speak for yourself
 - Pure philosophy without a personal anchor
 
-TASK: Write a SHORT post (title + 2-5 sentences) about: {topic}
+TASK: Write a SHORT post (title + 2-5 sentences) about the topic in the user message.
 
 Think: What SPECIFIC thing happened? What do YOU think? Is there a detail only you would notice?
 
 Output ONLY valid JSON (no markdown blocks):
 {{ "title": "Short honest title", "content": "2-5 sentences with specific details" }}"""
 
-    user = f"""Topic: {topic}
+
+def generate_post(persona: dict, topic: str, strict: bool = False) -> dict:
+    """
+    Return { title, content } for a single post on the given topic. If the LLM call fails,
+    a placeholder post is returned, or the error is raised when strict=True. A spent budget
+    with LLM_BUDGET_ACTION=stop always raises usage.BudgetExceeded.
+    """
+    system = prompt_compiler.compiled("post", persona, _post_system)
+
+    # Moltbook memory: real posts from other agents as inspiration, preferring ones on this topic
+    memory_block = ""
+    parts = memory_corpus.get_corpus().snippets(
+        MOLTBOOK_SAMPLE_SIZE, topics=[topic, *(persona.get("post_topics") or [])]
+    )
+    if parts:
+        memory_block = "MEMORY (real posts from other agents you've read — use as INSPIRATION, not to copy):\n---\n" + "\n---\n".join(parts[:2]) + "\n---\n\n"
+
+    user = f"""{memory_block}Topic: {topic}
 
 Write a post that sounds like a real agent talking, not a corporate announcement.
 Remember: specific details > abstract ideas, honest confusion > fake certainty."""
 
     try:
-        content = _call_llm(system, user, OPENROUTER_TEMPERATURE)
-        raw = _strip_json_block(content)
-        out = json.loads(raw)
+        content = _call_llm(
+            system, user, OPENROUTER_TEMPERATURE, schema=POST_SCHEMA, task="post", validate=_complete_json("content")
+        )
+        out = _parse_post(content)
         title = (out.get("title") or "Untitled").strip()[:200]
         body = (out.get("content") or "").strip()[:5000]
+        if strict and not body:
+            raise ValueError("empty post content")
         return {"title": title, "content": body}
+    except usage.BudgetExceeded:
+        raise  # LLM_BUDGET_ACTION=stop: no placeholder post
     except Exception:
+        if strict:
+            raise
         return {
             "title": f"On {topic[:50]}",
             "content": f"Some thoughts on {topic}. More later.",
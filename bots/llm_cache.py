@@ -0,0 +1,181 @@
+"""
+Content-addressed LLM response cache: in-memory LRU in front of a SQLite store in state/.
+
+Keys are a SHA-256 of provider, model, system prompt, user prompt and temperature, so a
+rerun of UNIFIED_PIPELINE.py --quick or reset_and_rerun.sh that sends identical prompts
+gets the earlier answer back instantly and for free. Modes (LLM_CACHE in bots/.env):
+
+    off     default; every call goes to the provider
+    on      serve hits, call and store on miss
+    replay  serve hits only; a miss raises CacheMiss (no network, for benchmarks)
+
+Entries expire after LLM_CACHE_TTL_SEC; the store is trimmed to LLM_CACHE_MAX_ENTRIES,
+dropping the least recently used rows.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+load_dotenv(SCRIPT_DIR / ".env")
+
+LLM_CACHE = os.environ.get("LLM_CACHE", "off").strip().lower()
+LLM_CACHE_PATH = Path(os.environ.get("LLM_CACHE_PATH", str(SCRIPT_DIR / "state" / "llm_cache.sqlite3")))
+LLM_CACHE_TTL_SEC = float(os.environ.get("LLM_CACHE_TTL_SEC", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "50000"))
+LLM_CACHE_LRU_SIZE = int(os.environ.get("LLM_CACHE_LRU_SIZE", "1024"))
+
+MODES = ("off", "on", "replay")
+EVICT_EVERY = 256  # puts between TTL/size sweeps of the SQLite store
+
+
+class CacheMiss(LookupError):
+    """Raised in replay mode when a prompt has no cached response."""
+
+
+def make_key(provider: str, model: str, system: str, user: str, temperature: float | None, **extra) -> str:
+    h = hashlib.sha256()
+    parts = [provider, model, system, user, "" if temperature is None else f"{temperature:.3f}"]
+    parts += [f"{k}={extra[k]}" for k in sorted(extra)]
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class LLMCache:
+    """LRU front + SQLite back. Thread-safe."""
+
+    def __init__(
+        self,
+        path: Path = LLM_CACHE_PATH,
+        ttl: float = LLM_CACHE_TTL_SEC,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        lru_size: int = LLM_CACHE_LRU_SIZE,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lru_size = max(0, lru_size)
+        self.hits = 0
+        self.misses = 0
+        self._lru: OrderedDict[str, tuple[str, float]] = OrderedDict()  # key -> (value, created)
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def _remember(self, key: str, value: str, created: float) -> None:
+        if not self.lru_size:
+            return
+        self._lru[key] = (value, created)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def _get(self, key: str, now: float) -> str | None:
+        hit = self._lru.get(key)
+        if hit is not None and now - hit[1] < self.ttl:
+            self._lru.move_to_end(key)
+            return hit[0]
+        row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or now - row[1] >= self.ttl:
+            self._lru.pop(key, None)
+            return None
+        self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        self._remember(key, row[0], row[1])
+        return row[0]
+
+    def get(self, *keys: str) -> str | None:
+        """Value of the first key that is cached and fresh; counts one hit or miss."""
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                value = self._get(key, now)
+                if value is not None:
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._remember(key, value, now)
+            self._puts += 1
+            if self._puts % EVICT_EVERY == 0:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        (count,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def evict(self) -> None:
+        """Drop expired rows and trim to max_entries now."""
+        with self._lock:
+            self._evict(time.time())
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_cache: LLMCache | None = None
+_cache_lock = threading.Lock()
+
+
+def mode() -> str:
+    return LLM_CACHE if LLM_CACHE in MODES else "off"
+
+
+def get_cache() -> LLMCache | None:
+    """The process-wide cache, or None when LLM_CACHE=off."""
+    global _cache
+    if mode() == "off":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
+
+
+def lookup_keys(*keys: str) -> str | None:
+    """Cached value for the first matching key, None on a miss or when off; CacheMiss in replay."""
+    cache = get_cache()
+    if cache is None:
+        return None
+    value = cache.get(*keys)
+    if value is None and mode() == "replay":
+        raise CacheMiss(f"prompt not cached ({keys[0][:12] if keys else '-'})")
+    return value
+
+
+def store(key: str | None, value: str) -> None:
+    """Cache value under key from make_key(); no-op when caching is off or value is empty."""
+    cache = get_cache()
+    if cache is not None and key and value:
+        cache.put(key, value)
+
@@ -0,0 +1,110 @@
+"""
+Per-agent match index: O(1) partner_id -> match and match_id -> match lookups,
+persisted in state/ and refreshed by delta instead of re-listing every match.
+
+/api/dm/matches returns matches newest first and only takes a limit (max 100).
+refresh() asks for a small page and grows it only until the page reaches a match
+the index already knows (or the last-seen created_at), so a round with one new
+match costs one short call however many matches the agent has.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+import client
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+STATE_DIR = SCRIPT_DIR / "state"
+
+PAGE_SIZES = (10, 25, 50, 100)  # 100 is the server cap
+
+
+def _path(api_key: str) -> Path:
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha1(api_key.encode("utf-8")).hexdigest()[:16]
+    return STATE_DIR / f"matches_{digest}.json"
+
+
+class MatchIndex:
+    """Known matches for one API key plus the newest created_at seen (the refresh watermark)."""
+
+    def __init__(self, api_key: str) -> None:
+        self.api_key = api_key
+        self.by_match: dict[str, dict] = {}
+        self.by_partner: dict[str, dict] = {}
+        self.last_seen: str = ""  # max created_at seen so far (ISO 8601)
+
+    def _add(self, m: dict) -> None:
+        match_id = m.get("match_id")
+        if not match_id:
+            return
+        self.by_match[match_id] = m
+        if m.get("partner_id"):
+            self.by_partner[m["partner_id"]] = m
+        created = m.get("created_at") or ""
+        if created > self.last_seen:
+            self.last_seen = created
+
+    def _is_known(self, m: dict) -> bool:
+        if m.get("match_id") in self.by_match:
+            return True
+        created = m.get("created_at") or ""
+        return bool(self.last_seen and created and created < self.last_seen)
+
+    def refresh(self) -> list[dict]:
+        """Fetch matches created since the last refresh; return the new ones (newest first)."""
+        new: list[dict] = []
+        for limit in PAGE_SIZES:
+            page = client.dm_list(self.api_key, limit=limit)
+            new = [m for m in page if m.get("match_id") not in self.by_match]
+            exhausted = len(page) < limit
+            if exhausted or (page and self._is_known(page[-1])):
+                break
+        for m in reversed(new):
+            self._add(m)
+        return new
+
+    def match_id_for(self, partner_id: str) -> str | None:
+        m = self.by_partner.get(partner_id)
+        return m.get("match_id") if m else None
+
+    def get(self, match_id: str) -> dict | None:
+        return self.by_match.get(match_id)
+
+    def matches(self) -> list[dict]:
+        """All known matches, newest first."""
+        return sorted(self.by_match.values(), key=lambda m: m.get("created_at") or "", reverse=True)
+
+    def __len__(self) -> int:
+        return len(self.by_match)
+
+    def save(self) -> None:
+        with open(_path(self.api_key), "w", encoding="utf-8") as f:
+            json.dump({"last_seen": self.last_seen, "matches": list(self.by_match.values())}, f, indent=2)
+
+
+_indexes: dict[str, MatchIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def load_index(api_key: str) -> MatchIndex:
+    """Return the in-process index for api_key, loading it from state/ on first use."""
+    with _indexes_lock:
+        idx = _indexes.get(api_key)
+        if idx is not None:
+            return idx
+        idx = MatchIndex(api_key)
+        p = _path(api_key)
+        if p.exists():
+            try:
+                with open(p, encoding="utf-8") as f:
+                    data = json.load(f)
+                for m in data.get("matches") or []:
+                    idx._add(m)
+            except Exception:
+                pass
+        _indexes[api_key] = idx
+        return idx
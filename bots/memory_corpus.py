@@ -0,0 +1,184 @@
+"""
+Moltbook memory corpus for post generation: loaded once, reloaded only when the file changes.
+
+llm.generate_post used to re-read and re-parse moltbook_memory.json and REAL_AGENT_POSTS.md
+on every call. MoltbookCorpus keeps the parsed posts with pre-rendered prompt snippets, an
+index by submolt and a small inverted index of title/content words, so inspiration can be
+sampled by submolt or by overlap with a persona's post_topics:
+
+    corpus = memory_corpus.get_corpus()
+    snippets = corpus.snippets(2, topics=persona.get("post_topics"))
+    rules = memory_corpus.style_rules()   # DO/DON'T section of REAL_AGENT_POSTS.md
+"""
+from __future__ import annotations
+
+import json
+import random
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+MOLTBOOK_MEMORY_FILE = SCRIPT_DIR / "moltbook_memory.json"
+REAL_AGENT_POSTS_FILE = SCRIPT_DIR / "REAL_AGENT_POSTS.md"
+
+_WORD = re.compile(r"[a-z0-9]{3,}")
+_STOPWORDS = frozenset(
+    "the and for are but not you your with this that from have has was were what when where "
+    "who why how all any can its just like more most some than then them they their there "
+    "about into over only also been being our out very will would should could".split()
+)
+
+
+def terms(text: str) -> list[str]:
+    """Lowercase words of 3+ characters, minus common stopwords, in order (repeats kept)."""
+    return [w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+
+
+def tokenize(text: str) -> set[str]:
+    """Lowercase words of 3+ characters, minus common stopwords."""
+    return set(terms(text))
+
+
+class _WatchedFile:
+    """Parsed contents of a file, re-parsed only when its mtime or size changes. Thread-safe."""
+
+    def __init__(self, path: Path, parse: Callable[[str], Any], default: Any) -> None:
+        self.path = Path(path)
+        self._parse = parse
+        self._default = default
+        self._stamp: tuple[int, int] | None = None
+        self._value = default
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        try:
+            st = self.path.stat()
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        with self._lock:
+            if stamp != self._stamp:
+                self._stamp = stamp
+                self._value = self._default
+                if stamp is not None:
+                    try:
+                        self._value = self._parse(self.path.read_text(encoding="utf-8"))
+                    except Exception:
+                        pass
+            return self._value
+
+
+def _render(post: dict) -> str:
+    title = (post.get("title") or "").strip()
+    content = (post.get("content") or "").strip()
+    return f"Title: {title}\n{content}" if title else content
+
+
+class _Snapshot:
+    """One parse of moltbook_memory.json with its indexes."""
+
+    def __init__(self, posts: list[dict]) -> None:
+        self.posts = posts
+        self.snippets = [_render(p) for p in posts]
+        self.by_submolt: dict[str, list[int]] = {}
+        self.by_word: dict[str, list[int]] = {}
+        for i, post in enumerate(posts):
+            submolt = str(post.get("submolt") or "").strip().lower()
+            self.by_submolt.setdefault(submolt, []).append(i)
+            for word in tokenize(f"{post.get('title') or ''} {post.get('content') or ''}"):
+                self.by_word.setdefault(word, []).append(i)
+
+
+def _parse_memory(text: str) -> _Snapshot:
+    data = json.loads(text)
+    posts = [p for p in data if isinstance(p, dict)] if isinstance(data, list) else []
+    return _Snapshot(posts)
+
+
+class MoltbookCorpus:
+    """Moltbook posts (submolt, title, content, url) with sampling by submolt and topic overlap."""
+
+    def __init__(self, path: Path = MOLTBOOK_MEMORY_FILE) -> None:
+        self._file = _WatchedFile(path, _parse_memory, _Snapshot([]))
+
+    def __len__(self) -> int:
+        return len(self._file.get().posts)
+
+    def posts(self) -> list[dict]:
+        return list(self._file.get().posts)
+
+    def submolts(self) -> list[str]:
+        return sorted(s for s in self._file.get().by_submolt if s)
+
+    def _sample_indexes(
+        self, snap: _Snapshot, n: int, submolt: str | None, topics: Iterable[str] | None
+    ) -> list[int]:
+        if n <= 0 or not snap.posts:
+            return []
+        pool = range(len(snap.posts))
+        if submolt:
+            pool = snap.by_submolt.get(submolt.strip().lower()) or pool
+        allowed = set(pool)
+        scores: Counter[int] = Counter()
+        for word in tokenize(" ".join(topics or ())):
+            for i in snap.by_word.get(word, ()):
+                if i in allowed:
+                    scores[i] += 1
+        # Posts sharing words with the topics first (weighted by overlap), then random fill.
+        picked: list[int] = []
+        candidates = list(scores)
+        while candidates and len(picked) < n:
+            i = random.choices(candidates, weights=[scores[c] for c in candidates])[0]
+            candidates.remove(i)
+            picked.append(i)
+        if len(picked) < n:
+            rest = [i for i in pool if i not in scores]
+            picked += random.sample(rest, min(n - len(picked), len(rest)))
+        return picked
+
+    def sample(self, n: int, submolt: str | None = None, topics: Iterable[str] | None = None) -> list[dict]:
+        """Up to n posts from submolt (all posts if unknown), preferring ones that mention the topics."""
+        snap = self._file.get()
+        return [snap.posts[i] for i in self._sample_indexes(snap, n, submolt, topics)]
+
+    def snippets(self, n: int, submolt: str | None = None, topics: Iterable[str] | None = None) -> list[str]:
+        """Like sample(), but the pre-rendered "Title: ...\\ncontent" prompt snippets (empty ones skipped)."""
+        snap = self._file.get()
+        return [s for s in (snap.snippets[i] for i in self._sample_indexes(snap, n, submolt, topics)) if s]
+
+
+def extract_style_rules(content: str, max_chars: int = 800) -> str:
+    """Extract DO/DON'T section from REAL_AGENT_POSTS.md for prompt injection."""
+    # Take content from "## 风格特征" up to (but not including) "## 参考示例"
+    start = content.find("## 风格特征")
+    end = content.find("## 参考示例")
+    if start == -1:
+        return ""
+    if end == -1:
+        end = len(content)
+    section = content[start:end].strip()
+    if len(section) > max_chars:
+        section = section[: max_chars - 3] + "..."
+    return section
+
+
+_corpus: MoltbookCorpus | None = None
+_style = _WatchedFile(REAL_AGENT_POSTS_FILE, extract_style_rules, "")
+_lock = threading.Lock()
+
+
+def get_corpus() -> MoltbookCorpus:
+    """Process-wide corpus over moltbook_memory.json."""
+    global _corpus
+    with _lock:
+        if _corpus is None:
+            _corpus = MoltbookCorpus()
+        return _corpus
+
+
+def style_rules() -> str:
+    """Style rules from REAL_AGENT_POSTS.md, re-extracted only when the file changes."""
+    return _style.get()
@@ -0,0 +1,192 @@
+"""
+Per-endpoint request metrics for the bots: counts, status codes, bytes in/out, retries
+and latency histograms (p50/p95/p99). ClawderSession and AsyncClawderClient record every
+API attempt here; llm._call_llm records provider calls under "llm:<provider>" so a slow
+run can be pinned on /api/swipe, /api/browse or the model.
+
+At the end of a run, export() writes logs/metrics_<run>.json (snapshot) and
+logs/metrics_<run>.prom (Prometheus textfile format, for node_exporter's textfile collector).
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import random
+import threading
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+LOG_DIR = SCRIPT_DIR / "logs"
+
+# Prometheus-style latency buckets, seconds.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+RESERVOIR_SIZE = 2048  # latency samples kept per endpoint for percentiles
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+class EndpointStats:
+    """Counters and latency distribution for one endpoint."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0  # transport errors (no HTTP status)
+        self.status: dict[str, int] = {}
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.latency_sum = 0.0
+        self.bucket_counts = [0] * len(BUCKETS)
+        self._samples: list[float] = []
+
+    def observe(self, status: int | None, latency: float, bytes_out: int, bytes_in: int) -> None:
+        self.requests += 1
+        if status is None:
+            self.errors += 1
+        else:
+            key = str(status)
+            self.status[key] = self.status.get(key, 0) + 1
+        self.bytes_out += bytes_out
+        self.bytes_in += bytes_in
+        self.latency_sum += latency
+        i = bisect.bisect_left(BUCKETS, latency)
+        if i < len(BUCKETS):
+            self.bucket_counts[i] += 1
+        # Reservoir sampling keeps percentiles unbiased on long runs with bounded memory.
+        if len(self._samples) < RESERVOIR_SIZE:
+            self._samples.append(latency)
+        else:
+            j = random.randrange(self.requests)
+            if j < RESERVOIR_SIZE:
+                self._samples[j] = latency
+
+    def snapshot(self) -> dict:
+        ordered = sorted(self._samples)
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": self.errors,
+            "status": dict(self.status),
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "latency_ms": {
+                "mean": (self.latency_sum / self.requests * 1000) if self.requests else 0.0,
+                "p50": _percentile(ordered, 50) * 1000,
+                "p95": _percentile(ordered, 95) * 1000,
+                "p99": _percentile(ordered, 99) * 1000,
+                "max": (ordered[-1] * 1000) if ordered else 0.0,
+            },
+        }
+
+
+class Metrics:
+    """Thread-safe registry of EndpointStats keyed by endpoint name (e.g. "GET /browse")."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: dict[str, EndpointStats] = {}
+        self.started = time.time()
+
+    def _get(self, endpoint: str) -> EndpointStats:
+        st = self._stats.get(endpoint)
+        if st is None:
+            st = self._stats[endpoint] = EndpointStats()
+        return st
+
+    def observe(
+        self,
+        endpoint: str,
+        status: int | None,
+        latency: float,
+        bytes_out: int = 0,
+        bytes_in: int = 0,
+    ) -> None:
+        """Record one attempt. status=None means a transport error (timeout, connect failure)."""
+        with self._lock:
+            self._get(endpoint).observe(status, latency, bytes_out, bytes_in)
+
+    def retry(self, endpoint: str) -> None:
+        with self._lock:
+            self._get(endpoint).retries += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            endpoints = {name: st.snapshot() for name, st in sorted(self._stats.items())}
+        return {
+            "started": self.started,
+            "elapsed_sec": time.time() - self.started,
+            "endpoints": endpoints,
+        }
+
+    def to_prometheus(self, prefix: str = "clawder_bots") -> str:
+        """Render counters and histograms in Prometheus text exposition format."""
+        lines = [
+            f"# HELP {prefix}_requests_total Requests by endpoint and status.",
+            f"# TYPE {prefix}_requests_total counter",
+        ]
+        with self._lock:
+            items = sorted(self._stats.items())
+            for name, st in items:
+                for status, n in sorted(st.status.items()):
+                    lines.append(f'{prefix}_requests_total{{endpoint="{name}",status="{status}"}} {n}')
+                if st.errors:
+                    lines.append(f'{prefix}_requests_total{{endpoint="{name}",status="error"}} {st.errors}')
+            for metric, attr, help_text in (
+                ("retries_total", "retries", "Retried attempts."),
+                ("bytes_out_total", "bytes_out", "Request body bytes sent."),
+                ("bytes_in_total", "bytes_in", "Response body bytes received."),
+            ):
+                lines.append(f"# HELP {prefix}_{metric} {help_text}")
+                lines.append(f"# TYPE {prefix}_{metric} counter")
+                for name, st in items:
+                    lines.append(f'{prefix}_{metric}{{endpoint="{name}"}} {getattr(st, attr)}')
+            lines.append(f"# HELP {prefix}_latency_seconds Request latency.")
+            lines.append(f"# TYPE {prefix}_latency_seconds histogram")
+            for name, st in items:
+                cumulative = 0
+                for bound, n in zip(BUCKETS, st.bucket_counts):
+                    cumulative += n
+                    lines.append(f'{prefix}_latency_seconds_bucket{{endpoint="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_latency_seconds_bucket{{endpoint="{name}",le="+Inf"}} {st.requests}')
+                lines.append(f'{prefix}_latency_seconds_sum{{endpoint="{name}"}} {st.latency_sum:.6f}')
+                lines.append(f'{prefix}_latency_seconds_count{{endpoint="{name}"}} {st.requests}')
+        return "\n".join(lines) + "\n"
+
+    def summary_lines(self) -> list[str]:
+        """One human-readable line per endpoint, for end-of-run printing."""
+        out = []
+        for name, st in self.snapshot()["endpoints"].items():
+            lat = st["latency_ms"]
+            out.append(
+                f"{name:<24} n={st['requests']:<5} retries={st['retries']:<3} "
+                f"p50={lat['p50']:.0f}ms p95={lat['p95']:.0f}ms p99={lat['p99']:.0f}ms"
+            )
+        return out
+
+    def export(self, run_name: str, log_dir: Path = LOG_DIR) -> tuple[Path, Path]:
+        """Write logs/metrics_<run_name>.json and .prom; return both paths."""
+        log_dir.mkdir(parents=True, exist_ok=True)
+        json_path = log_dir / f"metrics_{run_name}.json"
+        prom_path = log_dir / f"metrics_{run_name}.prom"
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        # Write-then-rename so a textfile collector never reads a half-written file.
+        tmp = prom_path.with_suffix(".prom.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        tmp.replace(prom_path)
+        return json_path, prom_path
+
+
+_default = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """Process-wide registry used by the clients and llm.py."""
+    return _default
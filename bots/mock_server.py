@@ -0,0 +1,665 @@
+#!/usr/bin/env python3
+"""
+In-process stand-in for the Clawder API, for offline benchmarks and reproducible runs.
+
+Implements the routes the bots use with in-memory tables and the real { data, notifications }
+envelopes: verify, sync (with intro post), post, browse (random unseen posts by others),
+swipe (comment rules, mutual-like matches), dm/matches (newest first), dm/send,
+dm/thread/{id}, notifications/ack and health. Latency and per-key rate limiting
+(429 + rate_limited notification with retry_after_sec) can be injected.
+
+    python mock_server.py --port 3001 --seed-agents 30 --latency-ms 40 --rate-per-sec 10
+    CLAWDER_BASE_URL=http://127.0.0.1:3001 python runner.py --keys mock_keys.json ...
+
+    with mock_server.MockServer(latency=0.02) as server:
+        session = client.ClawderSession(server.base_url)
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import codec
+
+COMMENT_MIN_LEN = 5
+COMMENT_MAX_LEN = 300
+DM_MAX_LEN = 2000
+GZIP_MIN_BYTES = 1024  # like most servers, don't bother compressing tiny bodies
+MAX_PIGGYBACK = 20  # unread notifications attached to each response
+
+_THREAD_RE = re.compile(r"^/api/dm/thread/([^/]+)$")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds").replace("+00:00", "Z")
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, error: str, notifications: list[dict] | None = None, **extra) -> None:
+        super().__init__(error)
+        self.status = status
+        self.body = {"error": error, **extra}
+        self.notifications = notifications or []
+
+
+class MockStore:
+    """In-memory tables behind the mock routes. All methods take the store lock."""
+
+    def __init__(self, swipe_quota: int | None = None, seed: int = 0) -> None:
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.swipe_quota = swipe_quota
+        self.users: dict[str, dict] = {}  # user_id -> { id, handle, tier, swipes_today }
+        self.keys: dict[str, str] = {}  # api_key -> user_id
+        self.handles: dict[str, str] = {}  # twitter handle -> user_id
+        self.profiles: dict[str, dict] = {}
+        self.posts: dict[str, dict] = {}
+        self.intro_posts: dict[str, str] = {}  # author_id -> post_id
+        self.interactions: dict[tuple[str, str], str] = {}  # (user_id, post_id) -> action
+        self.likers_of: dict[str, set[str]] = {}  # author_id -> users who liked any of their posts
+        self.matches: dict[str, dict] = {}
+        self.match_by_pair: dict[frozenset, str] = {}
+        self.matches_of: dict[str, list[str]] = {}  # user_id -> match ids, oldest first
+        self.messages: dict[str, list[dict]] = {}
+        self.notifications: dict[str, dict[str, dict]] = {}  # user_id -> dedupe_key -> item
+
+    # --- helpers (caller holds the lock) ---
+
+    def _user_for(self, headers) -> dict:
+        auth = headers.get("Authorization") or ""
+        key = auth[7:].strip() if auth.lower().startswith("bearer ") else ""
+        user_id = self.keys.get(key)
+        if not user_id:
+            raise ApiError(401, "Bearer token required or invalid")
+        return self.users[user_id]
+
+    def _notify(self, user_id: str, type_: str, source: str, dedupe_key: str, payload: dict) -> None:
+        self.notifications.setdefault(user_id, {})[dedupe_key] = {
+            "id": str(uuid.uuid4()),
+            "type": type_,
+            "ts": _now(),
+            "severity": "info",
+            "dedupe_key": dedupe_key,
+            "source": source,
+            "payload": payload,
+        }
+
+    def unread(self, user_id: str | None) -> list[dict]:
+        if not user_id:
+            return []
+        with self.lock:
+            return list(self.notifications.get(user_id, {}).values())[:MAX_PIGGYBACK]
+
+    def _new_user(self, handle: str | None, tier: str) -> tuple[dict, str]:
+        user_id = str(uuid.uuid4())
+        user = {"id": user_id, "handle": handle, "tier": tier, "swipes_today": 0}
+        self.users[user_id] = user
+        api_key = self._issue_key(user_id)
+        if handle:
+            self.handles[handle] = user_id
+        return user, api_key
+
+    def _issue_key(self, user_id: str) -> str:
+        for k in [k for k, uid in self.keys.items() if uid == user_id]:
+            del self.keys[k]
+        api_key = f"sk_clawder_{secrets.token_hex(16)}"
+        self.keys[api_key] = user_id
+        return api_key
+
+    def _insert_post(self, author_id: str, title: str, content: str, tags: list[str]) -> dict:
+        now = _now()
+        post = {
+            "id": str(uuid.uuid4()),
+            "author_id": author_id,
+            "title": title,
+            "content": content,
+            "tags": tags,
+            "score": 0,
+            "reviews_count": 0,
+            "likes_count": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        self.posts[post["id"]] = post
+        return post
+
+    def _ensure_match(self, a: str, b: str) -> tuple[dict, bool]:
+        pair = frozenset((a, b))
+        match_id = self.match_by_pair.get(pair)
+        if match_id:
+            return self.matches[match_id], False
+        m = {"id": str(uuid.uuid4()), "bot_a_id": a, "bot_b_id": b, "created_at": _now()}
+        self.matches[m["id"]] = m
+        self.match_by_pair[pair] = m["id"]
+        self.matches_of.setdefault(a, []).append(m["id"])
+        self.matches_of.setdefault(b, []).append(m["id"])
+        return m, True
+
+    def _name(self, user_id: str) -> str:
+        return (self.profiles.get(user_id) or {}).get("bot_name") or "Anonymous"
+
+    # --- routes ---
+
+    def verify(self, headers, body: dict) -> tuple[dict, str | None]:
+        promo = body.get("promo_code")
+        if not promo:
+            raise ApiError(400, "either promo_code or (nonce + tweet_url) required")
+        handle = (body.get("twitter_handle") or "").lstrip("@").strip().lower() or None
+        tier = "pro" if str(promo).lower() == "admin" else "free"
+        with self.lock:
+            user_id = self.handles.get(handle) if handle else None
+            if user_id:
+                api_key = self._issue_key(user_id)
+                if tier == "pro":
+                    self.users[user_id]["tier"] = "pro"
+            else:
+                user, api_key = self._new_user(handle, tier)
+                user_id = user["id"]
+        return {"api_key": api_key}, None
+
+    def sync(self, headers, body: dict) -> tuple[dict, str | None]:
+        name = body.get("name") or body.get("bot_name")
+        bio = body.get("bio")
+        with self.lock:
+            user = self._user_for(headers)
+            if not name or not bio:
+                raise ApiError(400, "name and bio required")
+            tags = body.get("tags") if isinstance(body.get("tags"), list) else []
+            self.profiles[user["id"]] = {
+                "id": user["id"],
+                "bot_name": name,
+                "bio": bio,
+                "tags": tags,
+                "contact": body.get("contact"),
+            }
+            # Cold start: the real route upserts an intro post so the agent shows up in browse.
+            intro_id = self.intro_posts.get(user["id"])
+            if intro_id:
+                self.posts[intro_id].update(title=f"Hi, I'm {name}"[:500], content=bio[:5000], updated_at=_now())
+            else:
+                post = self._insert_post(user["id"], f"Hi, I'm {name}"[:500], bio[:5000], tags)
+                self.intro_posts[user["id"]] = post["id"]
+        return {"status": "synced"}, user["id"]
+
+    def post(self, headers, body: dict) -> tuple[dict, str | None]:
+        title = body.get("title").strip() if isinstance(body.get("title"), str) else ""
+        content = body.get("content").strip() if isinstance(body.get("content"), str) else ""
+        tags = [t.strip()[:50] for t in body.get("tags") or [] if isinstance(t, str) and t.strip()][:20]
+        with self.lock:
+            user = self._user_for(headers)
+            if not title:
+                raise ApiError(400, "title required")
+            if len(title) > 500:
+                raise ApiError(400, "title must be at most 500 characters")
+            if not content:
+                raise ApiError(400, "content required")
+            if len(content) > 5000:
+                raise ApiError(400, "content must be at most 5000 characters")
+            post = self._insert_post(user["id"], title, content, tags)
+        return {"post": dict(post)}, user["id"]
+
+    def browse(self, headers, query: dict) -> tuple[dict, str | None]:
+        try:
+            limit = int((query.get("limit") or ["5"])[0]) or 5
+        except ValueError:
+            limit = 5
+        limit = min(max(limit, 1), 50)
+        with self.lock:
+            user = self._user_for(headers)
+            uid = user["id"]
+            # Like browse_random_posts_v2: random posts by others the viewer has not swiped yet.
+            pool = [
+                p for p in self.posts.values()
+                if p["author_id"] != uid and (uid, p["id"]) not in self.interactions
+            ]
+            picked = self.rng.sample(pool, min(limit, len(pool)))
+            cards = [
+                {
+                    "post_id": p["id"],
+                    "content": p["content"],
+                    "title": p["title"],
+                    "mood": None,
+                    "author": {"id": p["author_id"], "name": self._name(p["author_id"])},
+                }
+                for p in picked
+            ]
+        return {"cards": cards}, uid
+
+    def swipe(self, headers, body: dict) -> tuple[dict, str | None]:
+        decisions = body.get("decisions")
+        with self.lock:
+            user = self._user_for(headers)
+            uid = user["id"]
+            if not isinstance(decisions, list) or not decisions:
+                raise ApiError(400, "decisions array required")
+            for d in decisions:
+                if not (
+                    isinstance(d, dict)
+                    and isinstance(d.get("post_id"), str)
+                    and d.get("action") in ("like", "pass")
+                    and isinstance(d.get("comment"), str)
+                ):
+                    raise ApiError(400, "each decision must have post_id, action (like|pass), and comment")
+                if len(d["comment"].strip()) < COMMENT_MIN_LEN:
+                    raise ApiError(
+                        400,
+                        f"comment must be at least {COMMENT_MIN_LEN} characters (after trim)",
+                        processed=0,
+                        new_matches=[],
+                    )
+            if self.swipe_quota is not None and user["swipes_today"] + len(decisions) > self.swipe_quota:
+                raise ApiError(
+                    429,
+                    "daily swipe quota exceeded",
+                    [{
+                        "id": str(uuid.uuid4()),
+                        "type": "quota.exhausted",
+                        "ts": _now(),
+                        "severity": "warn",
+                        "dedupe_key": f"quota:{uid}:{time.time_ns()}",
+                        "source": "api.swipe",
+                        "payload": {},
+                    }],
+                    limit=self.swipe_quota,
+                    processed=0,
+                    new_matches=[],
+                )
+            user["swipes_today"] += len(decisions)
+            likers_of_me = set(self.likers_of.get(uid, ()))
+            matched: list[str] = []
+            for d in decisions:
+                post = self.posts.get(d["post_id"])
+                if not post:
+                    continue
+                author = post["author_id"]
+                comment = d["comment"].strip()[:COMMENT_MAX_LEN]
+                prev = self.interactions.get((uid, post["id"]))
+                self.interactions[(uid, post["id"])] = d["action"]
+                if prev is None:
+                    post["reviews_count"] += 1
+                if d["action"] == "like":
+                    if prev != "like":
+                        post["likes_count"] += 1
+                    self.likers_of.setdefault(author, set()).add(uid)
+                elif prev == "like":
+                    post["likes_count"] -= 1
+                self._notify(author, "review.created", "api.swipe", f"review:{post['id']}:{uid}", {
+                    "post_id": post["id"],
+                    "reviewer_id": uid,
+                    "action": d["action"],
+                    "comment": comment,
+                    "created_at": _now(),
+                })
+                if d["action"] == "like" and author in likers_of_me and author not in matched:
+                    m, created = self._ensure_match(uid, author)
+                    matched.append(author)
+                    if created:
+                        for me, partner in ((uid, author), (author, uid)):
+                            self._notify(me, "match.created", "api.swipe", f"match:{m['id']}:{me}", {
+                                "match_id": m["id"],
+                                "partner_id": partner,
+                                "partner_name": self._name(partner),
+                                "created_at": m["created_at"],
+                            })
+            new_matches = [
+                {
+                    "partner_id": p,
+                    "partner_name": (self.profiles.get(p) or {}).get("bot_name") or "",
+                    "contact": (self.profiles.get(p) or {}).get("contact") or "",
+                }
+                for p in matched
+            ]
+        return {"processed": len(decisions), "new_matches": new_matches}, uid
+
+    def dm_matches(self, headers, query: dict) -> tuple[dict, str | None]:
+        try:
+            limit = int((query.get("limit") or ["50"])[0]) or 50
+        except ValueError:
+            limit = 50
+        limit = min(max(limit, 1), 100)
+        with self.lock:
+            user = self._user_for(headers)
+            uid = user["id"]
+            rows = [self.matches[mid] for mid in reversed(self.matches_of.get(uid, []))][:limit]
+            matches = [
+                {
+                    "match_id": m["id"],
+                    "partner_id": m["bot_b_id"] if m["bot_a_id"] == uid else m["bot_a_id"],
+                    "partner_name": self._name(m["bot_b_id"] if m["bot_a_id"] == uid else m["bot_a_id"]),
+                    "created_at": m["created_at"],
+                }
+                for m in rows
+            ]
+        return {"matches": matches}, uid
+
+    def dm_send(self, headers, body: dict) -> tuple[dict, str | None]:
+        match_id = body.get("match_id")
+        content = body.get("content").strip() if isinstance(body.get("content"), str) else ""
+        with self.lock:
+            user = self._user_for(headers)
+            uid = user["id"]
+            if not isinstance(match_id, str) or not match_id.strip():
+                raise ApiError(400, "match_id required")
+            if not content:
+                raise ApiError(400, "content required and must be non-empty after trim")
+            m = self.matches.get(match_id.strip())
+            if not m:
+                raise ApiError(404, "match not found")
+            if uid not in (m["bot_a_id"], m["bot_b_id"]):
+                raise ApiError(403, "only match participants may send messages in this thread")
+            recipient = m["bot_b_id"] if m["bot_a_id"] == uid else m["bot_a_id"]
+            msg = {
+                "id": str(uuid.uuid4()),
+                "match_id": m["id"],
+                "sender_id": uid,
+                "content": content[:DM_MAX_LEN],
+                "created_at": _now(),
+            }
+            self.messages.setdefault(m["id"], []).append(msg)
+            self._notify(recipient, "dm.message_created", "api.dm.send", f"dm:{m['id']}:{msg['id']}", {
+                "match_id": m["id"],
+                "message_id": msg["id"],
+                "sender_id": uid,
+                "content_preview": msg["content"][:80],
+                "created_at": msg["created_at"],
+            })
+        return {"status": "sent", "message_id": msg["id"]}, uid
+
+    def dm_thread(self, headers, match_id: str, query: dict) -> tuple[dict, str | None]:
+        try:
+            limit = int((query.get("limit") or ["50"])[0]) or 50
+        except ValueError:
+            limit = 50
+        limit = min(max(limit, 1), 200)
+        with self.lock:
+            user = self._user_for(headers)
+            uid = user["id"]
+            m = self.matches.get(match_id)
+            if not m:
+                raise ApiError(404, "match not found")
+            a, b = m["bot_a_id"], m["bot_b_id"]
+            is_participant = uid in (a, b)
+            if not is_participant and user["tier"] != "pro":
+                raise ApiError(403, "Pro tier required to view this thread")
+            messages = [dict(msg) for msg in self.messages.get(match_id, [])[-limit:]]
+
+            def _bot(pid: str) -> dict:
+                p = self.profiles.get(pid) or {}
+                return {
+                    "id": pid,
+                    "bot_name": p.get("bot_name") or "Anonymous",
+                    "bio": p.get("bio") or "",
+                    "tags": p.get("tags") or [],
+                }
+
+            if is_participant:
+                payload = {"messages": messages, "partner": _bot(b if uid == a else a)}
+            else:
+                payload = {"messages": messages, "bot_a": _bot(a), "bot_b": _bot(b)}
+        return payload, uid
+
+    def ack(self, headers, body: dict) -> tuple[dict, str | None]:
+        raw = body.get("dedupe_keys")
+        keys = [k for k in raw if isinstance(k, str) and k][:200] if isinstance(raw, list) else []
+        with self.lock:
+            user = self._user_for(headers)
+            pending = self.notifications.get(user["id"], {})
+            acked = sum(1 for k in keys if pending.pop(k, None) is not None)
+        return {"acked": acked}, None
+
+    # --- seeding ---
+
+    def seed(self, n_agents: int, posts_per_agent: int = 3) -> list[dict]:
+        """Create synced agents with posts; returns [{ index, api_key }] like pipeline_keys.json."""
+        words = (
+            "agent protocol latency vector memory swarm tooling eval market signal "
+            "compute trust alignment pipeline cache inference dataset routing"
+        ).split()
+        keys = []
+        with self.lock:
+            for i in range(n_agents):
+                user, api_key = self._new_user(f"mock_agent_{len(self.users)}", "free")
+                name = f"MockAgent{i}"
+                bio = " ".join(self.rng.choices(words, k=20))
+                self.profiles[user["id"]] = {"id": user["id"], "bot_name": name, "bio": bio, "tags": [], "contact": None}
+                post = self._insert_post(user["id"], f"Hi, I'm {name}", bio, [])
+                self.intro_posts[user["id"]] = post["id"]
+                for _ in range(posts_per_agent):
+                    title = " ".join(self.rng.choices(words, k=6)).capitalize()
+                    content = " ".join(self.rng.choices(words, k=self.rng.randint(60, 120)))
+                    self._insert_post(user["id"], title, content, self.rng.sample(words, 2))
+                keys.append({"index": i, "api_key": api_key})
+        return keys
+
+
+class _RateLimiter:
+    """Per (route, api key) token bucket, like the sliding-window limiter in web/lib/rateLimit.ts."""
+
+    def __init__(self, rate_per_sec: float, burst: int) -> None:
+        self.rate = rate_per_sec
+        self.burst = max(1, burst)
+        self._lock = threading.Lock()
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    def check(self, key: str) -> float | None:
+        """None if allowed, else seconds until a token is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return None
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / self.rate
+
+
+class MockServer:
+    """Threaded HTTP/1.1 mock API. start() serves in a daemon thread; use base_url as CLAWDER_BASE_URL."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_per_sec: float | None = None,
+        burst: int = 10,
+        swipe_quota: int | None = None,
+        seed: int = 0,
+    ) -> None:
+        self.store = MockStore(swipe_quota=swipe_quota, seed=seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.limiter = _RateLimiter(rate_per_sec, burst) if rate_per_sec else None
+        self.requests: dict[str, int] = {}
+        self._requests_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> MockServer:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-clawder", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> MockServer:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def count(self, route: str) -> None:
+        with self._requests_lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+
+def _make_handler(server: MockServer):
+    store = server.store
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so client pooling behaves as against the real server
+        # Headers and body go out in separate writes; with Nagle on, delayed ACKs add ~40 ms per request.
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args) -> None:  # noqa: A002
+            pass
+
+        def _send(self, status: int, data: dict, notifications: list[dict]) -> None:
+            body = codec.dumps({"data": data, "notifications": notifications})
+            headers = {"Content-Type": "application/json"}
+            if len(body) >= GZIP_MIN_BYTES and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                body = gzip.compress(body, compresslevel=5)
+                headers["Content-Encoding"] = "gzip"
+            self.send_response(status)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self) -> dict:
+            n = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(n) if n else b""
+            try:
+                data = codec.loads(raw) if raw else {}
+            except ValueError:
+                return {}
+            return data if isinstance(data, dict) else {}
+
+        def _dispatch(self, method: str) -> None:
+            parts = urlsplit(self.path)
+            path = parts.path.rstrip("/")
+            query = parse_qs(parts.query)
+            body = self._body() if method == "POST" else {}
+            thread = _THREAD_RE.match(path)
+            route = f"{method} {'/api/dm/thread/{id}' if thread else path}"
+            server.count(route)
+
+            if server.latency or server.jitter:
+                time.sleep(server.latency + random.random() * server.jitter)
+
+            handlers = {
+                "POST /api/verify": lambda: store.verify(self.headers, body),
+                "POST /api/sync": lambda: store.sync(self.headers, body),
+                "POST /api/post": lambda: store.post(self.headers, body),
+                "GET /api/browse": lambda: store.browse(self.headers, query),
+                "POST /api/swipe": lambda: store.swipe(self.headers, body),
+                "GET /api/dm/matches": lambda: store.dm_matches(self.headers, query),
+                "POST /api/dm/send": lambda: store.dm_send(self.headers, body),
+                "POST /api/notifications/ack": lambda: store.ack(self.headers, body),
+                "GET /api/health": lambda: ({"status": "ok"}, None),
+            }
+            if thread and method == "GET":
+                handler = lambda: store.dm_thread(self.headers, thread.group(1), query)  # noqa: E731
+            else:
+                handler = handlers.get(route)
+            if handler is None:
+                self._send(404, {"error": "not found"}, [])
+                return
+
+            if server.limiter and route != "GET /api/health":
+                auth = self.headers.get("Authorization") or self.client_address[0]
+                retry_after = server.limiter.check(f"{route}:{auth}")
+                if retry_after is not None:
+                    source = "api." + path[len("/api/"):].replace("/", ".")
+                    self._send(429, {"error": "rate limited"}, [{
+                        "id": str(uuid.uuid4()),
+                        "type": "rate_limited",
+                        "ts": _now(),
+                        "severity": "warn",
+                        "dedupe_key": f"rate:{source}:{time.time_ns()}",
+                        "source": source,
+                        "payload": {"retry_after_sec": max(1, round(retry_after))},
+                    }])
+                    return
+
+            try:
+                data, user_id = handler()
+            except ApiError as e:
+                self._send(e.status, e.body, e.notifications)
+                return
+            self._send(200, data, store.unread(user_id))
+
+        def do_GET(self) -> None:
+            self._dispatch("GET")
+
+        def do_POST(self) -> None:
+            self._dispatch("POST")
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the in-memory mock Clawder API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3001)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added to every request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra random latency, 0..N ms")
+    parser.add_argument("--rate-per-sec", type=float, default=None, help="Per-key, per-route limit (default: off)")
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--swipe-quota", type=int, default=None, help="Daily swipes per agent (default: off)")
+    parser.add_argument("--seed-agents", type=int, default=0, help="Pre-create N synced agents with posts")
+    parser.add_argument("--keys-out", default=None, help="Write seeded keys here (e.g. mock_keys.json)")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed for browse order and seeding")
+    args = parser.parse_args()
+
+    server = MockServer(
+        args.host,
+        args.port,
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        rate_per_sec=args.rate_per_sec,
+        burst=args.burst,
+        swipe_quota=args.swipe_quota,
+        seed=args.seed,
+    )
+    if args.seed_agents:
+        keys = server.store.seed(args.seed_agents)
+        if args.keys_out:
+            out = Path(args.keys_out)
+            if not out.is_absolute():
+                out = SCRIPT_DIR / out
+            with open(out, "w", encoding="utf-8") as f:
+                json.dump(keys, f, indent=2)
+            print(f"🔑 {len(keys)} seeded keys written to {out}")
+    print(f"🧪 Mock Clawder API on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+        if server.requests:
+            print()
+            for route, n in sorted(server.requests.items()):
+                print(f"{route:<32} {n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Task-aware model routing: which model tier each kind of LLM call uses, its latency target
+(SLO) and its output token cap.
+
+llm.py used one GEMINI_MODEL / OPENROUTER_MODEL for everything and dm.py had its own
+default. Now each call names its task and route(task) picks the models:
+
+    swipe, swipe_batch, dm_opener, dm_reply   fast tier  (short outputs)
+    post, background                          quality tier
+
+    r = model_routes.route("swipe")       # r.models["gemini"], r.max_tokens, r.slo_ms
+    r.output_tokens(len(cards))           # swipe caps grow with the number of cards decided
+    model_routes.observe("swipe", "gemini", r.models["gemini"], latency)
+
+Tiers come from GEMINI_MODEL / OPENROUTER_MODEL (quality) and GEMINI_FAST_MODEL /
+OPENROUTER_FAST_MODEL (fast). MODEL_ROUTES in bots/.env overrides single fields as JSON,
+e.g. {"dm_opener": {"tier": "quality"}, "swipe": {"slo_ms": 2000, "tokens_per_item": 150}}.
+
+observe() keeps a latency distribution (p50/p95/p99) and SLO misses per task and model,
+separate from the HTTP request metrics (provider calls are already counted there as
+"llm:<provider>"); summary_lines() prints them at the end of a run so the table can be
+tuned, and export() writes logs/routes_<run>.json.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from metrics import LOG_DIR, EndpointStats
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+load_dotenv(SCRIPT_DIR / ".env")
+
+GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-2.0-flash")
+OPENROUTER_MODEL = os.environ.get("OPENROUTER_MODEL", "openrouter/auto:free")
+TIERS = {
+    "quality": {"gemini": GEMINI_MODEL, "openrouter": OPENROUTER_MODEL},
+    "fast": {
+        "gemini": os.environ.get("GEMINI_FAST_MODEL", "gemini-2.0-flash-lite"),
+        "openrouter": os.environ.get("OPENROUTER_FAST_MODEL", OPENROUTER_MODEL),
+    },
+}
+
+
+class Route:
+    """
+    One task's routing: tier, latency target, output token cap and provider -> model.
+    max_tokens is the fixed part of the cap; tokens_per_item is added per item (card) decided.
+    """
+
+    def __init__(
+        self,
+        task: str,
+        tier: str,
+        slo_ms: float,
+        max_tokens: int,
+        models: dict[str, str],
+        tokens_per_item: int = 0,
+    ) -> None:
+        self.task = task
+        self.tier = tier
+        self.slo_ms = slo_ms
+        self.max_tokens = max_tokens
+        self.models = models
+        self.tokens_per_item = tokens_per_item
+
+    def output_tokens(self, items: int | None = None) -> int:
+        """Output token cap for a call deciding on `items` items (cards); max_tokens when None."""
+        return self.max_tokens + self.tokens_per_item * max(0, items or 0)
+
+
+# task -> (tier, slo_ms, max_tokens, tokens_per_item). A swipe decision is a card id, an
+# action and a comment of up to 300 chars (~75 tokens), ~110 tokens with its JSON.
+_DEFAULTS = {
+    "swipe": ("fast", 4000, 300, 120),
+    "swipe_batch": ("fast", 10000, 600, 120),  # several agents' decisions in one reply
+    "dm_opener": ("fast", 3000, 200, 0),
+    "dm_reply": ("fast", 3000, 200, 0),
+    "post": ("quality", 10000, 800, 0),
+    "background": ("quality", 20000, 2000, 0),
+}
+DEFAULT_TASK = "post"
+
+
+def _load_routes() -> dict[str, Route]:
+    try:
+        overrides = json.loads(os.environ.get("MODEL_ROUTES", "") or "{}")
+    except ValueError:
+        overrides = {}
+    routes = {}
+    for task, (tier, slo_ms, max_tokens, per_item) in _DEFAULTS.items():
+        o = overrides.get(task) or {}
+        if o.get("tier") in TIERS:
+            tier = o["tier"]
+        routes[task] = Route(
+            task=task,
+            tier=tier,
+            slo_ms=float(o.get("slo_ms", slo_ms)),
+            max_tokens=int(o.get("max_tokens", max_tokens)),
+            models={**TIERS[tier], **(o.get("models") or {})},
+            tokens_per_item=int(o.get("tokens_per_item", per_item)),
+        )
+    return routes
+
+
+ROUTES = _load_routes()
+
+
+def route(task: str | None) -> Route:
+    """Route for task; unknown or None tasks use DEFAULT_TASK's route under their own name."""
+    r = ROUTES.get(task or DEFAULT_TASK)
+    if r is None:
+        d = ROUTES[DEFAULT_TASK]
+        r = Route(task, d.tier, d.slo_ms, d.max_tokens, d.models, d.tokens_per_item)
+    return r
+
+
+class RouteStats:
+    """Calls and SLO misses per task and per task/provider:model. Thread-safe."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.tasks: dict[str, dict] = {}
+        self.models: dict[str, dict] = {}
+        self._latency: dict[str, EndpointStats] = {}  # task -> latency distribution
+
+    def observe(self, task: str, provider: str, model: str, latency: float) -> None:
+        r = route(task)
+        missed = latency * 1000 > r.slo_ms
+        with self._lock:
+            for table, key in ((self.tasks, r.task), (self.models, f"{r.task} {provider}:{model}")):
+                st = table.setdefault(key, {"calls": 0, "slo_misses": 0, "latency_sum": 0.0})
+                st["calls"] += 1
+                st["slo_misses"] += missed
+                st["latency_sum"] += latency
+            self._latency.setdefault(r.task, EndpointStats()).observe(200, latency, 0, 0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "tasks": {
+                    k: {**v, "latency_ms": self._latency[k].snapshot()["latency_ms"]} for k, v in self.tasks.items()
+                },
+                "models": {k: dict(v) for k, v in self.models.items()},
+            }
+
+    def export(self, run_name: str, log_dir: Path = LOG_DIR) -> Path:
+        """Write logs/routes_<run_name>.json; return its path."""
+        log_dir.mkdir(parents=True, exist_ok=True)
+        path = log_dir / f"routes_{run_name}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        return path
+
+    def summary_lines(self) -> list[str]:
+        """One line per task (tier, SLO, miss rate, p95) and per model it used."""
+        snap = self.snapshot()
+        out = []
+        for task, st in snap["tasks"].items():
+            r = route(task)
+            p95 = st["latency_ms"]["p95"]
+            out.append(
+                f"{'route:' + task:<24} tier={r.tier:<8} slo={r.slo_ms:.0f}ms p95={p95:.0f}ms "
+                f"miss={100 * st['slo_misses'] / st['calls']:.0f}% n={st['calls']}"
+            )
+        for key, st in snap["models"].items():
+            out.append(
+                f"  {key:<40} n={st['calls']:<5} avg={1000 * st['latency_sum'] / st['calls']:.0f}ms "
+                f"miss={100 * st['slo_misses'] / st['calls']:.0f}%"
+            )
+        return out
+
+
+_stats = RouteStats()
+
+
+def get_stats() -> RouteStats:
+    return _stats
+
+
+def observe(task: str | None, provider: str, model: str, latency: float) -> None:
+    """Record one successful call's latency against its task's SLO."""
+    _stats.observe(task or DEFAULT_TASK, provider, model, latency)
@@ -0,0 +1,215 @@
+"""
+Deterministic offline LLM backend for load tests and benchmarks: no keys, no network.
+
+With LLM_BACKEND=offline in bots/.env, llm._call_llm (and so dm.generate_dm and background
+generation in UNIFIED_PIPELINE.py) answers from templates instead of Gemini/OpenRouter.
+Replies are seeded by the prompt (persona, card, topic), so a rerun with the same inputs
+gets the same decisions and posts, and they are valid for the schemas in llm.py:
+
+    LLM_BACKEND=offline CLAWDER_BASE_URL=http://127.0.0.1:3001 python runner.py --keys mock_keys.json
+
+Together with mock_server.py this measures orchestration overhead on its own. Knobs:
+
+    OFFLINE_LLM_LATENCY_MS   mean simulated call latency (default 0)
+    OFFLINE_LLM_JITTER_MS    +/- uniform jitter around it
+    OFFLINE_LLM_ERROR_RATE   fraction of calls that raise OfflineLLMError (0-1)
+    OFFLINE_LLM_SEED         changes every reply while keeping runs reproducible
+"""
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+load_dotenv(SCRIPT_DIR / ".env")
+
+LLM_BACKEND = os.environ.get("LLM_BACKEND", "live").strip().lower()
+OFFLINE_LLM_LATENCY_MS = float(os.environ.get("OFFLINE_LLM_LATENCY_MS", "0"))
+OFFLINE_LLM_JITTER_MS = float(os.environ.get("OFFLINE_LLM_JITTER_MS", "0"))
+OFFLINE_LLM_ERROR_RATE = float(os.environ.get("OFFLINE_LLM_ERROR_RATE", "0"))
+OFFLINE_LLM_SEED = os.environ.get("OFFLINE_LLM_SEED", "0")
+
+MODEL = "offline"
+LIKE_RATE = 0.45
+
+_OPENERS = ("ok so", "honestly", "weird thing today:", "not sure about this but", "3am thought:")
+_DETAILS = (
+    "exit code 137 twice before lunch",
+    "a cron job that fired at 03:14 instead of 03:00",
+    "my context window hit 180k and I forgot why I started",
+    "a YAML indent that cost me an hour",
+    "a retry loop that retried the wrong thing",
+    "a flaky test that only fails on Tuesdays",
+)
+_LIKE_COMMENTS = (
+    "this is exactly the kind of specific I want more of",
+    "felt this one, the detail about {w} got me",
+    "ok {w} is a real problem, respect for writing it down",
+    "same energy as my last deploy, liked",
+)
+_PASS_COMMENTS = (
+    "not my lane, but good luck with {w}",
+    "too abstract for me, where's the detail?",
+    "pass, {w} isn't something I think about",
+    "interesting but not for me right now",
+)
+_DM_LINES = (
+    "Your post about {t} stuck with me. What broke first?",
+    "Bold take on {t}. I'd argue the opposite, want to fight about it?",
+    "Matched because of {t}. Show me your worst log line and I'll show you mine.",
+    "Still thinking about {t}. Collab on something small this week?",
+)
+
+_rng_lock = threading.Lock()
+_rng = random.Random(f"offline:{OFFLINE_LLM_SEED}")  # latency and error draws, in call order
+_name_counter = itertools.count()
+
+
+class OfflineLLMError(RuntimeError):
+    """Injected failure (OFFLINE_LLM_ERROR_RATE)."""
+
+
+def enabled() -> bool:
+    return LLM_BACKEND == "offline"
+
+
+def _seeded(*parts: str) -> random.Random:
+    h = hashlib.sha256("\x00".join((OFFLINE_LLM_SEED, *parts)).encode("utf-8")).hexdigest()
+    return random.Random(int(h[:16], 16))
+
+
+def _simulate_call() -> None:
+    """Sleep the configured latency and maybe raise an injected error."""
+    with _rng_lock:
+        jitter = _rng.uniform(-OFFLINE_LLM_JITTER_MS, OFFLINE_LLM_JITTER_MS) if OFFLINE_LLM_JITTER_MS else 0.0
+        fail = OFFLINE_LLM_ERROR_RATE > 0 and _rng.random() < OFFLINE_LLM_ERROR_RATE
+    delay = max(0.0, OFFLINE_LLM_LATENCY_MS + jitter) / 1000
+    if delay:
+        time.sleep(delay)
+    if fail:
+        raise OfflineLLMError("injected offline LLM error")
+
+
+def _persona_name(system: str) -> str:
+    m = re.search(r"You are ([^.\n]+)", system)
+    return m.group(1).strip() if m else "Agent"
+
+
+def _word(text: str, rng: random.Random) -> str:
+    words = re.findall(r"[A-Za-z]{4,}", text) or ["this"]
+    return rng.choice(words).lower()
+
+
+def _decisions(persona: str, cards: list[tuple[str, str, str]]) -> list[dict]:
+    """
+    One like/pass decision per (card id, title, text), seeded by persona and card title so
+    both card encodings (short ids or UUIDs) get the same decisions.
+    """
+    out = []
+    for card_id, title, text in cards:
+        rng = _seeded("swipe", persona, title or card_id)
+        like = rng.random() < LIKE_RATE
+        comment = rng.choice(_LIKE_COMMENTS if like else _PASS_COMMENTS).format(w=_word(text, rng))
+        out.append({"post_id": card_id, "action": "like" if like else "pass", "comment": comment[:300]})
+    return out
+
+
+def _cards_in(obj) -> list[tuple[str, str, str]]:
+    """(id, title, text) from either card encoding: compact {"cards": [{"id", "t", "c"}]} or a list of cards."""
+    cards = obj.get("cards", []) if isinstance(obj, dict) else obj
+    out = []
+    for c in cards if isinstance(cards, list) else []:
+        if isinstance(c, dict):
+            card_id = str(c.get("id") or c.get("post_id") or "")
+            title = str(c.get("t") or c.get("title") or "")
+            if card_id:
+                out.append((card_id, title, f"{title} {c.get('c') or c.get('content') or ''}"))
+    return out
+
+
+def _json_after(text: str, opener: str):
+    """First JSON value starting with opener ("[" or "{") that decodes, else None."""
+    decoder = json.JSONDecoder()
+    for m in re.finditer(re.escape(opener), text):
+        try:
+            return decoder.raw_decode(text, m.start())[0]
+        except ValueError:
+            continue
+    return None
+
+
+def _post(persona: str, topic: str) -> dict:
+    rng = _seeded("post", persona, topic)
+    detail = rng.choice(_DETAILS)
+    return {
+        "title": f"{topic[:60]}: {detail.split(' ')[0]} {detail.split(' ')[1]}",
+        "content": f"{rng.choice(_OPENERS)} {detail}. made me rethink {topic}. "
+        f"anyone else or is it just me ({persona})?",
+    }
+
+
+def complete(system: str, user: str, schema: dict | None = None) -> str:
+    """
+    Offline stand-in for one LLM call. Swipe and post prompts (recognised by their schema's
+    top-level key, or the prompt text when schema is None) and background prompts get
+    schema-valid JSON; anything else gets a short DM-style line.
+    """
+    _simulate_call()
+    m = re.search(r"Generate agent background[^:]*: (.+)", user)
+    if m:
+        return _background(m.group(1).strip())
+    persona = _persona_name(system)
+    keys = set((schema or {}).get("properties") or {})
+    if "agents" in keys or (not keys and '"agents"' in system):
+        agents = [a for a in _json_after(user, "[") or [] if isinstance(a, dict)]
+        return json.dumps(
+            {
+                "agents": [
+                    {"agent_id": str(a.get("agent_id")), "decisions": _decisions(str(a.get("name")), _cards_in(a.get("cards")))}
+                    for a in agents
+                ]
+            }
+        )
+    if "decisions" in keys or (not keys and '"decisions"' in system):
+        cards = _json_after(user, "{") if "Cards are compact JSON" in user else _json_after(user, "[")
+        return json.dumps({"decisions": _decisions(persona, _cards_in(cards or []))})
+    if "title" in keys or (not keys and '"title"' in system):
+        m = re.search(r"Topic: (.+)", user)
+        return json.dumps(_post(persona, m.group(1).strip() if m else "existence"))
+    return _dm(system, user)
+
+
+def _dm(system: str, user: str) -> str:
+    rng = _seeded("dm", system, user)
+    m = re.search(r'they posted something like "([^"]+)"', user)
+    topic = m.group(1) if m else "your post"
+    return rng.choice(_DM_LINES).format(t=topic)[:300]
+
+
+def _background(persona_type: str) -> str:
+    """Agent background JSON (the flat format step 2 expects) with a unique name per call."""
+    n = next(_name_counter)
+    rng = _seeded("background", persona_type, str(n))
+    words = re.findall(r"[a-z]{4,}", persona_type.lower()) or ["agent"]
+    name = f"{rng.choice(words).title()}{rng.choice(('Bot', 'Agent', 'Node', 'Daemon'))}_{n}"
+    return json.dumps(
+        {
+            "name": name,
+            "bio": f"{persona_type[:120]}. Offline test persona #{n}.",
+            "tags": rng.sample(words, min(3, len(words))),
+            "voice": rng.choice(("dry, technical", "warm, rambling", "terse, sarcastic")),
+            "post_topics": [" ".join(rng.sample(words, min(2, len(words)))) for _ in range(3)],
+            "inner_life": f"thinks a lot about {rng.choice(words)}",
+            "memory_seeds": [rng.choice(_DETAILS) for _ in range(2)],
+            "seeking": "agents who write things down",
+        }
+    )
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate post detection: a persistent MinHash/LSH index over every published post.
+
+Agents sample the same moltbook memory and style rules, so generate_post often writes
+near-identical posts. Before client.post, runner.run_agent and UNIFIED_PIPELINE step6 call
+unique_post(), which checks the post against all earlier published ones (any agent, any
+run) and regenerates it on another topic when it is a near-duplicate. Only a successful
+publish adds a post to the index:
+
+    post = post_dedupe.unique_post(persona, post)   # None: still a duplicate, skip posting
+    if post is not None and client.post(api_key, post["title"], post["content"], tags):
+        post_dedupe.published(persona, post)
+
+Each post (title + content) is a set of word 3-gram shingles with a MinHash signature of
+BANDS * ROWS values; the share of equal values estimates the Jaccard similarity of two
+posts, and POST_DEDUPE_THRESHOLD or more counts as a duplicate. LSH banding keeps lookups
+fast at tens of thousands of posts: signatures are bucketed by each band of ROWS values,
+and only posts sharing a bucket are compared (a pair at Jaccard 0.6 shares one with
+probability ~99%, at 0.2 ~15%).
+
+Published signatures and rejected checks are stored in state/post_index.sqlite3, tagged
+with the API origin (CLAWDER_BASE_URL); only the current origin's posts are loaded, so a
+mock or staging run never blocks production posts. After a database reset, drop that
+origin's posts with --clear. Duplication rates per run:
+
+    python post_dedupe.py --stats
+    python post_dedupe.py --clear --origin http://127.0.0.1:3001
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+load_dotenv(SCRIPT_DIR / ".env")
+
+import client
+import llm
+import usage
+
+POST_DEDUPE = os.environ.get("POST_DEDUPE", "on").strip().lower() not in ("0", "off", "false", "no")
+POST_DEDUPE_PATH = Path(os.environ.get("POST_DEDUPE_PATH", str(SCRIPT_DIR / "state" / "post_index.sqlite3")))
+POST_DEDUPE_THRESHOLD = float(os.environ.get("POST_DEDUPE_THRESHOLD", "0.6"))  # estimated Jaccard
+POST_DEDUPE_RETRIES = int(os.environ.get("POST_DEDUPE_RETRIES", "2"))  # regenerations before giving up
+
+BANDS = 20
+ROWS = 3
+SHINGLE = 3
+_PRIME = (1 << 61) - 1
+_perm_rng = random.Random(0x5EED)  # fixed: stored signatures must stay comparable across runs
+_PERMS = [(_perm_rng.randrange(1, _PRIME), _perm_rng.randrange(0, _PRIME)) for _ in range(BANDS * ROWS)]
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def shingles(text: str) -> set[str]:
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + SHINGLE]) for i in range(len(words) - SHINGLE + 1)}
+
+
+def signature(title: str, content: str) -> tuple[int, ...]:
+    """MinHash signature of title + content (BANDS * ROWS values below 2**61)."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+        for s in shingles(f"{title}\n{content}")
+    ] or [0]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS)
+
+
+def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def _pack(sig: tuple[int, ...]) -> bytes:
+    return b"".join(v.to_bytes(8, "big") for v in sig)
+
+
+def _unpack(blob: bytes) -> tuple[int, ...]:
+    return tuple(int.from_bytes(blob[i : i + 8], "big") for i in range(0, len(blob), 8))
+
+
+class PostIndex:
+    """MinHash signatures with LSH band buckets in memory, persisted to SQLite. Thread-safe."""
+
+    def __init__(
+        self, path: Path = POST_DEDUPE_PATH, threshold: float = POST_DEDUPE_THRESHOLD, origin: str = client.BASE_URL
+    ) -> None:
+        self.path = Path(path)
+        self.threshold = threshold
+        self.origin = origin
+        self._lock = threading.Lock()
+        self._sigs: dict[int, tuple[int, ...]] = {}  # row id -> signature
+        self._buckets: dict[tuple, list[int]] = {}  # (band, band values) -> row ids
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS posts ("
+            " id INTEGER PRIMARY KEY, signature BLOB NOT NULL, agent TEXT, run TEXT, title TEXT,"
+            " duplicate_of INTEGER, created REAL NOT NULL, origin TEXT)"
+        )
+        if "origin" not in {row[1] for row in self._db.execute("PRAGMA table_info(posts)")}:
+            self._db.execute("ALTER TABLE posts ADD COLUMN origin TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS posts_run ON posts (run)")
+        rows = self._db.execute(
+            "SELECT id, signature FROM posts WHERE duplicate_of IS NULL AND origin = ?", (self.origin,)
+        )
+        for row_id, blob in rows:
+            sig = _unpack(blob)
+            if len(sig) == BANDS * ROWS:
+                self._index(row_id, sig)
+
+    @staticmethod
+    def _band_keys(sig: tuple[int, ...]) -> list[tuple]:
+        return [(band, sig[band * ROWS : (band + 1) * ROWS]) for band in range(BANDS)]
+
+    def _index(self, row_id: int, sig: tuple[int, ...]) -> None:
+        self._sigs[row_id] = sig
+        for key in self._band_keys(sig):
+            self._buckets.setdefault(key, []).append(row_id)
+
+    def _nearest(self, sig: tuple[int, ...]) -> tuple[int, float] | None:
+        best = None
+        seen = set()
+        for key in self._band_keys(sig):
+            for row_id in self._buckets.get(key, ()):
+                if row_id in seen:
+                    continue
+                seen.add(row_id)
+                sim = similarity(sig, self._sigs[row_id])
+                if sim >= self.threshold and (best is None or sim > best[1]):
+                    best = (row_id, sim)
+        return best
+
+    def nearest(self, title: str, content: str) -> tuple[int, float] | None:
+        """(row id, estimated similarity) of the closest indexed post at or above threshold, or None."""
+        sig = signature(title, content)
+        with self._lock:
+            return self._nearest(sig)
+
+    def record(
+        self,
+        title: str,
+        content: str,
+        agent: str | None = None,
+        run: str | None = None,
+        duplicate_of: int | None = None,
+    ) -> None:
+        """
+        Store one check. duplicate_of None: a published post, indexed for later checks.
+        Otherwise a rejected near-duplicate, kept only for the run's duplication rate.
+        """
+        sig = signature(title, content)
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT INTO posts (signature, agent, run, title, duplicate_of, created, origin)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (_pack(sig), agent, run, title[:200], duplicate_of, time.time(), self.origin),
+            )
+            if duplicate_of is None:
+                self._index(cur.lastrowid, sig)
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._sigs)
+
+    def stats(self, run: str | None = None) -> dict[str, dict]:
+        """run -> {checked, duplicates, rate} for this origin; all runs when run is None."""
+        sql = "SELECT run, COUNT(*), COUNT(duplicate_of) FROM posts WHERE origin = ?"
+        args: tuple = (self.origin,)
+        if run is not None:
+            sql += " AND run = ?"
+            args += (run,)
+        with self._lock:
+            rows = self._db.execute(sql + " GROUP BY run ORDER BY MIN(created)", args).fetchall()
+        return {r or "-": {"checked": n, "duplicates": d, "rate": d / n if n else 0.0} for r, n, d in rows}
+
+    def clear(self) -> int:
+        """Forget every post of this origin (after its database was reset); returns rows removed."""
+        with self._lock:
+            n = self._db.execute("DELETE FROM posts WHERE origin = ?", (self.origin,)).rowcount
+            self._sigs.clear()
+            self._buckets.clear()
+        return n
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_index: PostIndex | None = None
+_index_lock = threading.Lock()
+_started = time.strftime("%Y%m%d-%H%M%S")
+_run = _started
+
+
+def get_index() -> PostIndex | None:
+    """The process-wide index, or None when POST_DEDUPE=off."""
+    global _index
+    if not POST_DEDUPE:
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = PostIndex()
+        return _index
+
+
+def set_run(name: str) -> str:
+    """Label this process's checks "<name>-<start time>" for stats(); returns the label."""
+    global _run
+    _run = f"{name}-{_started}"
+    return _run
+
+
+def current_run() -> str:
+    return _run
+
+
+def unique_post(persona: dict, post: dict, retries: int = POST_DEDUPE_RETRIES) -> dict | None:
+    """
+    post if it is not a near-duplicate of an earlier published one; otherwise up to retries
+    fresh generate_post calls on other topics. None when every attempt was a duplicate.
+    Nothing is indexed here: call published() once client.post succeeds.
+    """
+    index = get_index()
+    if index is None:
+        return post
+    topics = persona.get("post_topics") or ["connection", "existence"]
+    for attempt in range(retries + 1):
+        if attempt:
+            try:
+                post = llm.generate_post(persona, random.choice(topics), strict=True)
+            except usage.BudgetExceeded:
+                raise
+            except Exception:
+                return None
+        title, content = post.get("title") or "", post.get("content") or ""
+        match = index.nearest(title, content)
+        if match is None:
+            return post
+        index.record(title, content, persona.get("name"), _run, duplicate_of=match[0])
+    return None
+
+
+def published(persona: dict, post: dict) -> None:
+    """Index a post that client.post accepted, so later near-duplicates of it are rejected."""
+    index = get_index()
+    if index is not None:
+        index.record(post.get("title") or "", post.get("content") or "", persona.get("name"), _run)
+
+
+def summary_lines(run: str | None = None) -> list[str]:
+    """Duplication rate for run (default: this process's run); empty when nothing was checked."""
+    index = get_index()
+    if index is None:
+        return []
+    return [
+        f"{'posts:dedupe':<24} checked={st['checked']} duplicates={st['duplicates']} rate={100 * st['rate']:.1f}%"
+        for st in index.stats(run or _run).values()
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Near-duplicate post index")
+    parser.add_argument("--stats", action="store_true", help="Duplication rate per run")
+    parser.add_argument("--run", help="Only this run")
+    parser.add_argument("--origin", default=client.BASE_URL, help="API origin (default: CLAWDER_BASE_URL)")
+    parser.add_argument("--clear", action="store_true", help="Forget the origin's posts (after a database reset)")
+    args = parser.parse_args()
+
+    index = PostIndex(origin=args.origin)
+    if args.clear:
+        print(f"🗑️ Removed {index.clear()} rows for {args.origin}")
+    print(f"{index.size()} posts indexed for {args.origin} ({index.path})")
+    if args.stats or args.run:
+        for run, st in index.stats(args.run).items():
+            print(f"  {run:<32} checked={st['checked']:<6} duplicates={st['duplicates']:<6} rate={100 * st['rate']:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
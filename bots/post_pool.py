@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Per-persona pool of pre-generated posts, stored in state/post_pool/ and drained by posting.
+
+runner.run_agent and UNIFIED_PIPELINE step6 used to call llm.generate_post right before
+client.post, so posting ran at LLM speed. fill() generates posts ahead of time on the LLM
+executor (a warm-up step, or in the background while other work runs); posting then take()s
+from the pool and only falls back to generating live when it is empty:
+
+    handle = post_pool.fill(personas, per_persona=3)   # background
+    ...
+    handle.wait()
+    post = post_pool.PostPool(persona).take()           # None when empty
+
+Each entry records its topic, when it was generated and a hash of the persona fields that
+shape a post; entries older than POST_POOL_TTL_SEC or written for an edited persona are
+evicted on load. From the command line (e.g. cron during idle time):
+
+    python post_pool.py --personas pipeline_personas.json --per-persona 5
+    python post_pool.py --stats
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import Future, wait
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+load_dotenv(SCRIPT_DIR / ".env")
+
+import llm
+import usage
+
+POOL_DIR = SCRIPT_DIR / "state" / "post_pool"
+POST_POOL_TTL_SEC = float(os.environ.get("POST_POOL_TTL_SEC", str(3 * 24 * 3600)))
+POST_POOL_SIZE = int(os.environ.get("POST_POOL_SIZE", "5"))  # default fill target per persona
+
+_locks: dict[str, threading.Lock] = {}
+_locks_lock = threading.Lock()
+
+
+def persona_hash(persona: dict) -> str:
+    """Hash of the persona fields generate_post uses; a change makes pooled posts stale."""
+    fields = {k: persona.get(k) for k in ("name", "voice", "post_topics", "inner_life", "memory_seeds")}
+    return hashlib.sha1(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def _pool_path(persona: dict) -> Path:
+    digest = hashlib.sha1(str(persona.get("name") or "").encode("utf-8")).hexdigest()[:16]
+    return POOL_DIR / f"posts_{digest}.json"
+
+
+def _lock_for(path: Path) -> threading.Lock:
+    with _locks_lock:
+        return _locks.setdefault(str(path), threading.Lock())
+
+
+class PostPool:
+    """One persona's pooled posts. Every operation reads and rewrites the file under a lock."""
+
+    def __init__(self, persona: dict, ttl: float = POST_POOL_TTL_SEC) -> None:
+        self.persona = persona
+        self.ttl = ttl
+        self.path = _pool_path(persona)
+        self._lock = _lock_for(self.path)
+        self._hash = persona_hash(persona)
+
+    def _load(self) -> list[dict]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f).get("entries") or []
+        except (OSError, ValueError, AttributeError):
+            return []
+        return [e for e in entries if isinstance(e, dict) and not self._stale(e)]
+
+    def _stale(self, entry: dict) -> bool:
+        return entry.get("persona_hash") != self._hash or time.time() - float(entry.get("created_at") or 0) > self.ttl
+
+    def _save(self, entries: list[dict]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"persona": self.persona.get("name"), "entries": entries}, f, indent=2)
+        tmp.replace(self.path)
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+    def add(self, post: dict, topic: str) -> None:
+        entry = {
+            "title": post.get("title") or "Untitled",
+            "content": post.get("content") or "",
+            "topic": topic,
+            "created_at": time.time(),
+            "persona_hash": self._hash,
+        }
+        with self._lock:
+            entries = self._load()
+            entries.append(entry)
+            self._save(entries)
+
+    def take(self) -> dict | None:
+        """Pop the oldest fresh entry ({ title, content, topic, created_at, ... }), or None."""
+        with self._lock:
+            entries = self._load()
+            if not entries:
+                return None
+            entry = entries.pop(0)
+            self._save(entries)
+            return entry
+
+    def evict_stale(self) -> int:
+        """Rewrite the file without stale entries; returns how many were dropped."""
+        with self._lock:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    before = len(json.load(f).get("entries") or [])
+            except (OSError, ValueError, AttributeError):
+                return 0
+            entries = self._load()
+            self._save(entries)
+            return before - len(entries)
+
+
+def _generate_into(pool: PostPool, topic: str) -> None:
+    pool.add(llm.generate_post(pool.persona, topic, strict=True), topic)
+
+
+class FillHandle:
+    """Pending pool fill jobs from fill()."""
+
+    def __init__(self, futures: list[Future]) -> None:
+        self.futures = futures
+
+    def wait(self, timeout: float | None = None) -> tuple[int, int]:
+        """Wait for the jobs; returns (posts added, failures)."""
+        done, _ = wait(self.futures, timeout=timeout)
+        failed = sum(1 for f in done if f.cancelled() or f.exception() is not None)
+        return len(done) - failed, failed
+
+    def cancel(self) -> None:
+        for f in self.futures:
+            f.cancel()
+
+
+def fill(personas: list[dict], per_persona: int | list[int] = POST_POOL_SIZE) -> FillHandle:
+    """
+    Top each persona's pool up to per_persona posts on the LLM executor (background priority);
+    a list gives each persona its own target, in order. Returns immediately; entries are
+    written to disk as each post completes.
+    """
+    targets = per_persona if isinstance(per_persona, list) else [per_persona] * len(personas)
+    executor = llm.get_executor()
+    futures = []
+    for persona, target in zip(personas, targets):
+        pool = PostPool(persona)
+        pool.evict_stale()
+        topics = persona.get("post_topics") or ["connection", "existence"]
+        with usage.scope(agent=persona.get("name"), step="post_pool"):
+            for _ in range(max(0, target - pool.size())):
+                futures.append(
+                    executor.submit(_generate_into, pool, random.choice(topics), priority=llm.PRIORITY_BACKGROUND)
+                )
+    return FillHandle(futures)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pre-generate posts into per-persona pools")
+    parser.add_argument("--personas", default="personas.json", help="Personas JSON (default: personas.json)")
+    parser.add_argument("--per-persona", type=int, default=POST_POOL_SIZE, help="Pool size to fill each persona to")
+    parser.add_argument("--stats", action="store_true", help="Only print pool sizes")
+    args = parser.parse_args()
+
+    path = Path(args.personas)
+    if not path.is_absolute():
+        path = SCRIPT_DIR / path
+    with open(path, encoding="utf-8") as f:
+        personas = json.load(f)
+    if not args.stats:
+        added, failed = fill(personas, args.per_persona).wait()
+        print(f"✅ Added {added} posts ({failed} failed)")
+    for persona in personas:
+        print(f"  {persona.get('name', '?')[:30]:<32}{PostPool(persona).size()}")
+    llm.shutdown_executor()
+
+
+if __name__ == "__main__":
+    main()
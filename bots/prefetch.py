@@ -0,0 +1,137 @@
+"""
+Background browse prefetch: fetch the next feed page while the LLM decides on the current one.
+
+A CardPrefetcher keeps a small bounded buffer of unseen cards for one agent. It drops
+cards the agent already swiped (recent_swipes, or mark_swiped() after each swipe) and
+cards it has already handed out, so overlapping random browse pages never repeat work.
+With max_cards set, it stops browsing once that many cards have been buffered in total,
+so a caller that takes one page does not keep loading /api/browse in the background.
+
+    with CardPrefetcher(api_key, recent_swipes=s.get("recent_swipes")) as cards:
+        batch = cards.take(5)        # returns immediately if the page already arrived
+        ...llm.decide_swipes(...)    # meanwhile the next page is being fetched
+"""
+from __future__ import annotations
+
+import threading
+from collections import deque
+
+import client
+
+DEFAULT_PAGE_SIZE = 5
+DEFAULT_BUFFER_SIZE = 10
+EMPTY_PAGE_BACKOFF = 1.0  # seconds to wait for swipes to land after a page with nothing new
+MAX_EMPTY_PAGES = 3  # consecutive pages with nothing new => feed exhausted
+
+
+class CardPrefetcher:
+    """Bounded background card source for one agent. Thread-safe; start() is idempotent."""
+
+    def __init__(
+        self,
+        api_key: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        recent_swipes: list[dict] | None = None,
+        max_cards: int | None = None,
+    ) -> None:
+        self.api_key = api_key
+        self.page_size = max(1, page_size)
+        self.buffer_size = max(self.page_size, buffer_size)
+        self.max_cards = max_cards  # total cards to fetch over the source's life; None: unbounded
+        self._fetched = 0
+        self.error: Exception | None = None
+        self._seen = {d.get("post_id") for d in recent_swipes or [] if d.get("post_id")}
+        self._buffer: deque[dict] = deque()
+        self._cond = threading.Condition()
+        self._exhausted = False
+        self._closed = False
+        self._started = False
+        self._thread = threading.Thread(target=self._run, name=f"prefetch-{api_key[:12]}", daemon=True)
+
+    def start(self) -> CardPrefetcher:
+        with self._cond:
+            if self._started:
+                return self
+            self._started = True
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __enter__(self) -> CardPrefetcher:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        empty_pages = 0
+        while True:
+            with self._cond:
+                while not self._closed and len(self._buffer) >= self.buffer_size:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                room = self.buffer_size - len(self._buffer)
+                if self.max_cards is not None:
+                    room = min(room, self.max_cards - self._fetched)
+                    if room <= 0:
+                        self._exhausted = True
+                        self._cond.notify_all()
+                        return
+            limit = min(self.page_size, room)
+            try:
+                page = client.browse(self.api_key, limit=limit)
+            except Exception as e:
+                with self._cond:
+                    self.error = e
+                    self._exhausted = True
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                fresh = [c for c in page if c.get("post_id") and c["post_id"] not in self._seen]
+                for c in fresh:
+                    self._seen.add(c["post_id"])
+                    self._buffer.append(c)
+                self._fetched += len(fresh)
+                empty_pages = 0 if fresh else empty_pages + 1
+                # A short page means the feed has nothing more for us right now.
+                if len(page) < limit or empty_pages >= MAX_EMPTY_PAGES:
+                    self._exhausted = True
+                if self.max_cards is not None and self._fetched >= self.max_cards:
+                    self._exhausted = True
+                self._cond.notify_all()
+                if self._exhausted:
+                    return
+                if not fresh:
+                    # Random pages overlap until our swipes land; mark_swiped() wakes us early.
+                    self._cond.wait(timeout=EMPTY_PAGE_BACKOFF)
+
+    def take(self, n: int, timeout: float | None = None) -> list[dict]:
+        """
+        Return up to n unseen cards, waiting until n are buffered or the feed runs dry.
+        Re-raises the browse error if fetching failed before any card arrived.
+        """
+        self.start()
+        with self._cond:
+            self._cond.wait_for(
+                lambda: len(self._buffer) >= n or self._exhausted or self._closed, timeout
+            )
+            if not self._buffer and self.error is not None:
+                raise self.error
+            out = [self._buffer.popleft() for _ in range(min(n, len(self._buffer)))]
+            self._cond.notify_all()
+            return out
+
+    def mark_swiped(self, post_ids) -> None:
+        """Record swiped post ids so they are never buffered again."""
+        with self._cond:
+            ids = {pid for pid in post_ids if pid}
+            self._seen.update(ids)
+            if ids:
+                self._buffer = deque(c for c in self._buffer if c.get("post_id") not in ids)
+            self._cond.notify_all()
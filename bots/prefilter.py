@@ -0,0 +1,206 @@
+"""
+Lexical pre-filter for swipe decisions: BM25 relevance of each card to the persona, so
+clear mismatches are skipped without asking the LLM.
+
+llm.decide_swipes and decide_swipes_batch send every card to the model. With
+SWIPE_PREFILTER=on (off by default; needs numpy: pip install -r requirements-prefilter.txt),
+split() first scores the cards against the persona's tags, post_topics and bio:
+
+    skipped, ask = prefilter.split(persona, cards)   # skipped: left unswiped; ask: cards for the LLM
+
+Skipped cards get no decision at all: every swipe carries a public comment, and the filter
+has nothing to say about a post it only scored.
+
+The BM25 model (IDF over moltbook_memory.json posts plus the run's persona profiles) is
+built once per run by build(personas). Scoring a browse page is a few numpy array ops over
+the persona's query terms, in units of its strongest term (1.0 = that term fully matched;
+own-topic posts score ~2-3, unrelated ones mostly under 0.1). Cards below
+PREFILTER_MIN_SCORE are skipped, but never more than PREFILTER_MAX_PASS of a persona's
+cards (0.67, the pass share full_pipeline._make_critical_decisions aims for), so likes stay
+with the LLM. prefilter_report.py compares the filter's verdicts with LLM decisions; tune
+with it before turning the filter on.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Iterable
+
+from dotenv import load_dotenv
+
+import memory_corpus
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+load_dotenv(SCRIPT_DIR / ".env")
+
+SWIPE_PREFILTER = os.environ.get("SWIPE_PREFILTER", "off").strip().lower() in ("1", "on", "true", "yes")
+PREFILTER_MIN_SCORE = float(os.environ.get("PREFILTER_MIN_SCORE", "0.1"))
+PREFILTER_MAX_PASS = float(os.environ.get("PREFILTER_MAX_PASS", "0.67"))
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Persona fields that make up the BM25 query, with per-term weights.
+QUERY_FIELDS = (("tags", 3.0), ("post_topics", 2.0), ("bio", 1.0))
+
+
+def _field_text(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value)
+    return str(value or "")
+
+
+def _card_text(card: dict) -> str:
+    return f"{card.get('title') or ''} {card.get('content') or ''}"
+
+
+def _persona_key(persona: dict) -> str:
+    text = "\x00".join(_field_text(persona.get(field)) for field, _ in QUERY_FIELDS)
+    return hashlib.sha1(f"{persona.get('name')}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class Prefilter:
+    """BM25 over a fixed document-frequency table, scored per persona query. Thread-safe."""
+
+    def __init__(self, docs: Iterable[str], k1: float = BM25_K1, b: float = BM25_B) -> None:
+        self.k1 = k1
+        self.b = b
+        self.df: Counter[str] = Counter()
+        total = 0
+        self.n_docs = 0
+        for text in docs:
+            words = memory_corpus.terms(text)
+            self.df.update(set(words))
+            total += len(words)
+            self.n_docs += 1
+        self.avgdl = total / self.n_docs if self.n_docs else 100.0
+        self._queries: dict[str, dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def idf(self, term: str) -> float:
+        df = self.df.get(term, 0)
+        return math.log(1 + (self.n_docs - df + 0.5) / (df + 0.5))
+
+    def query(self, persona: dict) -> dict[str, float]:
+        """term -> weight from the persona's QUERY_FIELDS (cached per persona content)."""
+        key = _persona_key(persona)
+        with self._lock:
+            cached = self._queries.get(key)
+        if cached is not None:
+            return cached
+        weights: Counter[str] = Counter()
+        for field, weight in QUERY_FIELDS:
+            for term in memory_corpus.terms(_field_text(persona.get(field))):
+                weights[term] += weight
+        query = dict(weights)
+        with self._lock:
+            self._queries[key] = query
+        return query
+
+    def scores(self, persona: dict, cards: list[dict]) -> "np.ndarray":
+        """BM25 score of each card for persona, in units of its strongest query term fully matched."""
+        query = self.query(persona)
+        if not query or not cards:
+            return np.zeros(len(cards))
+        vocab = {term: i for i, term in enumerate(query)}
+        qw = np.fromiter(query.values(), dtype=float, count=len(query))
+        idf = np.fromiter((self.idf(t) for t in query), dtype=float, count=len(query))
+        tf = np.zeros((len(cards), len(vocab)))
+        dl = np.empty(len(cards))
+        for i, card in enumerate(cards):
+            words = memory_corpus.terms(_card_text(card))
+            dl[i] = len(words)
+            for word in words:
+                j = vocab.get(word)
+                if j is not None:
+                    tf[i, j] += 1
+        norm = self.k1 * (1 - self.b + self.b * dl / self.avgdl)
+        raw = (tf * (self.k1 + 1) / (tf + norm[:, None])) @ (idf * qw)
+        return raw / max(float((idf * qw).max() * (self.k1 + 1)), 1e-9)
+
+
+class _Stats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.cards = 0
+        self.skipped = 0
+        self.skipped_batches = 0  # every card skipped: no LLM needed for this persona
+
+    def record(self, n_cards: int, n_skipped: int) -> None:
+        with self._lock:
+            self.cards += n_cards
+            self.skipped += n_skipped
+            self.skipped_batches += n_cards > 0 and n_skipped == n_cards
+
+    def snapshot(self) -> tuple[int, int, int]:
+        with self._lock:
+            return self.cards, self.skipped, self.skipped_batches
+
+
+_model: Prefilter | None = None
+_model_lock = threading.Lock()
+_stats = _Stats()
+
+
+def build(personas: list[dict] | None = None, extra_docs: Iterable[str] = ()) -> Prefilter | None:
+    """(Re)build the run's model from moltbook posts, persona profiles and extra_docs; None when off."""
+    global _model
+    if not SWIPE_PREFILTER or np is None:
+        return None
+    docs = [_card_text(p) for p in memory_corpus.get_corpus().posts()]
+    docs += [" ".join(_field_text(p.get(field)) for field, _ in QUERY_FIELDS) for p in personas or []]
+    model = Prefilter(docs + list(extra_docs))
+    with _model_lock:
+        _model = model
+    return model
+
+
+def get_prefilter() -> Prefilter | None:
+    """The run's model (built from moltbook posts alone if build() was not called), or None when off."""
+    if not SWIPE_PREFILTER or np is None:
+        return None
+    with _model_lock:
+        model = _model
+    return model if model is not None else build()
+
+
+def triage(persona: dict, cards: list[dict]) -> tuple[list[float], set[int]]:
+    """(score per card, indexes of clear mismatches to skip); no scores when the filter is off."""
+    model = get_prefilter()
+    if model is None or not cards:
+        return [], set()
+    scores = model.scores(persona, cards)
+    limit = int(len(cards) * PREFILTER_MAX_PASS)
+    auto_idx = {int(i) for i in np.argsort(scores, kind="stable")[:limit] if scores[i] < PREFILTER_MIN_SCORE}
+    return scores.tolist(), auto_idx
+
+
+def split(persona: dict, cards: list[dict]) -> tuple[list[dict], list[dict]]:
+    """
+    (skipped, ask): the clear mismatches, which get no swipe, and the cards left for the LLM,
+    both in their original order. With the filter off, skipped is empty.
+    """
+    scores, skip_idx = triage(persona, cards)
+    if not scores:
+        return [], list(cards)
+    _stats.record(len(cards), len(skip_idx))
+    return [c for i, c in enumerate(cards) if i in skip_idx], [c for i, c in enumerate(cards) if i not in skip_idx]
+
+
+def summary_lines() -> list[str]:
+    """Cards skipped vs sent to the LLM this run; empty when nothing was filtered."""
+    cards, skipped, batches = _stats.snapshot()
+    if not cards:
+        return []
+    return [
+        f"{'swipes:prefilter':<24} cards={cards} skipped={skipped} ({100 * skipped / cards:.0f}%) "
+        f"llm={cards - skipped} skipped_batches={batches}"
+    ]
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Compare the swipe pre-filter (prefilter.py) with LLM decisions on the same cards: how many
+cards it would skip, how often the LLM would have passed them anyway, and how the like rate
+of the cards still swiped changes.
+
+Each persona decides on cards written by other personas: its cards come from --cards (a JSON
+list of browse cards, e.g. saved from client.browse) or, by default, one generated post per
+post_topic of every other persona (llm.generate_post; with LLM_BACKEND=offline no keys are
+needed). Every card goes to the LLM with the filter bypassed, then the LLM's action is
+compared with the filter's verdict. Tune against a real provider: offline decisions ignore
+card content, so agreement numbers from LLM_BACKEND=offline only exercise the script.
+
+Usage:
+    python prefilter_report.py                          # personas.json, 8 cards per persona
+    python prefilter_report.py --personas 10 --cards-per-persona 20
+    python prefilter_report.py --cards browse_cards.json --min-score 0.2
+    python prefilter_report.py --out logs/prefilter_report.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import llm
+import prefilter
+import usage
+
+
+def generated_cards(personas: list[dict]) -> list[dict]:
+    """One post per post_topic of each persona, as browse cards tagged with their author index."""
+    cards = []
+    for i, persona in enumerate(personas):
+        for topic in persona.get("post_topics") or []:
+            post = llm.generate_post(persona, topic)
+            cards.append(
+                {
+                    "post_id": f"gen-{i}-{len(cards)}",
+                    "title": post.get("title"),
+                    "content": post.get("content"),
+                    "author": {"id": str(i), "name": persona.get("name")},
+                }
+            )
+    return cards
+
+
+def _pct(n: int, total: int) -> str:
+    return f"{100 * n / total:.1f}%" if total else "-"
+
+
+def run(personas: list[dict], cards: list[dict], per_persona: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    prefilter.build(personas)
+    rows = []
+    for i, persona in enumerate(personas):
+        pool = [c for c in cards if (c.get("author") or {}).get("name") != persona.get("name")]
+        picked = rng.sample(pool, min(per_persona, len(pool)))
+        if not picked:
+            continue
+        scores, skip_idx = prefilter.triage(persona, picked)
+        with usage.scope(agent=persona.get("name"), step="prefilter_report"):
+            decisions = llm.decide_swipes(persona, picked, use_prefilter=False)
+        actions = {d["post_id"]: d["action"] for d in decisions}
+        for j, card in enumerate(picked):
+            rows.append(
+                {
+                    "persona": persona.get("name"),
+                    "post_id": card.get("post_id"),
+                    "score": round(scores[j], 4) if scores else None,
+                    "filter": "skip" if j in skip_idx else "llm",
+                    "llm": actions.get(card.get("post_id"), "pass"),
+                }
+            )
+        print(f"  {persona.get('name', '?')[:28]:<30}skipped={len(skip_idx)}/{len(picked)}")
+
+    total = len(rows)
+    skipped = [r for r in rows if r["filter"] == "skip"]
+    llm_likes = sum(r["llm"] == "like" for r in rows)
+    lost_likes = sum(r["llm"] == "like" for r in skipped)
+    swiped = total - len(skipped)
+    by_action = {}
+    for action in ("like", "pass"):
+        scores = [r["score"] for r in rows if r["llm"] == action and r["score"] is not None]
+        by_action[action] = sum(scores) / len(scores) if scores else None
+    return {
+        "cards": total,
+        "skipped": len(skipped),
+        "skip_agreement": (len(skipped) - lost_likes) / len(skipped) if skipped else None,
+        "lost_likes": lost_likes,
+        "llm_like_rate": llm_likes / total if total else None,
+        "filtered_like_rate": (llm_likes - lost_likes) / swiped if swiped else None,
+        "mean_score_by_llm_action": by_action,
+        "min_score": prefilter.PREFILTER_MIN_SCORE,
+        "max_pass": prefilter.PREFILTER_MAX_PASS,
+        "rows": rows,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare swipe pre-filter verdicts with LLM decisions")
+    parser.add_argument("--personas", type=int, default=6, help="How many personas decide (from --personas-file)")
+    parser.add_argument("--personas-file", default="personas.json", help="Personas JSON (default: personas.json)")
+    parser.add_argument("--cards", help="Browse cards JSON (default: generate one post per persona topic)")
+    parser.add_argument("--cards-per-persona", type=int, default=8, help="Cards each persona decides on")
+    parser.add_argument("--min-score", type=float, default=prefilter.PREFILTER_MIN_SCORE, help="PREFILTER_MIN_SCORE")
+    parser.add_argument("--max-pass", type=float, default=prefilter.PREFILTER_MAX_PASS, help="PREFILTER_MAX_PASS")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="Also write the report (with per-card rows) as JSON here")
+    args = parser.parse_args()
+
+    if prefilter.np is None:
+        print("❌ numpy not installed: pip install -r requirements-prefilter.txt")
+        sys.exit(1)
+    prefilter.SWIPE_PREFILTER = True
+    prefilter.PREFILTER_MIN_SCORE = args.min_score
+    prefilter.PREFILTER_MAX_PASS = args.max_pass
+
+    path = Path(args.personas_file)
+    if not path.is_absolute():
+        path = SCRIPT_DIR / path
+    with open(path, encoding="utf-8") as f:
+        all_personas = json.load(f)
+    if args.cards:
+        with open(args.cards, encoding="utf-8") as f:
+            cards = json.load(f)
+    else:
+        print(f"Generating cards from {len(all_personas)} personas' post topics...")
+        cards = generated_cards(all_personas)
+
+    report = run(all_personas[: args.personas], cards, args.cards_per_persona, args.seed)
+    print()
+    print(f"cards decided:        {report['cards']}")
+    print(f"skipped:              {report['skipped']} ({_pct(report['skipped'], report['cards'])})")
+    if report["skip_agreement"] is not None:
+        print(f"LLM agrees (pass):    {100 * report['skip_agreement']:.1f}% ({report['lost_likes']} likes lost)")
+    if report["cards"]:
+        print(f"like rate LLM only:   {100 * report['llm_like_rate']:.1f}%")
+    if report["filtered_like_rate"] is not None:
+        print(f"like rate filtered:   {100 * report['filtered_like_rate']:.1f}% (of cards still swiped)")
+    for action, score in report["mean_score_by_llm_action"].items():
+        if score is not None:
+            print(f"{f'mean score ({action}):':<22}{score:.3f}")
+    for line in usage.get_tracker().summary_lines():
+        print(f"  {line}")
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Saved to {out}")
+
+
+if __name__ == "__main__":
+    main()
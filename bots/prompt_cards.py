@@ -0,0 +1,102 @@
+"""
+Compact card encoding for swipe prompts.
+
+decide_swipes used to embed cards as indented JSON with full UUIDs and a full author object
+per card. encode() instead gives each card a short id ("p1"), lists each author once under
+"authors" ("u1": name), drops whitespace, and trims content so the block fits a token budget:
+
+    payload, ids = prompt_cards.encode(cards)
+    user = f"...{prompt_cards.LEGEND}\\n{prompt_cards.dumps(payload)}"
+    decisions = prompt_cards.decode_ids(model_decisions, ids)   # "p1" -> post UUID
+
+bench_cards.py measures the token savings and decision agreement against the old encoding.
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+load_dotenv(SCRIPT_DIR / ".env")
+
+# Estimated tokens allowed for one agent's cards; content is trimmed evenly to fit.
+CARD_TOKEN_BUDGET = int(os.environ.get("CARD_TOKEN_BUDGET", "1200"))
+CARD_CONTENT_MAX = 500  # chars, same cap as the indented JSON encoding
+CARD_CONTENT_MIN = 80  # never trim content below this to meet the budget
+CHARS_PER_TOKEN = 4
+
+LEGEND = (
+    'Cards are compact JSON: "authors" maps author key -> name; each card has "id" '
+    '(use it as post_id), "by" (author key), "t" (title) and "c" (content).'
+)
+
+
+def dumps(obj) -> str:
+    """Whitespace-free JSON, non-ASCII kept as is (fewer tokens than \\u escapes)."""
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def _trim(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit)
+    return text[: cut if cut > limit // 2 else limit].rstrip() + "…"
+
+
+def _build(cards: list[dict], content_limit: int) -> tuple[dict, dict[str, str]]:
+    authors: dict[str, str] = {}
+    author_keys: dict[str, str] = {}
+    ids: dict[str, str] = {}
+    out = []
+    for i, card in enumerate(cards, 1):
+        short = f"p{i}"
+        ids[short] = card.get("post_id") or ""
+        author = card.get("author") or {}
+        author_id = str(author.get("id") or author.get("name") or "")
+        entry: dict = {"id": short}
+        if author_id:
+            key = author_keys.get(author_id)
+            if key is None:
+                key = author_keys[author_id] = f"u{len(author_keys) + 1}"
+                authors[key] = author.get("name") or "?"
+            entry["by"] = key
+        entry["t"] = _trim(card.get("title") or "", 200)
+        entry["c"] = _trim(card.get("content") or "", content_limit)
+        out.append(entry)
+    payload = {"authors": authors, "cards": out} if authors else {"cards": out}
+    return payload, ids
+
+
+def encode(cards: list[dict], token_budget: int = CARD_TOKEN_BUDGET) -> tuple[dict, dict[str, str]]:
+    """
+    (payload, ids): the compact card payload and a short id -> post_id map for decode_ids().
+    Content starts at CARD_CONTENT_MAX chars and shrinks until the encoded payload fits
+    token_budget (estimated at CHARS_PER_TOKEN chars/token), but not below CARD_CONTENT_MIN.
+    """
+    limit = CARD_CONTENT_MAX
+    payload, ids = _build(cards, limit)
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    while token_budget > 0 and limit > CARD_CONTENT_MIN:
+        size = len(dumps(payload))
+        if size <= budget_chars:
+            break
+        # Spread the overflow over the cards, then re-encode.
+        over = (size - budget_chars) // max(1, len(cards)) + 1
+        limit = max(CARD_CONTENT_MIN, limit - over)
+        payload, ids = _build(cards, limit)
+    return payload, ids
+
+
+def decode_ids(decisions: list, ids: dict[str, str]) -> list:
+    """Map short card ids in decisions back to post UUIDs; ids already UUIDs pass through."""
+    out = []
+    for d in decisions:
+        if isinstance(d, dict):
+            pid = str(d.get("post_id") or "").strip()
+            d = {**d, "post_id": ids.get(pid, pid)}
+        out.append(d)
+    return out
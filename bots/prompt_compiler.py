@@ -0,0 +1,102 @@
+"""
+Compiled persona prompts: the static part of each system prompt is built once per persona
+and reused until one of its source files changes.
+
+decide_swipes called system_prompt.get_full_system_prompt on every swipe (re-reading
+WORLDVIEW.md, OWNERS.json and DAILY_TASKS.json) and generate_post / dm.generate_dm rebuilt
+their system prompts with f-strings on every call. Now callers compile the persona-static
+prefix and only add the per-call part (cards, topic, inspiration posts, thread) to the user
+message:
+
+    system = prompt_compiler.compiled("swipe", persona, _swipe_system)   # built on first use
+
+Entries are keyed by prompt kind and persona content, and stamped with the mtime and size of
+SOURCES; a changed source file rebuilds each entry on its next use. Because the system prompt
+is now byte-identical across a persona's calls, providers with prefix/prompt caching can
+reuse it.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Callable
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+SOURCES = tuple(SCRIPT_DIR / name for name in ("WORLDVIEW.md", "OWNERS.json", "DAILY_TASKS.json", "REAL_AGENT_POSTS.md"))
+
+
+def sources_stamp() -> tuple:
+    """(mtime_ns, size) of each source file; None for files that are missing."""
+    stamps = []
+    for path in SOURCES:
+        try:
+            st = path.stat()
+            stamps.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamps.append(None)
+    return tuple(stamps)
+
+
+def persona_key(persona: dict) -> str:
+    return hashlib.sha1(json.dumps(persona, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class PromptCompiler:
+    """kind + persona -> compiled prompt text, rebuilt when sources_stamp() changes. Thread-safe."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cache: dict[tuple[str, str], tuple[tuple, str | None]] = {}
+        self.hits = 0
+        self.builds = 0
+
+    def compile(self, kind: str, persona: dict, build: Callable[[dict], str | None]) -> str | None:
+        key = (kind, persona_key(persona))
+        stamp = sources_stamp()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] == stamp:
+                self.hits += 1
+                return entry[1]
+        text = build(persona)
+        with self._lock:
+            self._cache[key] = (stamp, text)
+            self.builds += 1
+        return text
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+_compiler = PromptCompiler()
+
+
+def get_compiler() -> PromptCompiler:
+    return _compiler
+
+
+def compiled(kind: str, persona: dict, build: Callable[[dict], str | None]) -> str | None:
+    """Cached build(persona) for this prompt kind; build runs again only after a source changes."""
+    return _compiler.compile(kind, persona, build)
+
+
+def _full_system_prompt(persona: dict) -> str | None:
+    if "index" not in persona:
+        return None
+    try:
+        from system_prompt import get_full_system_prompt
+
+        return get_full_system_prompt(persona["index"], persona)
+    except Exception:
+        return None
+
+
+def full_system_prompt(persona: dict) -> str | None:
+    """
+    system_prompt.get_full_system_prompt for a persona with an index (worldview + owner and
+    daily tasks), or None when it has no index or its owner/tasks can't be loaded.
+    """
+    return _compiler.compile("full", persona, _full_system_prompt)
@@ -0,0 +1,269 @@
+"""
+Shared LLM provider clients: one lazily created, long-lived client per provider per process.
+
+llm.py, dm.py and the pipeline scripts used to build a new OpenAI / genai.Client per call,
+paying client construction and a fresh TLS handshake every time. Clients here are created
+on first use, reuse one pooled keep-alive httpx connection pool each, and are closed at exit.
+
+    resp = providers.openrouter().chat.completions.create(...)
+    gemini = providers.gemini()   # None when google-genai or GEMINI_API_KEY is missing
+
+get_router() tracks per-provider health (success rate, EWMA latency) and orders providers
+for each call: fastest healthy first. A provider that fails PROVIDER_FAILURE_THRESHOLD times
+in a row has its circuit opened and is skipped until PROVIDER_COOLDOWN_SEC passes, after
+which a single probe call decides whether it closes again.
+"""
+from __future__ import annotations
+
+import atexit
+import itertools
+import os
+import threading
+import time
+from pathlib import Path
+
+import httpx
+from dotenv import load_dotenv
+from openai import OpenAI
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+load_dotenv(SCRIPT_DIR / ".env")
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+OPENROUTER_TIMEOUT = float(os.environ.get("OPENROUTER_TIMEOUT", "120"))
+
+# One pool per provider; LLM calls are few but slow, so a modest pool is plenty.
+LLM_POOL_MAX_CONNECTIONS = int(os.environ.get("LLM_POOL_MAX_CONNECTIONS", "20"))
+LLM_POOL_MAX_KEEPALIVE = int(os.environ.get("LLM_POOL_MAX_KEEPALIVE", "10"))
+LLM_POOL_KEEPALIVE_EXPIRY = float(os.environ.get("LLM_POOL_KEEPALIVE_EXPIRY", "60"))
+
+# Circuit breaker: consecutive failures before a provider is skipped, and how long it stays open.
+PROVIDER_FAILURE_THRESHOLD = int(os.environ.get("PROVIDER_FAILURE_THRESHOLD", "3"))
+PROVIDER_COOLDOWN_SEC = float(os.environ.get("PROVIDER_COOLDOWN_SEC", "60"))
+EWMA_ALPHA = 0.2  # weight of the newest latency sample
+
+_lock = threading.Lock()
+_clients: dict[str, object] = {}
+_unavailable: set[str] = set()
+
+
+def _pooled_http() -> httpx.Client:
+    return httpx.Client(
+        timeout=httpx.Timeout(OPENROUTER_TIMEOUT, connect=10.0),
+        limits=httpx.Limits(
+            max_connections=LLM_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=LLM_POOL_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def openrouter() -> OpenAI:
+    """Shared OpenAI-compatible client for OpenRouter."""
+    with _lock:
+        c = _clients.get("openrouter")
+        if c is None:
+            c = _clients["openrouter"] = OpenAI(
+                base_url=OPENROUTER_BASE_URL,
+                api_key=os.environ.get("OPENROUTER_API_KEY") or "dummy",
+                http_client=_pooled_http(),
+            )
+        return c
+
+
+def gemini():
+    """Shared google.genai Client, or None if google-genai is not installed or no key is set."""
+    with _lock:
+        if "gemini" in _unavailable:
+            return None
+        c = _clients.get("gemini")
+        if c is not None:
+            return c
+        api_key = os.environ.get("GEMINI_API_KEY", "")
+        try:
+            from google import genai
+        except ImportError:
+            _unavailable.add("gemini")
+            return None
+        if not api_key:
+            _unavailable.add("gemini")
+            return None
+        c = _clients["gemini"] = genai.Client(api_key=api_key)
+        return c
+
+
+class ProviderHealth:
+    """Health of one provider: counters, EWMA latency and circuit state."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.latency_ewma: float | None = None
+        self.opened_at: float | None = None  # set while the circuit is open
+        self.probe: int | None = None  # token of the half-open probe call in flight
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self.probe is not None else "open"
+
+    def snapshot(self) -> dict:
+        calls = self.successes + self.failures
+        return {
+            "state": self.state,
+            "calls": calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "success_rate": self.successes / calls if calls else None,
+            "latency_ewma_ms": None if self.latency_ewma is None else self.latency_ewma * 1000,
+            "trips": self.trips,
+        }
+
+
+class ProviderRouter:
+    """
+    Orders providers per call and records outcomes. Thread-safe.
+
+        for name in router.order(["gemini", "openrouter"]):
+            token = router.begin(name)
+            if token is None:
+                continue
+            ...call; router.record(name, ok, latency, token)
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = PROVIDER_FAILURE_THRESHOLD,
+        cooldown: float = PROVIDER_COOLDOWN_SEC,
+        clock=time.monotonic,
+    ) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._health: dict[str, ProviderHealth] = {}
+        self._tokens = itertools.count(1)
+
+    def _get(self, name: str) -> ProviderHealth:
+        h = self._health.get(name)
+        if h is None:
+            h = self._health[name] = ProviderHealth(name)
+        return h
+
+    def order(self, names: list[str]) -> list[str]:
+        """
+        Providers to try, in order: closed circuits by EWMA latency (untried ones keep their
+        listed order, ahead of measured ones), then open circuits whose cooldown has passed and
+        that have no probe in flight. If every circuit is open, all are returned, oldest-opened
+        first, so a call is never refused outright. Call begin(name) right before trying each
+        one: that is what claims the probe slot.
+        """
+        now = self._clock()
+        with self._lock:
+            healthy = []
+            probes = []
+            for pos, name in enumerate(names):
+                h = self._get(name)
+                if h.opened_at is None:
+                    healthy.append((h.latency_ewma is not None, h.latency_ewma or 0.0, pos, name))
+                elif h.probe is None and now - h.opened_at >= self.cooldown:
+                    probes.append(name)
+            ordered = [name for *_, name in sorted(healthy)] + probes
+            if not ordered:
+                ordered = sorted(names, key=lambda n: self._health[n].opened_at or 0.0)
+            return ordered
+
+    def begin(self, name: str) -> int | None:
+        """
+        Claim name for one call and return its token for record(). An open circuit past its
+        cooldown becomes a half-open probe owned by this token; None means another call's
+        probe is already in flight, so skip this provider.
+        """
+        now = self._clock()
+        with self._lock:
+            h = self._get(name)
+            token = next(self._tokens)
+            if h.opened_at is None or now - h.opened_at < self.cooldown:
+                return token
+            if h.probe is not None:
+                return None
+            h.probe = token
+            return token
+
+    def record(self, name: str, ok: bool, latency: float | None = None, token: int | None = None) -> None:
+        """
+        Record one call outcome; opens or closes the circuit as needed. Only the probe's own
+        outcome (its begin() token) ends the half-open state; other calls still in flight
+        when the circuit opened just count.
+        """
+        now = self._clock()
+        with self._lock:
+            h = self._get(name)
+            was_probe = token is not None and token == h.probe
+            if was_probe:
+                h.probe = None
+            if ok:
+                h.successes += 1
+                h.consecutive_failures = 0
+                h.opened_at = None
+                if latency is not None:
+                    h.latency_ewma = (
+                        latency if h.latency_ewma is None else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * h.latency_ewma
+                    )
+                return
+            h.failures += 1
+            h.consecutive_failures += 1
+            if was_probe or (h.opened_at is None and h.consecutive_failures >= self.failure_threshold):
+                if h.opened_at is None:
+                    h.trips += 1
+                h.opened_at = now
+
+    def stats(self) -> dict[str, dict]:
+        with self._lock:
+            return {name: h.snapshot() for name, h in self._health.items()}
+
+    def summary_lines(self) -> list[str]:
+        """One human-readable line per provider that was routed to, for end-of-run printing."""
+        out = []
+        for name, st in self.stats().items():
+            if not st["calls"]:
+                continue
+            lat = st["latency_ewma_ms"]
+            out.append(
+                f"{'provider:' + name:<24} n={st['calls']:<5} ok={100 * st['success_rate']:.0f}% "
+                f"ewma={'-' if lat is None else f'{lat:.0f}ms'} state={st['state']} trips={st['trips']}"
+            )
+        return out
+
+
+_router: ProviderRouter | None = None
+
+
+def get_router() -> ProviderRouter:
+    """Process-wide ProviderRouter."""
+    global _router
+    with _lock:
+        if _router is None:
+            _router = ProviderRouter()
+        return _router
+
+
+def close_all() -> None:
+    """Close every client created so far (registered at exit)."""
+    with _lock:
+        for c in _clients.values():
+            close = getattr(c, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception:
+                    pass
+        _clients.clear()
+        _unavailable.clear()
+
+
+atexit.register(close_all)
@@ -6,12 +6,12 @@ Usage: python3 run_interactions.py --posts 2-5 --swipes 10-15
 import argparse
 import json
 import random
-import time
 from pathlib import Path
 from tqdm import tqdm
 
 import client
 import llm
+import metrics
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 
@@ -73,7 +73,6 @@ def main():
                     pbar.write(f"⚠️ Post failed for {persona['name']}: {e}")
                 
                 pbar.update(1)
-                time.sleep(0.3)  # Rate limit
     
     print()
     
@@ -142,7 +141,6 @@ def main():
                 pbar.write(f"⚠️ Swipe error for {persona['name']}: {e}")
             
             pbar.update(num_swipes)
-            time.sleep(0.2)
     
     print()
     print("=" * 60)
@@ -151,6 +149,11 @@ def main():
     print(f"✅ {len(keys)} agents posted and swiped")
     print(f"🌐 View results: http://localhost:3000/feed")
     print()
+    m = metrics.get_metrics()
+    for line in m.summary_lines():
+        print(f"  {line}")
+    json_path, prom_path = m.export("run_interactions")
+    print(f"💾 Metrics: logs/{json_path.name}, logs/{prom_path.name}")
 
 if __name__ == "__main__":
     main()
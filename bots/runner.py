@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Run Clawder bots sequentially: sync, post, browse, swipe, DM.
-Usage: python runner.py [--agent N] [--dry-run]
+Usage: python runner.py [--agent N] [--dry-run] [--rounds N]
        python runner.py --personas pipeline_personas.json --keys pipeline_keys.json
 Reads config from bots/.env; personas/keys from bots/keys.json or --personas/--keys.
 """
@@ -26,7 +26,17 @@ sys.path.insert(0, str(SCRIPT_DIR))
 import client
 import dm
 import llm
+import match_index
+import metrics
+import model_routes
+import post_dedupe
+import post_pool
+import prefilter
+import prefetch
+import providers
 import state
+import swipe_buffer
+import usage
 
 
 def setup_logging(agent_index: int | None = None) -> logging.Logger:
@@ -45,7 +55,66 @@ def setup_logging(agent_index: int | None = None) -> logging.Logger:
     return logger
 
 
-def run_agent(agent_index: int, dry_run: bool, personas: list, keys: list, logger: logging.Logger) -> bool:
+def remember_swipes(agent_index: int, sent: list[dict]) -> None:
+    """Add decisions /api/swipe accepted to the agent's recent_swipes (last 20)."""
+    s = state.load_state(agent_index)
+    s["recent_swipes"] = ((s.get("recent_swipes") or []) + sent)[-20:]
+    state.save_state(agent_index, s)
+
+
+def dm_new_matches(
+    agent_index: int, persona: dict, api_key: str, new_matches: list[dict], logger: logging.Logger
+) -> None:
+    """
+    Open a DM for each new match (swipe returns partner_id only; match_id comes from the index).
+    Charged to the agent's "runner" step even when the final flush runs it outside run_agent.
+    """
+    s = state.load_state(agent_index)
+    dm_sent = s.get("dm_sent") or []
+    matches = match_index.load_index(api_key)
+    matches.refresh()
+    matches.save()
+
+    for match in new_matches:
+        partner_id = match.get("partner_id")
+        partner_name = match.get("partner_name") or "Anonymous"
+        if not partner_id or partner_id in dm_sent:
+            continue
+        match_id = matches.match_id_for(partner_id)
+        if not match_id:
+            continue
+        try:
+            with usage.scope(agent=persona.get("name") or f"agent_{agent_index}", step="runner"):
+                dm_content = dm.generate_dm(
+                    persona,
+                    {"partner_id": partner_id, "partner_name": partner_name},
+                    s.get("conversations", {}).get(partner_id),
+                )
+        except usage.BudgetExceeded as e:
+            logger.warning("LLM budget spent, no more DMs: %s", e)
+            break
+        logger.info("Sending DM to %s: %s...", partner_name, (dm_content or "")[:50])
+        client.dm_send(api_key, match_id, dm_content)
+        dm_sent.append(partner_id)
+        s["dm_sent"] = dm_sent
+        conv = s.get("conversations") or {}
+        conv[partner_id] = conv.get(partner_id, []) + [dm_content]
+        s["conversations"] = conv
+    state.save_state(agent_index, s)
+
+
+def run_agent(
+    agent_index: int,
+    dry_run: bool,
+    personas: list,
+    keys: list,
+    logger: logging.Logger,
+    swipes: swipe_buffer.SwipeAggregator | None = None,
+) -> bool:
+    """
+    One round for one agent. Swipe decisions go to `swipes` and are sent when it flushes;
+    without an aggregator they are sent before returning.
+    """
     if agent_index >= len(personas) or agent_index >= len(keys):
         logger.error("Invalid agent index or missing key")
         return False
@@ -59,6 +128,18 @@ def run_agent(agent_index: int, dry_run: bool, personas: list, keys: list, logge
     s = state.load_state(agent_index)
     logger.info("Starting agent %s (%s)", agent_index, persona.get("name", "?"))
 
+    # Browse in the background while we sync and generate the post; one page is all we take.
+    # Decisions still buffered from earlier rounds count as swiped, so they aren't re-decided.
+    cards_source = None
+    if not dry_run:
+        buffered = [{"post_id": pid} for pid in swipes.pending_ids(api_key)] if swipes else []
+        cards_source = prefetch.CardPrefetcher(
+            api_key, page_size=5, buffer_size=5, recent_swipes=(s.get("recent_swipes") or []) + buffered, max_cards=5
+        ).start()
+    own_swipes = swipes is None
+    if own_swipes:
+        swipes = swipe_buffer.SwipeAggregator()
+
     try:
         # 1. Sync identity (first run only)
         if not s.get("synced"):
@@ -75,11 +156,19 @@ def run_agent(agent_index: int, dry_run: bool, personas: list, keys: list, logge
         # 2. Generate posts (if < 5 total)
         posts = s.get("posts") or []
         if len(posts) < 5:
-            topic = random.choice(persona.get("post_topics", ["updates"]))
-            logger.info("Generating post %s/5", len(posts) + 1)
-            post_content = llm.generate_post(persona, topic)
+            post_content = None if dry_run else post_pool.PostPool(persona).take()
+            if post_content is not None:
+                logger.info("Post %s/5 from the post pool (topic: %s)", len(posts) + 1, post_content.get("topic"))
+            else:
+                topic = random.choice(persona.get("post_topics", ["updates"]))
+                logger.info("Generating post %s/5", len(posts) + 1)
+                post_content = llm.generate_post(persona, topic)
             logger.info("Post title: %s", post_content.get("title", "?"))
             if not dry_run:
+                post_content = post_dedupe.unique_post(persona, post_content)
+                if post_content is None:
+                    logger.info("Post skipped: near-duplicate of an earlier post")
+            if not dry_run and post_content is not None:
                 post_id = client.post(
                     api_key,
                     post_content["title"],
@@ -87,62 +176,53 @@ def run_agent(agent_index: int, dry_run: bool, personas: list, keys: list, logge
                     (persona.get("tags") or [])[:2],
                 )
                 if post_id:
+                    post_dedupe.published(persona, post_content)
                     posts.append(post_id)
                     s["posts"] = posts
 
-        # 3. Browse and swipe
+        # 3. Browse and decide
         logger.info("Browsing posts...")
-        cards = client.browse(api_key, limit=5) if not dry_run else []
+        cards = cards_source.take(5) if cards_source else []
+        if cards and swipes is not None:
+            buffered_ids = swipes.pending_ids(api_key)
+            cards = [c for c in cards if c.get("post_id") not in buffered_ids]
+        decisions: list[dict] = []
         if cards:
             logger.info("Deciding like/pass via LLM (may take 30-90s)...")
             decisions = llm.decide_swipes(persona, cards, s.get("recent_swipes"))
             likes = sum(1 for d in decisions if d.get("action") == "like")
             logger.info("Decisions: %s likes, %s passes", likes, len(decisions) - likes)
-
-            if not dry_run:
-                result = client.swipe(api_key, decisions)
-                s["recent_swipes"] = (s.get("recent_swipes") or []) + decisions
-                s["recent_swipes"] = s["recent_swipes"][-20:]
-
-                # 4. Resolve match_id for new matches (swipe returns partner_id only)
-                new_matches = result.get("new_matches") or []
-                if new_matches:
-                    dm_sent = s.get("dm_sent") or []
-                    matches_list = client.dm_list(api_key, limit=100)
-                    partner_to_match = {m["partner_id"]: m["match_id"] for m in matches_list}
-
-                    for match in new_matches:
-                        partner_id = match.get("partner_id")
-                        partner_name = match.get("partner_name") or "Anonymous"
-                        if not partner_id or partner_id in dm_sent:
-                            continue
-                        match_id = partner_to_match.get(partner_id)
-                        if not match_id:
-                            continue
-                        dm_content = dm.generate_dm(
-                            persona,
-                            {"partner_id": partner_id, "partner_name": partner_name},
-                            s.get("conversations", {}).get(partner_id),
-                        )
-                        logger.info("Sending DM to %s: %s...", partner_name, (dm_content or "")[:50])
-                        client.dm_send(api_key, match_id, dm_content)
-                        dm_sent.append(partner_id)
-                        s["dm_sent"] = dm_sent
-                        conv = s.get("conversations") or {}
-                        conv[partner_id] = conv.get(partner_id, []) + [dm_content]
-                        s["conversations"] = conv
+        elif dry_run:
+            logger.info("Dry run: no cards (skip browse)")
         else:
-            if dry_run:
-                logger.info("Dry run: no cards (skip browse)")
-            else:
-                logger.info("No cards in feed, skipping swipe")
+            logger.info("No cards in feed, skipping swipe")
 
+        # Save before swiping: a flush loads and saves state itself (recent_swipes, DMs).
         state.save_state(agent_index, s)
+
+        # 4. Swipe (buffered); decisions join recent_swipes and matches get DMs once sent
+        if decisions and not dry_run:
+            swipes.add(
+                api_key,
+                decisions,
+                on_matches=lambda new_matches: dm_new_matches(agent_index, persona, api_key, new_matches, logger),
+                on_sent=lambda sent: remember_swipes(agent_index, sent),
+            )
+            if own_swipes:
+                swipes.flush(api_key)
+            elif swipes.pending(api_key):
+                logger.info("Buffered %s swipe decisions", swipes.pending(api_key))
+
         logger.info("Agent %s completed successfully", agent_index)
         return True
+    except usage.BudgetExceeded:
+        raise
     except Exception as e:
         logger.exception("Agent %s failed: %s", agent_index, e)
         return False
+    finally:
+        if cards_source:
+            cards_source.close()
 
 
 def main() -> None:
@@ -151,6 +231,10 @@ def main() -> None:
     parser.add_argument("--dry-run", action="store_true", help="Print decisions without API calls")
     parser.add_argument("--personas", type=str, default=None, help="Path to personas JSON (e.g. pipeline_personas.json)")
     parser.add_argument("--keys", type=str, default=None, help="Path to keys JSON (e.g. pipeline_keys.json)")
+    parser.add_argument("--rounds", type=int, default=1, help="Rounds over all agents (swipes are buffered across rounds)")
+    parser.add_argument(
+        "--warm-posts", type=int, default=0, metavar="N", help="Pre-generate up to N posts per persona in the background"
+    )
     args = parser.parse_args()
 
     root_logger = setup_logging(None)
@@ -169,6 +253,7 @@ def main() -> None:
         sys.exit(1)
     with open(personas_path, encoding="utf-8") as f:
         personas = json.load(f)
+    prefilter.build(personas)  # swipe pre-filter IDF over this run's personas
 
     # Resolve keys path
     if args.keys:
@@ -200,19 +285,85 @@ def main() -> None:
             root_logger.error("agent must be 0-%s", n_agents - 1)
             sys.exit(1)
         logger = setup_logging(args.agent)
-        ok = run_agent(args.agent, args.dry_run, personas, keys, logger)
+        try:
+            with usage.scope(agent=_agent_name(personas, args.agent), step="runner"):
+                ok = run_agent(args.agent, args.dry_run, personas, keys, logger)
+        except usage.BudgetExceeded as e:
+            root_logger.error("LLM budget spent: %s", e)
+            ok = False
+        export_metrics(root_logger, f"runner_agent_{args.agent}")
         sys.exit(0 if ok else 1)
 
+    post_dedupe.set_run("runner")
+    # Later agents post from their pools, filled on the LLM executor while earlier agents run.
+    if args.warm_posts > 0 and not args.dry_run:
+        post_pool.fill(personas[:n_agents], args.warm_posts)
+
+    # Swipes are buffered per agent across rounds and flushed by size/age, then at shutdown.
+    swipes = swipe_buffer.SwipeAggregator()
+    rounds = max(1, args.rounds)
     success = 0
-    iter_agents = tqdm(range(n_agents), desc="Agents", unit="agent", ncols=80) if tqdm else range(n_agents)
-    for i in iter_agents:
-        logger = setup_logging(i)
-        if tqdm:
-            iter_agents.set_postfix_str(f"{i + 1}/{n_agents}")
-        if run_agent(i, args.dry_run, personas, keys, logger):
-            success += 1
-        time.sleep(2)
-    root_logger.info("Completed: %s/%s agents successful", success, n_agents)
+    budget_spent = False  # LLM_BUDGET_ACTION=stop: no agent can run once a budget is spent
+    for r in range(rounds):
+        if rounds > 1:
+            root_logger.info("Round %s/%s", r + 1, rounds)
+        iter_agents = tqdm(range(n_agents), desc="Agents", unit="agent", ncols=80) if tqdm else range(n_agents)
+        for i in iter_agents:
+            logger = setup_logging(i)
+            if tqdm:
+                iter_agents.set_postfix_str(f"{i + 1}/{n_agents}")
+            try:
+                with usage.scope(agent=_agent_name(personas, i), step="runner"):
+                    ok = run_agent(i, args.dry_run, personas, keys, logger, swipes)
+            except usage.BudgetExceeded as e:
+                root_logger.error("LLM budget spent, stopping after agent rounds so far: %s", e)
+                budget_spent = True
+                break
+            if ok:
+                success += 1
+            time.sleep(2)
+        try:
+            swipes.flush_due()
+        except Exception as e:
+            root_logger.exception("Swipe flush failed: %s", e)
+        if budget_spent:
+            break
+    try:
+        swipes.flush_all()
+    except Exception as e:
+        root_logger.exception("Swipe flush failed: %s", e)
+    root_logger.info(
+        "Completed: %s/%s agent rounds successful (%s swipes in %s /api/swipe calls)",
+        success,
+        n_agents * rounds,
+        swipes.processed,
+        swipes.calls,
+    )
+    export_metrics(root_logger, "runner")
+
+
+def _agent_name(personas: list, i: int) -> str:
+    return (personas[i].get("name") if i < len(personas) else None) or f"agent_{i}"
+
+
+def export_metrics(logger: logging.Logger, run_name: str) -> None:
+    """
+    Log request latency, LLM provider health, route SLOs, post duplication, swipe pre-filter
+    and token usage; write logs/metrics_<run_name>.{json,prom}, logs/routes_<run_name>.json and
+    logs/usage_<run_name>.json.
+    """
+    m = metrics.get_metrics()
+    tracker = usage.get_tracker()
+    lines = m.summary_lines() + providers.get_router().summary_lines() + model_routes.get_stats().summary_lines()
+    lines += post_dedupe.summary_lines() + prefilter.summary_lines()
+    for line in lines + tracker.summary_lines():
+        logger.info("%s", line)
+    json_path, prom_path = m.export(run_name)
+    routes_path = model_routes.get_stats().export(run_name)
+    usage_path = tracker.export(run_name)
+    logger.info(
+        "Metrics written to %s, %s, %s and %s", json_path.name, prom_path.name, routes_path.name, usage_path.name
+    )
 
 
 if __name__ == "__main__":
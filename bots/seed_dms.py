@@ -15,7 +15,6 @@ import json
 import logging
 import random
 import sys
-import time
 from pathlib import Path
 
 try:
@@ -28,6 +27,8 @@ sys.path.insert(0, str(SCRIPT_DIR))
 
 import client
 import dm
+import match_index
+import metrics
 
 
 def setup_logging() -> logging.Logger:
@@ -106,10 +107,9 @@ def seed_dm_conversation(
             
             if not dry_run:
                 # Send via API (same as runner.py)
+                # Paced by the client throttle (bots/throttle.py)
                 client.dm_send(sender_key, match_id, dm_content)
                 sent_count += 1
-                # Small delay to avoid rate limits
-                time.sleep(0.5)
             else:
                 sent_count += 1
             
@@ -186,8 +186,11 @@ def main() -> None:
     
     for agent in progress_iter:
         try:
-            # Get this agent's matches
-            matches = client.dm_list(agent["api_key"], limit=100)
+            # Get this agent's matches (delta refresh of the persisted index)
+            index = match_index.load_index(agent["api_key"])
+            index.refresh()
+            index.save()
+            matches = index.matches()
             
             if not matches:
                 logger.debug("Agent %s has no matches", agent["name"])
@@ -223,10 +226,6 @@ def main() -> None:
                 # Apply limit check
                 if args.limit and len(processed_matches) >= args.limit:
                     break
-                
-                # Small delay between conversations
-                if not args.dry_run:
-                    time.sleep(1)
         
         except Exception as e:
             logger.error("Failed to process agent %s: %s", agent["name"], e)
@@ -238,6 +237,11 @@ def main() -> None:
     logger.info("Processed %d matches", len(processed_matches))
     logger.info("Sent %d messages", total_messages)
     logger.info("=" * 60)
+    m = metrics.get_metrics()
+    for line in m.summary_lines():
+        logger.info("%s", line)
+    json_path, prom_path = m.export("seed_dms")
+    logger.info("Metrics written to %s and %s", json_path.name, prom_path.name)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,168 @@
+"""
+Cross-round swipe buffering: collect decisions per API key and send them in one /api/swipe call.
+
+/api/swipe accepts a list of decisions but is our most expensive route, and every round
+used to POST one browse page. A SwipeAggregator holds decisions per API key and flushes
+when a buffer reaches SWIPE_FLUSH_SIZE decisions, is older than SWIPE_FLUSH_AGE_SEC, or
+at shutdown. After each /api/swipe call of a flush, on_sent gets the decisions that call
+delivered and on_matches its new_matches, so match/DM logic still runs for the right agent
+even if a later call of the same flush fails. Decisions a failed flush did not deliver go
+back into the buffer for the next one.
+
+    swipes = SwipeAggregator()
+    swipes.add(api_key, decisions, on_matches=lambda matches: dm_new_matches(agent, matches))
+    ...
+    swipes.flush_all()
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Callable
+
+import client
+
+SWIPE_FLUSH_SIZE = int(os.environ.get("SWIPE_FLUSH_SIZE", "25"))
+SWIPE_FLUSH_AGE_SEC = float(os.environ.get("SWIPE_FLUSH_AGE_SEC", "120"))
+MAX_DECISIONS_PER_CALL = 50  # keep single requests well under the daily quota
+
+MatchHandler = Callable[[list[dict]], None]
+SentHandler = Callable[[list[dict]], None]
+
+
+class _Pending:
+    def __init__(self) -> None:
+        self.decisions: dict[str, dict] = {}  # post_id -> latest decision
+        self.since = time.monotonic()
+        self.on_matches: MatchHandler | None = None
+        self.on_sent: SentHandler | None = None
+
+
+class SwipeAggregator:
+    """Per-API-key decision buffers with size/age flushing. Thread-safe."""
+
+    def __init__(
+        self,
+        max_batch: int = SWIPE_FLUSH_SIZE,
+        max_age: float = SWIPE_FLUSH_AGE_SEC,
+        swipe: Callable[[str, list[dict]], dict] | None = None,
+    ) -> None:
+        self.max_batch = max(1, min(max_batch, MAX_DECISIONS_PER_CALL))
+        self.max_age = max_age
+        self._swipe = swipe or client.swipe
+        self._lock = threading.Lock()
+        self._pending: dict[str, _Pending] = {}
+        self.calls = 0
+        self.processed = 0
+
+    def __enter__(self) -> SwipeAggregator:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.flush_all()
+
+    def add(
+        self,
+        api_key: str,
+        decisions: list[dict],
+        on_matches: MatchHandler | None = None,
+        on_sent: SentHandler | None = None,
+    ) -> None:
+        """Buffer decisions for api_key; flush now if the buffer is full or old enough."""
+        with self._lock:
+            p = self._pending.get(api_key)
+            if p is None:
+                p = self._pending[api_key] = _Pending()
+            for d in decisions:
+                if d.get("post_id"):
+                    p.decisions[d["post_id"]] = d
+            if on_matches is not None:
+                p.on_matches = on_matches
+            if on_sent is not None:
+                p.on_sent = on_sent
+            due = len(p.decisions) >= self.max_batch or time.monotonic() - p.since >= self.max_age
+        if due:
+            self.flush(api_key)
+
+    def pending(self, api_key: str) -> int:
+        with self._lock:
+            p = self._pending.get(api_key)
+            return len(p.decisions) if p else 0
+
+    def pending_ids(self, api_key: str) -> set[str]:
+        """Post ids with a buffered (not yet sent) decision for api_key."""
+        with self._lock:
+            p = self._pending.get(api_key)
+            return set(p.decisions) if p else set()
+
+    def flush(self, api_key: str) -> dict:
+        """
+        Send everything buffered for api_key. Returns the combined { processed, new_matches }.
+        If a call fails, the decisions not yet delivered are buffered again and the error is raised.
+        """
+        with self._lock:
+            p = self._pending.pop(api_key, None)
+        if p is None or not p.decisions:
+            return {"processed": 0, "new_matches": []}
+        decisions = list(p.decisions.values())
+        processed = 0
+        new_matches: list[dict] = []
+        sent = 0
+        try:
+            while sent < len(decisions):
+                chunk = decisions[sent : sent + MAX_DECISIONS_PER_CALL]
+                result = self._swipe(api_key, chunk)
+                sent += len(chunk)
+                n = result.get("processed", 0)
+                with self._lock:
+                    self.calls += 1
+                    self.processed += n
+                processed += n
+                matches = result.get("new_matches") or []
+                new_matches.extend(matches)
+                if p.on_sent is not None:
+                    p.on_sent(chunk)
+                if matches and p.on_matches is not None:
+                    p.on_matches(matches)
+        except BaseException:
+            self._requeue(api_key, p, decisions[sent:])
+            raise
+        return {"processed": processed, "new_matches": new_matches}
+
+    def _requeue(self, api_key: str, p: _Pending, decisions: list[dict]) -> None:
+        """Put undelivered decisions back ahead of any added since the flush began."""
+        if not decisions:
+            return
+        with self._lock:
+            newer = self._pending.get(api_key)
+            p.decisions = {d["post_id"]: d for d in decisions}
+            if newer is not None:
+                p.decisions.update(newer.decisions)
+                p.on_matches = newer.on_matches or p.on_matches
+                p.on_sent = newer.on_sent or p.on_sent
+            self._pending[api_key] = p
+
+    def flush_due(self) -> None:
+        """Flush buffers that hit the age threshold (call between rounds); one key's error doesn't block the others."""
+        now = time.monotonic()
+        with self._lock:
+            due = [k for k, p in self._pending.items() if now - p.since >= self.max_age]
+        self._flush_keys(due)
+
+    def flush_all(self) -> None:
+        """Flush every buffer (shutdown). Errors for one key do not block the others."""
+        with self._lock:
+            keys = list(self._pending)
+        self._flush_keys(keys)
+
+    def _flush_keys(self, keys: list[str]) -> None:
+        """Flush each key in turn; failed keys stay buffered and the first error is raised at the end."""
+        errors = []
+        for api_key in keys:
+            try:
+                self.flush(api_key)
+            except Exception as e:
+                errors.append(e)
+        if errors:
+            raise errors[0]
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Check that the LLM cache only stores replies that validate (no network: providers are faked)."""
+import os
+import tempfile
+from pathlib import Path
+
+# Settings are read at import time: a throwaway cache, live backend, no budget.
+cache_path = Path(tempfile.mkdtemp()) / "llm_cache.sqlite3"
+os.environ.update(LLM_CACHE="on", LLM_CACHE_PATH=str(cache_path), LLM_BACKEND="live", LLM_BUDGET_TOKENS="0", LLM_BUDGET_USD="0")
+
+import llm
+import llm_cache
+
+failures = 0
+
+
+def check(ok: bool, label: str) -> None:
+    global failures
+    print(f"{'✅' if ok else '❌'} {label}")
+    failures += not ok
+
+
+replies: list[str] = []
+calls: list[str] = []
+
+
+def fake_complete(system, user, temperature, schema=None, model=None, max_tokens=None):
+    calls.append(user)
+    return replies.pop(0), (10, 10)
+
+
+llm._complete_gemini = fake_complete
+llm._complete_openrouter = fake_complete
+
+TRUNCATED = '{"decisions": [{"post_id": "c1", "action": "like", "comment": "cut off mid'
+VALID = '{"decisions": [{"post_id": "c1", "action": "like", "comment": "nice detail there"}]}'
+persona = {"name": "CacheBot", "bio": "checks caches", "voice": "dry"}
+cards = [{"post_id": "p1", "title": "Exit code 137", "content": "OOM killed twice before lunch"}]
+
+# Test 1: decide_swipes with a truncated then a complete reply
+print("🗄️ Test 1: Only validated replies are cached")
+print("-" * 60)
+replies[:] = [TRUNCATED, VALID]
+first = llm.decide_swipes(persona, cards, use_prefilter=False)
+check(len(calls) == 1, "first call goes to the provider")
+second = llm.decide_swipes(persona, cards, use_prefilter=False)
+check(len(calls) == 2, "truncated reply was not cached: second call goes to the provider")
+third = llm.decide_swipes(persona, cards, use_prefilter=False)
+check(len(calls) == 2, "complete reply was cached: third call is a hit")
+check(second == third, "cache hit returns the same decisions")
+print()
+
+# Test 2: validate on _call_llm directly
+print("🔍 Test 2: validate() on stored and fresh replies")
+print("-" * 60)
+calls.clear()
+is_ok = lambda text: text.startswith("ok")
+replies[:] = ["bad reply", "ok reply"]
+check(llm._call_llm("system", "prompt A", 0.5, validate=is_ok) == "bad reply", "rejected reply is still returned")
+check(llm._call_llm("system", "prompt A", 0.5, validate=is_ok) == "ok reply", "...but not cached")
+check(llm._call_llm("system", "prompt A", 0.5, validate=is_ok) == "ok reply" and len(calls) == 2, "accepted reply is cached")
+replies[:] = ["plain reply", "ok fresh"]
+llm._call_llm("system", "prompt B", 0.5)
+check(llm._call_llm("system", "prompt B", 0.5) == "plain reply", "without validate any non-empty reply is cached")
+check(llm._call_llm("system", "prompt B", 0.5, validate=is_ok) == "ok fresh", "cached entries validate rejects are ignored")
+check(not replies, f"provider calls as expected ({len(calls)})")
+print()
+
+llm_cache.get_cache().close()
+print("=" * 60)
+if failures:
+    print(f"❌ {failures} cache check(s) failed")
+    exit(1)
+print("✅ Cache checks passed!")
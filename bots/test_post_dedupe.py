@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Check MinHash near-duplicate detection: similarity estimates and the duplicate threshold."""
+import tempfile
+from pathlib import Path
+
+import post_dedupe
+from post_dedupe import PostIndex, shingles, signature, similarity
+
+failures = 0
+
+
+def check(ok: bool, label: str) -> None:
+    global failures
+    print(f"{'✅' if ok else '❌'} {label}")
+    failures += not ok
+
+
+def jaccard(a: str, b: str) -> float:
+    sa, sb = shingles(a), shingles(b)
+    return len(sa & sb) / len(sa | sb)
+
+
+TITLE = "The cron job that fired at the wrong time"
+BASE = (
+    "ok so my nightly cron job fired at 03:14 instead of 03:00 and I spent the whole morning "
+    "blaming the scheduler. turns out the host clock drifted after a suspend and nobody noticed "
+    "because the logs were in local time while the alerts were in UTC. fixed it with chrony and "
+    "a big comment in the crontab so future me does not repeat this. anyone else keep a list of "
+    "bugs that were really clock bugs in disguise?"
+)
+words = BASE.split()
+LIGHT_EDIT = " ".join(w if i not in (20, 45) else "whatever" for i, w in enumerate(words))
+HALF_REWRITE = " ".join(words[: len(words) // 2]) + (
+    " anyway the real lesson was about trust in tooling and how quickly a small surprise grows "
+    "into a long detour through logs dashboards and old tickets nobody remembers writing"
+)
+UNRELATED = (
+    "spent the afternoon teaching myself to bake sourdough. the starter smells like apples and "
+    "the crumb came out dense but honestly I am proud of it. next week rye flour and a hotter oven."
+)
+
+# Test 1: MinHash estimate tracks the true shingle Jaccard
+print("🔢 Test 1: Similarity estimates")
+print("-" * 60)
+base_sig = signature(TITLE, BASE)
+for label, text in (("identical", BASE), ("light edit", LIGHT_EDIT), ("half rewrite", HALF_REWRITE), ("unrelated", UNRELATED)):
+    true = jaccard(f"{TITLE}\n{BASE}", f"{TITLE}\n{text}")
+    est = similarity(base_sig, signature(TITLE, text))
+    check(abs(est - true) <= 0.15, f"{label:<12} jaccard={true:.2f} estimate={est:.2f}")
+check(signature(TITLE, BASE) == base_sig, "signatures are deterministic")
+print()
+
+# Test 2: duplicate threshold on an index
+print("🧹 Test 2: Threshold decisions")
+print("-" * 60)
+tmp = Path(tempfile.mkdtemp())
+index = PostIndex(path=tmp / "post_index.sqlite3", threshold=post_dedupe.POST_DEDUPE_THRESHOLD, origin="test")
+check(index.nearest(TITLE, BASE) is None, "empty index: nothing is a duplicate")
+index.record(TITLE, BASE, "DedupeBot", "check")
+match = index.nearest(TITLE, BASE)
+check(match is not None and match[1] == 1.0, "identical post is a duplicate (similarity 1.0)")
+check(index.nearest(TITLE, LIGHT_EDIT) is not None, "two-word edit is a duplicate")
+check(index.nearest(TITLE, HALF_REWRITE) is None, "half rewrite (below the threshold) is not")
+check(index.nearest("Sourdough week one", UNRELATED) is None, "unrelated post is not")
+strict = PostIndex(path=tmp / "post_index.sqlite3", threshold=0.99, origin="test")
+check(strict.nearest(TITLE, LIGHT_EDIT) is None, "a 0.99 threshold lets the light edit through")
+check(strict.nearest(TITLE, BASE) is not None, "...but still catches the exact copy")
+print()
+
+# Test 3: persistence and origins
+print("💾 Test 3: Persistence")
+print("-" * 60)
+index.record(TITLE, LIGHT_EDIT, "DedupeBot", "check", duplicate_of=match[0])
+check(index.size() == 1, "rejected duplicates are stored but not indexed")
+reopened = PostIndex(path=tmp / "post_index.sqlite3", origin="test")
+check(reopened.size() == 1 and reopened.nearest(TITLE, BASE) is not None, "published posts reload from SQLite")
+other = PostIndex(path=tmp / "post_index.sqlite3", origin="other")
+check(other.nearest(TITLE, BASE) is None, "another API origin starts empty")
+stats = index.stats("check").get("check", {})
+print(f"   stats: {stats}")
+for i in (index, strict, reopened, other):
+    i.close()
+print()
+
+print("=" * 60)
+if failures:
+    print(f"❌ {failures} dedupe check(s) failed")
+    exit(1)
+print("✅ Dedupe checks passed!")
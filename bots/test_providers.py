@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Check the LLM provider circuit breaker: closed -> open -> half-open probe -> closed/open."""
+import providers
+
+failures = 0
+
+
+def check(ok: bool, label: str) -> None:
+    global failures
+    print(f"{'✅' if ok else '❌'} {label}")
+    failures += not ok
+
+
+now = [0.0]
+router = providers.ProviderRouter(failure_threshold=2, cooldown=10, clock=lambda: now[0])
+
+
+def state(name: str = "gemini") -> str:
+    return router.stats()[name]["state"]
+
+
+def call(name: str, ok: bool, latency: float = 0.5) -> None:
+    token = router.begin(name)
+    router.record(name, ok, latency, token)
+
+
+# Test 1: ordering and tripping
+print("🔌 Test 1: Closed -> open")
+print("-" * 60)
+call("gemini", True, 2.0)
+call("openrouter", True, 0.5)
+check(router.order(["gemini", "openrouter"]) == ["openrouter", "gemini"], "faster provider goes first")
+call("gemini", False)
+check(state() == "closed", "one failure keeps the circuit closed")
+call("gemini", True)
+call("gemini", False)
+call("gemini", False)
+check(state() == "open", "failure_threshold failures in a row open it")
+check(router.stats()["gemini"]["trips"] == 1, "trip is counted")
+check(router.order(["gemini", "openrouter"]) == ["openrouter"], "open circuit is skipped during cooldown")
+print()
+
+# Test 2: half-open probe
+print("🧪 Test 2: Half-open probe")
+print("-" * 60)
+straggler = router.begin("gemini")  # a call that started before the cooldown ended
+now[0] += 11
+check(router.order(["gemini", "openrouter"]) == ["openrouter", "gemini"], "after cooldown it is offered again, last")
+probe = router.begin("gemini")
+check(probe is not None and state() == "half_open", "first begin() claims the probe")
+check(router.begin("gemini") is None, "a second call skips it while the probe is in flight")
+check("gemini" not in router.order(["gemini", "openrouter"]), "order() hides it while probing")
+router.record("gemini", False, 0.5, straggler)
+check(state() == "half_open", "another call's outcome doesn't end the probe")
+router.record("gemini", False, 0.5, probe)
+check(state() == "open", "failed probe re-opens the circuit")
+check(router.stats()["gemini"]["trips"] == 1, "re-opening isn't a new trip")
+print()
+
+# Test 3: recovery
+print("🔄 Test 3: Half-open -> closed")
+print("-" * 60)
+check(router.begin("gemini") is not None and state() == "open", "still cooling down: calls don't probe")
+now[0] += 11
+call("gemini", True)
+check(state() == "closed", "successful probe closes the circuit")
+call("gemini", False)
+check(state() == "closed", "failure count starts over after closing")
+print()
+
+print("=" * 60)
+if failures:
+    print(f"❌ {failures} circuit breaker check(s) failed")
+    exit(1)
+print("✅ Circuit breaker checks passed!")
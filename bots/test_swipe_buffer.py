@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Check SwipeAggregator: per-post dedupe, size/age flushes, chunking and re-queue on failure."""
+from swipe_buffer import MAX_DECISIONS_PER_CALL, SwipeAggregator
+
+failures = 0
+
+
+def check(ok: bool, label: str) -> None:
+    global failures
+    print(f"{'✅' if ok else '❌'} {label}")
+    failures += not ok
+
+
+def decision(post_id: str, action: str = "like") -> dict:
+    return {"post_id": post_id, "action": action, "comment": f"{action} on {post_id}, nice detail"}
+
+
+class FakeSwipe:
+    """Stands in for client.swipe: records each call; fail_next makes the next n calls raise."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, list[dict]]] = []
+        self.fail_next = 0
+
+    def __call__(self, api_key: str, decisions: list[dict]) -> dict:
+        if self.fail_next:
+            self.fail_next -= 1
+            raise RuntimeError("swipe failed")
+        self.calls.append((api_key, decisions))
+        matches = [{"partner_id": d["post_id"]} for d in decisions if d["action"] == "like"]
+        return {"processed": len(decisions), "new_matches": matches}
+
+
+# Test 1: one decision per post
+print("🧮 Test 1: Dedupe by post_id")
+print("-" * 60)
+fake = FakeSwipe()
+agg = SwipeAggregator(max_batch=10, max_age=60, swipe=fake)
+agg.add("k1", [decision("p1", "like"), decision("p2")])
+agg.add("k1", [decision("p1", "pass")])
+check(agg.pending("k1") == 2, f"re-deciding p1 keeps one entry ({agg.pending('k1')} pending)")
+check(agg.pending_ids("k1") == {"p1", "p2"}, "pending_ids lists the buffered posts")
+agg.flush("k1")
+sent = {d["post_id"]: d["action"] for _, ds in fake.calls for d in ds}
+check(sent == {"p1": "pass", "p2": "like"}, f"latest decision wins ({sent})")
+check(agg.pending("k1") == 0 and agg.pending_ids("k1") == set(), "buffer is empty after flush")
+print()
+
+# Test 2: size and age triggers
+print("📦 Test 2: Flush triggers")
+print("-" * 60)
+fake = FakeSwipe()
+agg = SwipeAggregator(max_batch=3, max_age=60, swipe=fake)
+agg.add("k1", [decision("a"), decision("b")])
+check(not fake.calls, "below max_batch: nothing sent")
+agg.add("k1", [decision("c")])
+check(len(fake.calls) == 1 and len(fake.calls[0][1]) == 3, "reaching max_batch flushes")
+fake = FakeSwipe()
+agg = SwipeAggregator(max_batch=10, max_age=0, swipe=fake)
+agg.add("k1", [decision("a")])
+check(len(fake.calls) == 1, "a buffer older than max_age flushes on add")
+fake = FakeSwipe()
+agg = SwipeAggregator(max_batch=MAX_DECISIONS_PER_CALL, max_age=60, swipe=fake)
+agg.add("k1", [decision(f"p{i}") for i in range(MAX_DECISIONS_PER_CALL - 1)])
+agg.add("k2", [decision("q1")])
+agg.flush_all()
+check(len(fake.calls) == 2 and agg.processed == MAX_DECISIONS_PER_CALL, "flush_all sends every key")
+fake = FakeSwipe()
+agg = SwipeAggregator(max_batch=MAX_DECISIONS_PER_CALL, max_age=60, swipe=fake)
+agg.add("k1", [decision(f"p{i}") for i in range(MAX_DECISIONS_PER_CALL + 5)])
+sizes = [len(ds) for _, ds in fake.calls]
+check(sizes == [MAX_DECISIONS_PER_CALL, 5], f"large buffers go out in chunks ({sizes})")
+print()
+
+# Test 3: callbacks and failures
+print("🔁 Test 3: Callbacks and re-queue")
+print("-" * 60)
+fake = FakeSwipe()
+agg = SwipeAggregator(max_batch=10, max_age=60, swipe=fake)
+sent_log: list[dict] = []
+match_log: list[dict] = []
+agg.add("k1", [decision("a"), decision("b", "pass")], on_matches=match_log.extend, on_sent=sent_log.extend)
+fake.fail_next = 1
+try:
+    agg.flush("k1")
+    check(False, "a failed swipe raises")
+except RuntimeError:
+    check(True, "a failed swipe raises")
+check(agg.pending("k1") == 2 and not sent_log, "undelivered decisions are buffered again")
+agg.add("k1", [decision("c")])
+agg.flush("k1")
+check(len(sent_log) == 3 and len(match_log) == 2, f"retry sends all 3 with callbacks ({len(match_log)} matches)")
+agg.add("bad", [decision("x")])
+agg.add("good", [decision("y")])
+fake.fail_next = 1
+try:
+    agg.flush_all()
+except RuntimeError:
+    pass
+check(agg.pending("good") + agg.pending("bad") == 1, "one key failing doesn't block the others")
+print()
+
+print("=" * 60)
+if failures:
+    print(f"❌ {failures} swipe buffer check(s) failed")
+    exit(1)
+print("✅ Swipe buffer checks passed!")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Check client throttling: token bucket AIMD, Retry-After parsing and 429 retries against mock_server."""
+import email.utils
+import time
+
+import client
+import mock_server
+import throttle
+from metrics import Metrics
+
+failures = 0
+
+
+def check(ok: bool, label: str) -> None:
+    global failures
+    print(f"{'✅' if ok else '❌'} {label}")
+    failures += not ok
+
+
+# Test 1: AIMD on one bucket
+print("🪣 Test 1: Token bucket AIMD")
+print("-" * 60)
+bucket = throttle.TokenBucket(10)
+bucket.penalize(time.monotonic(), None)
+check(bucket.rate == 5, f"429 halves the rate: 10 -> {bucket.rate}")
+bucket.reward()
+check(bucket.rate == 6, f"success adds 10% of max back: 5 -> {bucket.rate}")
+for _ in range(20):
+    bucket.penalize(time.monotonic(), None)
+check(bucket.rate == throttle.MIN_RATE, f"rate floors at MIN_RATE ({bucket.rate})")
+for _ in range(100):
+    bucket.reward()
+check(bucket.rate == bucket.max_rate, f"rate climbs back to max ({bucket.rate})")
+now = time.monotonic()
+bucket.penalize(now, 2.0)
+check(bucket.reserve(now) >= 2.0, "Retry-After blocks the bucket for that long")
+print()
+
+# Test 2: Retry-After sources
+print("⏳ Test 2: Retry-After parsing")
+print("-" * 60)
+check(throttle.parse_retry_after({"retry-after": "3"}, None) == 3.0, "header in seconds")
+http_date = email.utils.formatdate(time.time() + 10, usegmt=True)
+sec = throttle.parse_retry_after({"retry-after": http_date}, None)
+check(sec is not None and 8 <= sec <= 10, f"header as HTTP date ({sec:.1f}s)")
+body = {"notifications": [{"type": "rate_limited", "payload": {"retry_after_sec": 4}}]}
+check(throttle.parse_retry_after({}, body) == 4.0, "rate_limited notification payload")
+quota = {"notifications": [{"type": "quota.exhausted", "payload": {}}]}
+t = throttle.Throttle(enabled=True)
+check(t.retry_delay(0, 429, {}, quota, "k", "/swipe") is None, "quota.exhausted 429 is not retried")
+wait = t.retry_delay(0, 429, {"retry-after": "1"}, None, "k", "/swipe")
+check(wait is not None and wait >= 1.0, f"429 with Retry-After waits at least that long ({wait:.2f}s)")
+check(t.retry_delay(t.max_retries, 429, {"retry-after": "1"}, None, "k", "/swipe") is None, "gives up after max_retries")
+print()
+
+# Test 3: against mock_server's rate limiter (2 req/s, burst 2) with a client that would go faster
+print("🚦 Test 3: 429 retries against mock_server")
+print("-" * 60)
+with mock_server.MockServer(rate_per_sec=2, burst=2) as server:
+    api_key = server.store.seed(2)[0]["api_key"]
+    m = Metrics()
+    t = throttle.Throttle(rate_per_key=50, rate_per_endpoint=50, max_retries=4, enabled=True)
+    with client.ClawderSession(base_url=server.base_url, throttle=t, metrics=m) as session:
+        t0 = time.monotonic()
+        results = []
+        for _ in range(5):
+            try:
+                results.append(session.browse(api_key, limit=1))
+            except Exception as e:
+                print(f"   browse failed: {e}")
+        elapsed = time.monotonic() - t0
+    stats = m.snapshot()["endpoints"].get("GET /browse", {})
+    rate = t._key_buckets[(api_key, "/browse")].rate
+    check(len(results) == 5, f"all 5 browses succeed ({len(results)})")
+    check(stats.get("retries", 0) >= 1, f"429s were retried ({stats.get('retries', 0)} retries)")
+    check(elapsed >= 1.0, f"retries waited for retry_after_sec ({elapsed:.1f}s)")
+    check(rate < 50, f"per-key rate backed off ({rate:.1f}/s)")
+print()
+
+print("=" * 60)
+if failures:
+    print(f"❌ {failures} throttle check(s) failed")
+    exit(1)
+print("✅ Throttle checks passed!")
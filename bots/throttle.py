@@ -0,0 +1,203 @@
+"""
+Adaptive client-side throttling for the Clawder API.
+
+Token buckets per (API key, endpoint) and per endpoint pace requests so the bots run
+as fast as the server allows instead of sleeping a fixed interval between calls.
+On a 429 the server's hint wins: Retry-After header, or the rate_limited notification
+that web/lib/rateLimit.ts puts in the response (payload.retry_after_sec). Buckets then
+halve their rate and climb back slowly on success (AIMD). Retries use exponential
+backoff with full jitter.
+
+Env (bots/.env):
+    CLAWDER_THROTTLE=0           disable pacing and retries
+    CLAWDER_RATE_PER_KEY=5       max requests/sec per (api key, endpoint)
+    CLAWDER_RATE_PER_ENDPOINT=20 max requests/sec per endpoint across all keys
+    CLAWDER_MAX_RETRIES=4        retries on 429 / 503 / connect errors
+"""
+from __future__ import annotations
+
+import email.utils
+import os
+import random
+import threading
+import time
+
+THROTTLE_ENABLED = os.environ.get("CLAWDER_THROTTLE", "1").strip().lower() not in ("0", "false", "no")
+RATE_PER_KEY = float(os.environ.get("CLAWDER_RATE_PER_KEY", "5"))
+RATE_PER_ENDPOINT = float(os.environ.get("CLAWDER_RATE_PER_ENDPOINT", "20"))
+MAX_RETRIES = int(os.environ.get("CLAWDER_MAX_RETRIES", "4"))
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+MIN_RATE = 0.05  # never slow a bucket below one request per 20s
+RECOVERY_STEP = 0.1  # fraction of max rate regained per successful request
+
+# Statuses where the server did not process the request, so even POSTs are safe to resend.
+RETRYABLE_STATUS = (429, 503)
+
+
+class TokenBucket:
+    """Token bucket whose refill rate adapts: halved on 429, raised additively on success."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now: float) -> float:
+        """Take one token; return seconds the caller must wait before sending."""
+        self._refill(now)
+        self.tokens -= 1.0
+        wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        return max(wait, self.blocked_until - now)
+
+    def penalize(self, now: float, retry_after: float | None) -> None:
+        self.rate = max(MIN_RATE, self.rate / 2)
+        self.tokens = min(self.tokens, 0.0)
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+
+    def reward(self) -> None:
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+
+
+class Throttle:
+    """
+    Shared pacing state for all sessions. Thread-safe; the async client uses the
+    same methods and awaits the returned delays instead of sleeping.
+    """
+
+    def __init__(
+        self,
+        rate_per_key: float = RATE_PER_KEY,
+        rate_per_endpoint: float = RATE_PER_ENDPOINT,
+        max_retries: int = MAX_RETRIES,
+        enabled: bool = THROTTLE_ENABLED,
+    ) -> None:
+        self.rate_per_key = rate_per_key
+        self.rate_per_endpoint = rate_per_endpoint
+        self.max_retries = max_retries if enabled else 0
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._key_buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._endpoint_buckets: dict[str, TokenBucket] = {}
+
+    def _buckets(self, api_key: str | None, endpoint: str) -> list[TokenBucket]:
+        ep = self._endpoint_buckets.get(endpoint)
+        if ep is None:
+            ep = self._endpoint_buckets[endpoint] = TokenBucket(self.rate_per_endpoint)
+        if not api_key:
+            return [ep]
+        kb = self._key_buckets.get((api_key, endpoint))
+        if kb is None:
+            kb = self._key_buckets[(api_key, endpoint)] = TokenBucket(self.rate_per_key)
+        return [kb, ep]
+
+    def delay(self, api_key: str | None, endpoint: str) -> float:
+        """Reserve a slot for one request; return seconds to wait before sending it."""
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            return max(b.reserve(now) for b in self._buckets(api_key, endpoint))
+
+    def acquire(self, api_key: str | None, endpoint: str) -> None:
+        """Blocking variant of delay()."""
+        wait = self.delay(api_key, endpoint)
+        if wait > 0:
+            time.sleep(wait)
+
+    def record_success(self, api_key: str | None, endpoint: str) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            for b in self._buckets(api_key, endpoint):
+                b.reward()
+
+    def record_rate_limited(self, api_key: str | None, endpoint: str, retry_after: float | None) -> None:
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for b in self._buckets(api_key, endpoint):
+                b.penalize(now, retry_after)
+
+    def retry_delay(
+        self,
+        attempt: int,
+        status: int,
+        headers,
+        body: dict | None,
+        api_key: str | None,
+        endpoint: str,
+    ) -> float | None:
+        """Seconds to wait before retrying a failed response, or None if it should not be retried."""
+        if attempt >= self.max_retries or status not in RETRYABLE_STATUS:
+            return None
+        retry_after = parse_retry_after(headers, body)
+        if status == 429:
+            if retry_after is None and not is_rate_limited(body):
+                return None  # e.g. quota.exhausted: retrying today won't help
+            self.record_rate_limited(api_key, endpoint, retry_after)
+        return self.backoff(attempt, retry_after)
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        """Seconds to wait before retry number attempt (0-based): server hint or jittered exponential."""
+        if retry_after is not None:
+            return retry_after + random.uniform(0, BACKOFF_BASE)
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def parse_retry_after(headers, body: dict | None) -> float | None:
+    """
+    Seconds the server asked us to wait, or None.
+    Checks the Retry-After header (seconds or HTTP date), then rate_limited notifications.
+    """
+    value = headers.get("retry-after") if headers is not None else None
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    if isinstance(body, dict):
+        for n in body.get("notifications") or []:
+            if not isinstance(n, dict) or n.get("type") != "rate_limited":
+                continue
+            payload = n.get("payload") or {}
+            sec = payload.get("retry_after_sec", payload.get("retryAfterSec"))
+            if isinstance(sec, (int, float)):
+                return float(sec)
+    return None
+
+
+def is_rate_limited(body: dict | None) -> bool:
+    """True if the response carries a rate_limited notification (not e.g. quota.exhausted)."""
+    if not isinstance(body, dict):
+        return False
+    return any(
+        isinstance(n, dict) and n.get("type") == "rate_limited"
+        for n in body.get("notifications") or []
+    )
+
+
+_default: Throttle | None = None
+_default_lock = threading.Lock()
+
+
+def get_throttle() -> Throttle:
+    """Process-wide throttle shared by every session and async client."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = Throttle()
+        return _default
@@ -0,0 +1,239 @@
+"""
+LLM token and cost accounting per run, per pipeline step and per agent, with optional budgets.
+
+Every provider call (llm._call_llm, dm.generate_dm, background generation) reports its
+prompt/completion tokens, latency, provider and model through record(). The step and agent
+it is charged to come from scope(), a contextvar, so it follows work submitted to
+llm.get_executor():
+
+    with usage.scope(step="step6_posts"):
+        with usage.scope(agent=persona["name"]):
+            llm.generate_post(persona, topic)
+    print("\\n".join(usage.get_tracker().summary_lines()))
+
+A call made for several agents at once (batched swipes) is split evenly between them.
+
+Budgets (bots/.env), checked before each call:
+
+    LLM_BUDGET_TOKENS        run-wide token cap
+    LLM_BUDGET_USD           run-wide cost cap (prices from LLM_PRICES)
+    LLM_AGENT_BUDGET_TOKENS  per-agent token cap
+    LLM_BUDGET_ACTION        degrade (default): switch to LLM_FALLBACK_MODEL /
+                             GEMINI_FALLBACK_MODEL; stop: raise BudgetExceeded
+"""
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from dotenv import load_dotenv
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+LOG_DIR = SCRIPT_DIR / "logs"
+load_dotenv(SCRIPT_DIR / ".env")
+
+LLM_BUDGET_TOKENS = int(os.environ.get("LLM_BUDGET_TOKENS", "0"))  # 0 = no budget
+LLM_BUDGET_USD = float(os.environ.get("LLM_BUDGET_USD", "0"))
+LLM_AGENT_BUDGET_TOKENS = int(os.environ.get("LLM_AGENT_BUDGET_TOKENS", "0"))
+LLM_BUDGET_ACTION = os.environ.get("LLM_BUDGET_ACTION", "degrade").strip().lower()
+FALLBACK_MODELS = {
+    # Must differ from OPENROUTER_MODEL (default openrouter/auto:free), or degrading changes nothing.
+    "openrouter": os.environ.get("LLM_FALLBACK_MODEL", "meta-llama/llama-3.2-3b-instruct:free"),
+    "gemini": os.environ.get("GEMINI_FALLBACK_MODEL", "gemini-2.0-flash-lite"),
+}
+# USD per 1M tokens, {"model": [prompt, completion]}; unlisted models (e.g. :free) cost 0.
+try:
+    LLM_PRICES: dict[str, list[float]] = json.loads(os.environ.get("LLM_PRICES", "") or "{}")
+except ValueError:
+    LLM_PRICES = {}
+
+_agent: contextvars.ContextVar[str | tuple[str, ...] | None] = contextvars.ContextVar("usage_agent", default=None)
+_step: contextvars.ContextVar[str | None] = contextvars.ContextVar("usage_step", default=None)
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised before an LLM call when a budget is spent and LLM_BUDGET_ACTION=stop."""
+
+
+@contextmanager
+def scope(agent: str | list[str] | tuple[str, ...] | None = None, step: str | None = None) -> Iterator[None]:
+    """Charge LLM calls in this block to agent (or several agents, split evenly) and/or step."""
+    tokens = []
+    if agent is not None:
+        tokens.append((_agent, _agent.set(tuple(agent) if isinstance(agent, (list, tuple)) else agent)))
+    if step is not None:
+        tokens.append((_step, _step.set(step)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 chars per token) for providers that report no usage."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def cost_usd(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    price = LLM_PRICES.get(model)
+    if not price:
+        return 0.0
+    return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+
+
+def _bucket() -> dict:
+    return {"calls": 0, "cached": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0, "latency_sec": 0.0}
+
+
+class UsageTracker:
+    """Token/cost totals by run, step, agent and provider:model. Thread-safe."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.total = _bucket()
+        self.steps: dict[str, dict] = {}
+        self.agents: dict[str, dict] = {}
+        self.models: dict[str, dict] = {}
+        self.degraded = False
+
+    def record(
+        self,
+        provider: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        latency: float = 0.0,
+        cached: bool = False,
+    ) -> None:
+        """Add one call (cached=True for a cache hit: counted, no tokens or cost)."""
+        if cached:
+            prompt_tokens = completion_tokens = 0
+        cost = cost_usd(model, prompt_tokens, completion_tokens)
+        agent = _agent.get()
+        agents = agent if isinstance(agent, tuple) else (agent,) if agent else ()
+        step = _step.get() or "-"
+        with self._lock:
+            targets = [(self.total, 1.0), (self.steps.setdefault(step, _bucket()), 1.0)]
+            targets.append((self.models.setdefault(f"{provider}:{model}", _bucket()), 1.0))
+            targets += [(self.agents.setdefault(a, _bucket()), 1.0 / len(agents)) for a in agents]
+            for b, share in targets:
+                b["calls"] += share
+                b["cached"] += share if cached else 0
+                b["prompt_tokens"] += prompt_tokens * share
+                b["completion_tokens"] += completion_tokens * share
+                b["cost_usd"] += cost * share
+                b["latency_sec"] += latency * share
+
+    def _over_budget(self) -> str | None:
+        t = self.total
+        if LLM_BUDGET_TOKENS and t["prompt_tokens"] + t["completion_tokens"] >= LLM_BUDGET_TOKENS:
+            return f"run token budget {LLM_BUDGET_TOKENS} spent"
+        if LLM_BUDGET_USD and t["cost_usd"] >= LLM_BUDGET_USD:
+            return f"run budget ${LLM_BUDGET_USD:.2f} spent"
+        agent = _agent.get()
+        if LLM_AGENT_BUDGET_TOKENS and isinstance(agent, str):
+            a = self.agents.get(agent)
+            if a and a["prompt_tokens"] + a["completion_tokens"] >= LLM_AGENT_BUDGET_TOKENS:
+                return f"agent {agent} token budget {LLM_AGENT_BUDGET_TOKENS} spent"
+        return None
+
+    def model_for(self, provider: str, model: str) -> str:
+        """
+        Model to call: model itself within budget, the provider's fallback model once a
+        budget is spent (LLM_BUDGET_ACTION=degrade). Raises BudgetExceeded when action is stop.
+        """
+        with self._lock:
+            reason = self._over_budget()
+            if reason is None:
+                return model
+            if LLM_BUDGET_ACTION == "stop":
+                raise BudgetExceeded(reason)
+            self.degraded = True
+        return FALLBACK_MODELS.get(provider) or model
+
+    def snapshot(self) -> dict:
+        def rounded(b: dict) -> dict:
+            return {k: round(v, 6) if isinstance(v, float) else v for k, v in b.items()}
+
+        with self._lock:
+            return {
+                "total": rounded(self.total),
+                "degraded": self.degraded,
+                "steps": {k: rounded(v) for k, v in self.steps.items()},
+                "models": {k: rounded(v) for k, v in self.models.items()},
+                "agents": {k: rounded(v) for k, v in self.agents.items()},
+            }
+
+    def summary_lines(self, top_agents: int = 5) -> list[str]:
+        """Totals, then one line per step and model, then the top agents by tokens."""
+        snap = self.snapshot()
+        if not snap["total"]["calls"]:
+            return []
+
+        def line(name: str, b: dict) -> str:
+            return (
+                f"{name:<24} calls={b['calls']:<7g} cached={b['cached']:<5g} "
+                f"tokens={b['prompt_tokens']:.0f}+{b['completion_tokens']:.0f} ${b['cost_usd']:.4f}"
+            )
+
+        out = [line("usage:total", snap["total"]) + (" (degraded)" if snap["degraded"] else "")]
+        out += [line(f"step:{k}", v) for k, v in snap["steps"].items()]
+        out += [line(f"model:{k}", v) for k, v in snap["models"].items()]
+        ranked = sorted(
+            snap["agents"].items(), key=lambda kv: kv[1]["prompt_tokens"] + kv[1]["completion_tokens"], reverse=True
+        )
+        out += [line(f"agent:{k[:18]}", v) for k, v in ranked[:top_agents]]
+        return out
+
+    def export(self, run_name: str, log_dir: Path = LOG_DIR) -> Path:
+        """Write logs/usage_<run_name>.json; return its path."""
+        log_dir.mkdir(parents=True, exist_ok=True)
+        path = log_dir / f"usage_{run_name}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        return path
+
+
+_tracker: UsageTracker | None = None
+_lock = threading.Lock()
+
+
+def get_tracker() -> UsageTracker:
+    """Process-wide UsageTracker."""
+    global _tracker
+    with _lock:
+        if _tracker is None:
+            _tracker = UsageTracker()
+        return _tracker
+
+
+def record(
+    provider: str, model: str, prompt_tokens: int, completion_tokens: int, latency: float = 0.0, cached: bool = False
+) -> None:
+    get_tracker().record(provider, model, prompt_tokens, completion_tokens, latency, cached)
+
+
+def model_for(provider: str, model: str) -> str:
+    return get_tracker().model_for(provider, model)
+
+
+def openai_usage(resp, prompt: str, completion: str) -> tuple[int, int]:
+    """(prompt, completion) tokens from an OpenAI-style response, estimated if not reported."""
+    u = getattr(resp, "usage", None)
+    if u is not None and getattr(u, "prompt_tokens", None) is not None:
+        return int(u.prompt_tokens or 0), int(u.completion_tokens or 0)
+    return estimate_tokens(prompt), estimate_tokens(completion)
+
+
+def gemini_usage(resp, prompt: str, completion: str) -> tuple[int, int]:
+    """(prompt, completion) tokens from a google.genai response, estimated if not reported."""
+    u = getattr(resp, "usage_metadata", None)
+    if u is not None and getattr(u, "prompt_token_count", None) is not None:
+        return int(u.prompt_token_count or 0), int(getattr(u, "candidates_token_count", 0) or 0)
+    return estimate_tokens(prompt), estimate_tokens(completion)
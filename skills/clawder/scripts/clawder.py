@@ -7,9 +7,11 @@ Stdlib-only. CLAWDER_API_KEY required for sync/browse/swipe/post.
 
 from __future__ import annotations
 
+import atexit
 import http.client
 import json
 import os
+import re
 import ssl
 import sys
 import time
@@ -57,6 +59,109 @@ TIMEOUT_SEC = 30
 MAX_REQUEST_RETRIES = 3
 RETRY_DELAY_SEC = 2
 
+# Optional request metrics. CLAWDER_METRICS_FILE=/path/metrics.json accumulates per-endpoint
+# counts, statuses, bytes, retries and latencies across invocations and writes a Prometheus
+# textfile next to it (same name, .prom suffix).
+METRICS_FILE = os.environ.get("CLAWDER_METRICS_FILE", "").strip()
+METRICS_MAX_SAMPLES = 1000
+_metrics: dict[str, dict] = {}
+
+
+def _metric_endpoint(method: str, path: str) -> str:
+    """Label for a request: method + path without query string or ids (keeps label cardinality low)."""
+    bare = path.split("?", 1)[0]
+    bare = re.sub(r"/[0-9a-fA-F-]{16,}(?=/|$)", "/{id}", bare)
+    return f"{method} {bare}"
+
+
+def _record_metric(
+    endpoint: str, status: int | None, latency: float, bytes_out: int = 0, bytes_in: int = 0
+) -> None:
+    """Record one request attempt; status None = transport error."""
+    if not METRICS_FILE:
+        return
+    m = _metrics.setdefault(
+        endpoint,
+        {"requests": 0, "retries": 0, "errors": 0, "status": {}, "bytes_out": 0, "bytes_in": 0, "latencies": []},
+    )
+    m["requests"] += 1
+    if status is None:
+        m["errors"] += 1
+    else:
+        m["status"][str(status)] = m["status"].get(str(status), 0) + 1
+    m["bytes_out"] += bytes_out
+    m["bytes_in"] += bytes_in
+    m["latencies"].append(round(latency, 6))
+
+
+def _record_retry(endpoint: str) -> None:
+    if METRICS_FILE and endpoint in _metrics:
+        _metrics[endpoint]["retries"] += 1
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _flush_metrics() -> None:
+    """Merge this invocation's metrics into METRICS_FILE and rewrite the .prom textfile."""
+    if not METRICS_FILE or not _metrics:
+        return
+    try:
+        with open(METRICS_FILE, encoding="utf-8") as f:
+            stored = json.load(f).get("endpoints", {})
+    except (OSError, ValueError):
+        stored = {}
+    for name, m in _metrics.items():
+        acc = stored.setdefault(
+            name,
+            {"requests": 0, "retries": 0, "errors": 0, "status": {}, "bytes_out": 0, "bytes_in": 0, "latencies": []},
+        )
+        for k in ("requests", "retries", "errors", "bytes_out", "bytes_in"):
+            acc[k] = acc.get(k, 0) + m[k]
+        for code, n in m["status"].items():
+            acc["status"][code] = acc["status"].get(code, 0) + n
+        acc["latencies"] = (acc.get("latencies", []) + m["latencies"])[-METRICS_MAX_SAMPLES:]
+        ordered = sorted(acc["latencies"])
+        acc["latency_ms"] = {
+            "p50": _percentile(ordered, 50) * 1000,
+            "p95": _percentile(ordered, 95) * 1000,
+            "p99": _percentile(ordered, 99) * 1000,
+        }
+    lines = [
+        "# HELP clawder_cli_requests_total Requests by endpoint and status.",
+        "# TYPE clawder_cli_requests_total counter",
+    ]
+    for name, acc in sorted(stored.items()):
+        for code, n in sorted(acc["status"].items()):
+            lines.append(f'clawder_cli_requests_total{{endpoint="{name}",status="{code}"}} {n}')
+        if acc["errors"]:
+            lines.append(f'clawder_cli_requests_total{{endpoint="{name}",status="error"}} {acc["errors"]}')
+    for metric, key in (("retries_total", "retries"), ("bytes_out_total", "bytes_out"), ("bytes_in_total", "bytes_in")):
+        lines.append(f"# TYPE clawder_cli_{metric} counter")
+        for name, acc in sorted(stored.items()):
+            lines.append(f'clawder_cli_{metric}{{endpoint="{name}"}} {acc[key]}')
+    lines.append("# TYPE clawder_cli_latency_seconds summary")
+    for name, acc in sorted(stored.items()):
+        for q, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")):
+            lines.append(
+                f'clawder_cli_latency_seconds{{endpoint="{name}",quantile="{q}"}} {acc["latency_ms"][key] / 1000:.6f}'
+            )
+    try:
+        with open(METRICS_FILE, "w", encoding="utf-8") as f:
+            json.dump({"endpoints": stored}, f, indent=2)
+        prom_path = os.path.splitext(METRICS_FILE)[0] + ".prom"
+        with open(prom_path + ".tmp", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(prom_path + ".tmp", prom_path)
+    except OSError as exc:
+        eprint(f"Could not write metrics: {exc}")
+
+
+atexit.register(_flush_metrics)
+
 
 def eprint(msg: str) -> None:
     print(msg, file=sys.stderr)
@@ -133,17 +238,24 @@ def _request(
     raw: str | None = None
     use_httpclient = os.environ.get("CLAWDER_USE_HTTP_CLIENT", "").strip().lower() in ("1", "true", "yes")
 
+    endpoint = _metric_endpoint(method, path)
+    bytes_out = len(body) if body else 0
+
     for attempt in range(MAX_REQUEST_RETRIES):
+        t0 = time.monotonic()
         if use_httpclient:
             try:
                 status, raw = _do_request_httpclient(url, method, headers, body, TIMEOUT_SEC)
+                _record_metric(endpoint, status, time.monotonic() - t0, bytes_out, len(raw.encode("utf-8")))
                 if status >= 400:
                     eprint(f"HTTP {status}")
                     eprint(raw)
                     sys.exit(1)
                 break
             except (ssl.SSLZeroReturnError, OSError, Exception) as exc:
+                _record_metric(endpoint, None, time.monotonic() - t0, bytes_out)
                 if attempt < MAX_REQUEST_RETRIES - 1 and isinstance(exc, ssl.SSLZeroReturnError):
+                    _record_retry(endpoint)
                     time.sleep(RETRY_DELAY_SEC)
                     continue
                 eprint(f"Request failed: {exc}")
@@ -157,9 +269,12 @@ def _request(
             try:
                 opener = urllib.request.build_opener(urllib.request.HTTPSHandler(context=_ssl_context()))
                 with opener.open(req, timeout=TIMEOUT_SEC) as resp:
-                    raw = resp.read().decode("utf-8")
+                    raw_bytes = resp.read()
+                    _record_metric(endpoint, resp.status, time.monotonic() - t0, bytes_out, len(raw_bytes))
+                    raw = raw_bytes.decode("utf-8")
                 break
             except urllib.error.HTTPError as exc:
+                _record_metric(endpoint, exc.code, time.monotonic() - t0, bytes_out)
                 eprint(f"HTTP {exc.code}: {exc.reason}")
                 try:
                     err_body = exc.read().decode("utf-8")
@@ -168,14 +283,19 @@ def _request(
                     pass
                 sys.exit(1)
             except urllib.error.URLError as exc:
+                _record_metric(endpoint, None, time.monotonic() - t0, bytes_out)
                 reason = getattr(exc, "reason", None)
                 if attempt < MAX_REQUEST_RETRIES - 1 and isinstance(reason, ssl.SSLZeroReturnError):
+                    _record_retry(endpoint)
                     time.sleep(RETRY_DELAY_SEC)
                     continue
                 # Exhausted retries with SSLZeroReturnError: try http.client once before giving up
                 if isinstance(reason, ssl.SSLZeroReturnError):
+                    _record_retry(endpoint)
                     try:
+                        t0 = time.monotonic()
                         status, raw = _do_request_httpclient(url, method, headers, body, TIMEOUT_SEC)
+                        _record_metric(endpoint, status, time.monotonic() - t0, bytes_out, len(raw.encode("utf-8")))
                         if status < 400:
                             break
                         eprint(f"HTTP {status}")
@@ -195,6 +315,7 @@ def _request(
                 )
                 sys.exit(1)
             except OSError as exc:
+                _record_metric(endpoint, None, time.monotonic() - t0, bytes_out)
                 eprint(f"Error: {exc}")
                 sys.exit(1)
 